@@ -0,0 +1,214 @@
+import argparse
+import sys
+from collections import Counter
+from math import isqrt, lcm
+from operator import itemgetter
+
+import engine
+
+# ============================================================
+# ALGORITHM ANALYSIS
+# ============================================================
+#
+# An algorithm is composed into one sticker permutation, one gather
+# per move, and everything else is read off that permutation:
+#
+#   order      the LCM of its cycle lengths, i.e. how many times
+#              the algorithm repeats before every sticker is back
+#   repeats    how many times it must be applied to a solved cube
+#              before it looks solved again, which can be a divisor
+#              of the order: rotations, slices and same coloured
+#              centres on bigger cubes can come back early
+#   pieces     the cubies it moves, and those it only twists or
+#              flips in place
+#
+# Nothing is simulated repeatedly, so the cost is linear in the
+# length of the algorithm and independent of its order.
+
+PIECE_KINDS = {3: 'corners', 2: 'edges', 1: 'centres'}
+
+_GATHERS = {}
+
+def _gathers(puzzle):
+
+    if puzzle.n not in _GATHERS:
+        _GATHERS[puzzle.n] = {name: itemgetter(*perm) for name, perm in puzzle.perms.items()}
+
+    return _GATHERS[puzzle.n]
+
+def algorithm_perm(moves, puzzle=engine.CUBE):
+
+    # the same as engine.sequence_perm but with one C level gather
+    # per move, for algorithms thousands of moves long
+    gathers = _gathers(puzzle)
+    perm = puzzle.identity
+
+    for name in moves:
+        perm = gathers[name](perm)
+
+    return perm
+
+def cycles(perm):
+
+    # the non-trivial cycles, each as a list of sticker indices
+    seen = bytearray(len(perm))
+    result = []
+
+    for start in range(len(perm)):
+
+        if seen[start] or perm[start] == start:
+            continue
+
+        cycle = []
+        i = start
+
+        while not seen[i]:
+            seen[i] = 1
+            cycle.append(i)
+            i = perm[i]
+
+        result.append(cycle)
+
+    return result
+
+def power(cycle_list, count, size):
+
+    # the permutation applied count times, built from the cycles:
+    # each sticker just moves count places along its own cycle
+    perm = list(range(size))
+
+    for cycle in cycle_list:
+        length = len(cycle)
+        for j, i in enumerate(cycle):
+            perm[i] = cycle[(j + count) % length]
+
+    return perm
+
+def _divisors(n):
+
+    small = [d for d in range(1, isqrt(n) + 1) if n % d == 0]
+
+    return small + [n // d for d in reversed(small) if d * d != n]
+
+# faces in the order pieces are usually named: UFR, UF, FR
+NAME_ORDER = ('U', 'D', 'F', 'B', 'R', 'L')
+
+def piece_name(position, puzzle=engine.CUBE):
+
+    k = puzzle.n - 1
+
+    return ''.join(
+        face for face in NAME_ORDER
+        if sum(a * b for a, b in zip(position, engine.NORMALS[face])) == k
+    )
+
+class Analysis:
+
+    def __init__(self, moves, puzzle=engine.CUBE):
+
+        self.moves = list(moves)
+        self.puzzle = puzzle
+        self.perm = algorithm_perm(self.moves, puzzle)
+        self.cycles = cycles(self.perm)
+
+        self.order = lcm(*(len(cycle) for cycle in self.cycles))
+
+        solved = puzzle.solved
+
+        self.repeats = next(
+            d for d in _divisors(self.order)
+            if engine.is_solved(bytes(solved[i] for i in power(self.cycles, d, puzzle.stickers)))
+        )
+
+        # cubies whose stickers go to other cubies, and cubies whose
+        # stickers only move around the same cubie
+        cubie_of = puzzle.cubie_of
+        moved = set()
+        touched = set()
+
+        for cycle in self.cycles:
+            for i in cycle:
+                touched.add(cubie_of[i])
+                if cubie_of[self.perm[i]] != cubie_of[i]:
+                    moved.add(cubie_of[i])
+
+        self.moved = moved
+        self.reoriented = touched - moved
+
+    def cycle_lengths(self):
+
+        # {length: number of sticker cycles of that length}
+        return dict(sorted(Counter(len(cycle) for cycle in self.cycles).items()))
+
+    def pieces(self, cubies):
+
+        # {'corners': ['URF', ...], 'edges': [...], ...}; a name shows
+        # up once per cubie, so bigger cubes can repeat it
+        k = self.puzzle.n - 1
+        groups = {}
+
+        for position in sorted(cubies):
+            kind = PIECE_KINDS[sum(abs(c) == k for c in position)]
+            groups.setdefault(kind, []).append(piece_name(position, self.puzzle))
+
+        return groups
+
+    def report(self):
+
+        rows = [
+            ("Moves", len(self.moves)),
+            ("Order", self.order),
+            ("Repeats to solve", self.repeats),
+        ]
+
+        if self.cycles:
+            rows.append(("Sticker cycles", ', '.join(
+                f"{count} x {length}" for length, count in self.cycle_lengths().items()
+            )))
+
+        for title, cubies in (("Moved", self.moved), ("Twisted/flipped", self.reoriented)):
+            for kind, names in self.pieces(cubies).items():
+                counts = Counter(names)
+                rows.append((f"{title} {kind}", ' '.join(
+                    name if count == 1 else f"{name}x{count}" for name, count in counts.items()
+                )))
+
+        width = max(len(label) for label, _ in rows)
+
+        return '\n'.join(f"{label:<{width}} : {value}" for label, value in rows)
+
+def analyze(moves, puzzle=engine.CUBE):
+
+    for name in moves:
+        if name not in puzzle.perms:
+            raise ValueError(f"invalid move : {name}")
+
+    return Analysis(moves, puzzle)
+
+# ============================================================
+# COMMAND LINE
+# ============================================================
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(
+        prog="cube.py analyze",
+        description="Order, cycle structure and affected pieces of an algorithm."
+    )
+    parser.add_argument('moves', nargs='+', help="moves, e.g. R U R' U'")
+    parser.add_argument('--size', type=int, default=3, metavar='N', help="cube size (default 3)")
+    parser.add_argument('--repeat', type=int, default=1, help="analyse the algorithm repeated this often")
+
+    args = parser.parse_args(argv)
+
+    moves = ' '.join(args.moves).split() * args.repeat
+
+    try:
+        result = analyze(moves, engine.puzzle(args.size))
+    except ValueError as error:
+        print(error, file=sys.stderr)
+        return 1
+
+    print(result.report())
+
+    return 0
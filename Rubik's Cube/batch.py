@@ -0,0 +1,152 @@
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import engine
+import solver
+
+# ============================================================
+# BATCH SOLVING
+# ============================================================
+#
+# Reads one scramble per line in the usual move notation (for
+# example "R U R' U' F2"), solves every scramble with the
+# two-phase solver and writes one JSON object per line:
+#
+#     {"scramble": "...", "solution": "...", "length": 21, "time_us": 81234}
+#
+# Lines that cannot be parsed or solved produce an object with an
+# "error" key instead. Output follows input order. At most
+# `window` scrambles are in flight at once, so memory stays
+# bounded however long the input is.
+
+# records written between flushes: often enough to follow a long
+# run, rarely enough that it is not bound by system calls
+FLUSH_EVERY = 1000
+
+def parse_scramble(line):
+
+    moves = line.split()
+
+    for move in moves:
+        if move not in engine.PERMS:
+            raise ValueError(f"invalid move : {move}")
+
+    return moves
+
+def solve_line(line, max_length=24, timeout=10.0):
+
+    record = {'scramble': line}
+
+    try:
+        state = engine.apply_moves(engine.SOLVED, parse_scramble(line))
+
+        start = time.perf_counter_ns()
+        solution = solver.solve(state, max_length, timeout)
+        elapsed = time.perf_counter_ns() - start
+
+    except (ValueError, TimeoutError) as error:
+        record['error'] = str(error)
+        return record
+
+    record['solution'] = ' '.join(solution)
+    record['length'] = len(solution)
+    record['time_us'] = elapsed // 1000
+
+    return record
+
+def _scrambles(lines):
+
+    for line in lines:
+
+        line = line.strip()
+
+        if line and not line.startswith('#'):
+            yield line
+
+def run_batch(lines, out, workers=1, window=None, max_length=24, timeout=10.0):
+
+    # returns the number of scrambles written
+    solver.load_tables()
+
+    count = 0
+
+    def write(record):
+
+        nonlocal count
+
+        out.write(json.dumps(record) + '\n')
+        count += 1
+
+        if count % FLUSH_EVERY == 0:
+            out.flush()
+
+    try:
+        if workers <= 1:
+
+            for line in _scrambles(lines):
+                write(solve_line(line, max_length, timeout))
+
+            return count
+
+        window = window or workers * 4
+        pending = deque()
+
+        with ProcessPoolExecutor(workers) as pool:
+
+            for line in _scrambles(lines):
+
+                pending.append(pool.submit(solve_line, line, max_length, timeout))
+
+                if len(pending) >= window:
+                    write(pending.popleft().result())
+
+            while pending:
+                write(pending.popleft().result())
+
+        return count
+
+    finally:
+        out.flush()
+
+# ============================================================
+# COMMAND LINE
+# ============================================================
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(
+        prog="cube.py batch",
+        description="Solve scrambles from a file or stdin and stream JSONL results."
+    )
+    parser.add_argument('input', nargs='?', default='-',
+                        help="file with one scramble per line, '-' for stdin")
+    parser.add_argument('-o', '--output', default='-',
+                        help="output file, '-' for stdout")
+    parser.add_argument('-j', '--workers', type=int, default=os.cpu_count() or 1,
+                        help="number of worker processes")
+    parser.add_argument('--window', type=int, default=None,
+                        help="maximum scrambles in flight (default 4 per worker)")
+    parser.add_argument('--max-length', type=int, default=24,
+                        help="longest solution to accept")
+    parser.add_argument('--timeout', type=float, default=10.0,
+                        help="seconds allowed per scramble")
+
+    args = parser.parse_args(argv)
+
+    source = sys.stdin if args.input == '-' else open(args.input)
+    out = sys.stdout if args.output == '-' else open(args.output, 'w')
+
+    try:
+        run_batch(source, out, args.workers, args.window, args.max_length, args.timeout)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if out is not sys.stdout:
+            out.close()
+
+    return 0
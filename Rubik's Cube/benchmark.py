@@ -0,0 +1,221 @@
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+
+import cube
+import engine
+import scramble
+import solver
+import zobrist
+
+# ============================================================
+# SIMULATOR BENCHMARKS
+# ============================================================
+#
+#     python benchmark.py -o before.json
+#     python benchmark.py -o after.json --quick
+#
+# Every measurement is seeded so two runs time exactly the same
+# work, and every rate is the best of several repeats to damp
+# scheduler noise. The JSON output also records the Python
+# version, the platform and the git commit so result files from
+# different revisions can be compared side by side.
+
+def _best_rate(function, count, repeats):
+
+    # calls per second of the fastest of `repeats` runs
+    best = None
+
+    for _ in range(repeats):
+
+        start = time.perf_counter()
+        function(count)
+        elapsed = time.perf_counter() - start
+
+        best = elapsed if best is None else min(best, elapsed)
+
+    return count / best if best else float('inf')
+
+def _scrambled_states(seed, count):
+
+    rng = random.Random(seed)
+
+    return [
+        engine.apply_moves(engine.SOLVED, [rng.choice(engine.MOVE_NAMES) for _ in range(25)])
+        for _ in range(count)
+    ]
+
+# ============================================================
+# MEASUREMENTS
+# ============================================================
+
+def bench_moves(seed, count, repeats):
+
+    # moves per second for every entry of cube.MOVES, plus the
+    # primes built through reverse_move
+    start = _scrambled_states(seed, 1)[0]
+    rates = {}
+
+    for name, move in cube.MOVES.items():
+
+        def run(n, move=move):
+            state = start
+            for _ in range(n):
+                state = move(state)
+
+        rates[name] = _best_rate(run, count, repeats)
+
+    for face in engine.FACES:
+
+        def run(n, move=cube.MOVES[face]):
+            state = start
+            for _ in range(n):
+                state = cube.reverse_move(move, state)
+
+        rates[f"reverse_move({face})"] = _best_rate(run, count, repeats)
+
+    return rates
+
+def bench_is_solved(seed, count, repeats):
+
+    states = _scrambled_states(seed, 64) + [engine.SOLVED] * 64
+
+    def run(n):
+        for i in range(n):
+            cube.is_solved(states[i & 127])
+
+    return _best_rate(run, count, repeats)
+
+def bench_state_size():
+
+    state = cube.create_cube()
+    legacy = cube.cube_to_dict(state)
+
+    legacy_bytes = sys.getsizeof(legacy) + sum(
+        sys.getsizeof(rows) + sum(sys.getsizeof(row) for row in rows)
+        for rows in legacy.values()
+    )
+
+    return {
+        'payload': len(state),
+        'object': sys.getsizeof(state),
+        'legacy_dict': legacy_bytes,
+    }
+
+def bench_scrambles(seed, count, repeats):
+
+    def single(n):
+        random.seed(seed)
+        for _ in range(n):
+            cube.generate_scramble()
+
+    def bulk(n):
+        scramble.ScrambleGenerator(seed=seed).codes(n)
+
+    return {
+        'generate_scramble': _best_rate(single, count, repeats),
+        'bulk_codes': _best_rate(bulk, count * 10, repeats),
+    }
+
+def bench_commands(seed, count):
+
+    # the 'scramble' and 'solve' commands end to end, through the
+    # same functions main() runs, without the display and the pauses
+    solver.load_tables()
+    random.seed(seed)
+
+    solutions = zobrist.TranspositionTable(10_000)
+
+    scramble_times = []
+    solve_times = []
+    lengths = []
+
+    for _ in range(count):
+
+        start = time.perf_counter()
+        _, state = cube.scramble_cube(cube.create_cube())
+        scramble_times.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        solution, state = cube.solve_cube(state, solutions)
+        solve_times.append(time.perf_counter() - start)
+
+        lengths.append(len(solution))
+
+    def summary(times):
+        times = sorted(times)
+        return {
+            'mean_ms': 1000 * sum(times) / len(times),
+            'median_ms': 1000 * times[len(times) // 2],
+            'max_ms': 1000 * times[-1],
+        }
+
+    return {
+        'scramble': summary(scramble_times),
+        'solve': summary(solve_times),
+        'mean_solution_length': sum(lengths) / len(lengths),
+    }
+
+# ============================================================
+# REPORT
+# ============================================================
+
+def _git_commit():
+
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run(seed=1, quick=False):
+
+    count = 2_000 if quick else 20_000
+    repeats = 3 if quick else 5
+    solves = 5 if quick else 50
+
+    return {
+        'meta': {
+            'seed': seed,
+            'quick': quick,
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'platform': platform.platform(),
+            'commit': _git_commit(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'moves_per_sec': bench_moves(seed, count, repeats),
+        'is_solved_per_sec': bench_is_solved(seed, count * 5, repeats),
+        'bytes_per_state': bench_state_size(),
+        'scrambles_per_sec': bench_scrambles(seed, count // 10, repeats),
+        'command_latency': bench_commands(seed, solves),
+    }
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(description="Benchmark the Rubik's cube simulator.")
+    parser.add_argument('-o', '--output', default='-', help="JSON file, '-' for stdout")
+    parser.add_argument('--seed', type=int, default=1, help="seed for every random input")
+    parser.add_argument('--quick', action='store_true', help="smaller counts for a fast check")
+
+    args = parser.parse_args(argv)
+
+    results = json.dumps(run(args.seed, args.quick), indent=2)
+
+    if args.output == '-':
+        print(results)
+    else:
+        with open(args.output, 'w') as out:
+            out.write(results + '\n')
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,76 @@
+import asyncio
+import os
+import sys
+import threading
+
+# ============================================================
+# NON-BLOCKING LINE INPUT
+# ============================================================
+#
+# Reads lines from stdin without blocking the event loop, so the
+# timer keeps ticking and animations keep playing while the
+# simulator waits for a command. On POSIX the file descriptor is
+# watched by the loop itself and read with os.read (a buffered
+# readline could leave lines sitting in the buffer where the loop
+# never sees them). Where the loop cannot watch stdin, as with the
+# Windows proactor loop, a daemon thread reads and hands the lines
+# over.
+
+class LineReader:
+
+    # reader = LineReader()
+    # reader.start()                 inside a running loop
+    # line = await reader.readline() None at end of input
+
+    def __init__(self, stream=None):
+
+        self.stream = stream or sys.stdin
+        self.lines = asyncio.Queue()
+        self._loop = None
+        self._fd = None
+        self._pending = b''
+
+    def start(self):
+
+        self._loop = asyncio.get_running_loop()
+
+        try:
+            fd = self.stream.fileno()
+            self._loop.add_reader(fd, self._on_readable)
+            self._fd = fd
+        except (AttributeError, OSError, NotImplementedError, ValueError):
+            threading.Thread(target=self._read_blocking, daemon=True).start()
+
+    def _on_readable(self):
+
+        data = os.read(self._fd, 4096)
+
+        if not data:
+            self._loop.remove_reader(self._fd)
+            self._fd = None
+            if self._pending:
+                self.lines.put_nowait(self._pending.decode(errors='replace'))
+            self.lines.put_nowait(None)
+            return
+
+        *complete, self._pending = (self._pending + data).split(b'\n')
+
+        for line in complete:
+            self.lines.put_nowait(line.decode(errors='replace').rstrip('\r'))
+
+    def _read_blocking(self):
+
+        for line in self.stream:
+            self._loop.call_soon_threadsafe(self.lines.put_nowait, line.rstrip('\r\n'))
+
+        self._loop.call_soon_threadsafe(self.lines.put_nowait, None)
+
+    async def readline(self):
+
+        return await self.lines.get()
+
+    def close(self):
+
+        if self._fd is not None:
+            self._loop.remove_reader(self._fd)
+            self._fd = None
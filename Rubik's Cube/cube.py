@@ -1,7 +1,25 @@
+import argparse
+import asyncio
 import random
-import os
+import signal
+import sys
 import time
-from collections import deque
+
+import analysis
+import batch
+import console
+import engine
+from history import History
+import lastlayer
+import optimal
+import pocket
+import render
+import scramble
+import sequences
+import service
+import sessionlog
+import solver
+import zobrist
 
 # ============================================================
 # ANSI COLORS FOR TERMINAL DISPLAY
@@ -20,432 +38,469 @@ COLORS = {
 # CREATE SOLVED CUBE
 # ============================================================
 
-def create_cube():
+def create_cube(size=3):
 
-    return {
-        'F': [['R'] * 3 for _ in range(3)],
-        'B': [['O'] * 3 for _ in range(3)],
-        'L': [['G'] * 3 for _ in range(3)],
-        'R': [['B'] * 3 for _ in range(3)],
-        'U': [['W'] * 3 for _ in range(3)],
-        'D': [['Y'] * 3 for _ in range(3)]
-    }
+    return engine.puzzle(size).solved
 
 # ============================================================
-# ROTATE FACE CLOCKWISE
+# COPY CUBE SAFELY
 # ============================================================
 
-def rotate_face(face):
+def copy_cube(cube):
 
-    return [list(row) for row in zip(*face[::-1])]
+    return bytes(cube)
 
 # ============================================================
-# COPY CUBE SAFELY
+# DICT FORMAT IMPORT / EXPORT
 # ============================================================
 
-def copy_cube(cube):
+def cube_from_dict(cube):
 
-    return {
-        face: [row[:] for row in cube[face]]
-        for face in cube
-    }
+    return engine.from_dict(cube)
 
-# ============================================================
-# FRONT MOVE
-# ============================================================
+def cube_to_dict(cube):
 
-def move_F(cube):
+    return engine.to_dict(cube)
 
-    cube = copy_cube(cube)
+# ============================================================
+# FACE MOVES
+# ============================================================
 
-    cube['F'] = rotate_face(cube['F'])
+move_F = engine.TURNS['F']
+move_U = engine.TURNS['U']
+move_R = engine.TURNS['R']
+move_L = engine.TURNS['L']
+move_B = engine.TURNS['B']
+move_D = engine.TURNS['D']
 
-    top = cube['U'][2][:]
+# ============================================================
+# ALL MOVES
+# ============================================================
 
-    cube['U'][2] = [
-        cube['L'][2][2],
-        cube['L'][1][2],
-        cube['L'][0][2]
-    ]
+# the face turns plus the wide (Rw), slice (M E S) and whole cube
+# (x y z) moves, all generated from the cube geometry
+MOVES = dict(engine.CUBE.turns)
 
-    cube['L'][0][2] = cube['D'][0][0]
-    cube['L'][1][2] = cube['D'][0][1]
-    cube['L'][2][2] = cube['D'][0][2]
+# ============================================================
+# GENERATE COUNTER CLOCKWISE MOVE
+# ============================================================
 
-    cube['D'][0] = [
-        cube['R'][2][0],
-        cube['R'][1][0],
-        cube['R'][0][0]
-    ]
+_INVERSE = {
+    MOVES[name]: MOVES[engine.inverse_move(name)]
+    for name in MOVES
+}
 
-    cube['R'][0][0] = top[0]
-    cube['R'][1][0] = top[1]
-    cube['R'][2][0] = top[2]
+def reverse_move(move_function, cube):
 
-    return cube
+    return _INVERSE[move_function](cube)
 
 # ============================================================
-# UP MOVE
+# DISPLAY CUBE
 # ============================================================
 
-def move_U(cube):
+_renderer = render.TerminalRenderer(COLORS)
 
-    cube = copy_cube(cube)
+def display_cube(cube, move_count, elapsed, status=''):
 
-    cube['U'] = rotate_face(cube['U'])
+    global _renderer
 
-    temp = cube['F'][0][:]
+    # the layout follows the size of the cube being shown
+    size = engine.size_of(cube)
 
-    cube['F'][0] = cube['L'][0][:]
-    cube['L'][0] = cube['B'][0][:]
-    cube['B'][0] = cube['R'][0][:]
-    cube['R'][0] = temp
+    if _renderer.layout.n != size:
+        _renderer = render.TerminalRenderer(COLORS, n=size)
 
-    return cube
+    _renderer.draw(cube, move_count, elapsed, status)
 
 # ============================================================
-# RIGHT MOVE
+# CHECK IF CUBE IS SOLVED
 # ============================================================
 
-def move_R(cube):
+def is_solved(cube):
 
-    cube = copy_cube(cube)
+    return engine.is_solved(cube)
 
-    cube['R'] = rotate_face(cube['R'])
+# ============================================================
+# GENERATE SCRAMBLE
+# ============================================================
+
+def generate_scramble(length=None, size=3):
+
+    seed = random.getrandbits(64)
 
-    temp = [cube['U'][i][2] for i in range(3)]
+    if size != 3:
+        return scramble.random_moves(size, length, seed)
 
-    for i in range(3):
-        cube['U'][i][2] = cube['B'][2 - i][0]
-        cube['B'][2 - i][0] = cube['D'][i][2]
-        cube['D'][i][2] = cube['F'][i][2]
-        cube['F'][i][2] = temp[i]
+    generator = scramble.ScrambleGenerator(length or 25, seed=seed)
 
-    return cube
+    return generator.generate()
 
 # ============================================================
-# LEFT MOVE
+# SCRAMBLE AND SOLVE COMMANDS
 # ============================================================
+#
+# The work behind the 'scramble' and 'solve' commands, without the
+# display; run() calls these and benchmark.py times them.
 
-def move_L(cube):
+def scramble_cube(cube, size=3):
 
-    cube = copy_cube(cube)
+    # returns (scramble, scrambled cube)
+    puzzle = engine.puzzle(size)
 
-    cube['L'] = rotate_face(cube['L'])
+    sequence = sequences.simplify(generate_scramble(size=size), puzzle.perms)
 
-    temp = [cube['U'][i][0] for i in range(3)]
+    return sequence, puzzle.apply_moves(cube, sequence)
 
-    for i in range(3):
-        cube['U'][i][0] = cube['B'][2 - i][2]
-        cube['B'][2 - i][2] = cube['D'][i][0]
-        cube['D'][i][0] = cube['F'][i][0]
-        cube['F'][i][0] = temp[i]
+def solve_cube(cube, solutions, size=3):
 
-    return cube
+    # returns (solution, solved cube) for the 2x2 or the 3x3; 3x3
+    # solutions are remembered in the solutions table. Raises
+    # ValueError or TimeoutError when there is no solution
+    if size == 2:
+        # the 2x2 table gives a shortest solution directly
+        solution = pocket.solve(cube)
+    else:
+        solution = zobrist.memoized(solutions, engine.normalize_centers(cube), solver.solve)
+
+    return solution, engine.puzzle(size).apply_moves(cube, solution)
 
 # ============================================================
-# BACK MOVE
+# HELP MENU
 # ============================================================
 
-def move_B(cube):
+def show_help(size=3):
 
-    cube = copy_cube(cube)
+    print("\nAVAILABLE COMMANDS")
+    print("-" * 30)
 
-    cube['B'] = rotate_face(cube['B'])
+    print("Moves:")
+    print("F  F'  F2  U  U'  U2  R  R'  R2")
+    print("L  L'  L2  B  B'  B2  D  D'  D2")
+
+    if size > 2:
+        print("Rw  Uw ...  -> Two outer layers")
+    if size > 3:
+        print("3Rw ...     -> Three outer layers")
+        print("2R  3R ...  -> A single inner layer")
+    if size % 2:
+        print("M  E  S     -> Middle layer")
+    print("x  y  z     -> Whole cube rotation")
 
-    top = cube['U'][0][:]
+    print("\nOther Commands:")
+    print("scramble  -> Shuffle cube")
+    print("reset     -> Reset cube")
+    print("undo      -> Undo moves")
+    print("redo      -> Redo undone moves")
+    print("history   -> Show move history")
+    print("solve     -> Solve cube (two-phase; optimal on the 2x2)")
+    print("solve optimal -> Shortest solution (slow)")
+    print("case      -> Name the last layer case (OLL / PLL)")
+    print("analyze <moves> -> Order and cycles of an algorithm")
+    print("help      -> Show commands")
+    print("quit      -> Exit program")
 
-    cube['U'][0] = [
-        cube['L'][2][0],
-        cube['L'][1][0],
-        cube['L'][0][0]
-    ]
+# ============================================================
+# MAIN APPLICATION
+# ============================================================
+#
+# The command loop runs on asyncio: stdin is read without blocking,
+# the timer on screen ticks on its own, scrambles are animated and
+# the solvers run in a worker thread. Nothing blocks; the outcome
+# of a command stays on screen under the cube until the next one.
 
-    cube['L'][0][0] = cube['D'][2][2]
-    cube['L'][1][0] = cube['D'][2][1]
-    cube['L'][2][0] = cube['D'][2][0]
+TICK_SECONDS = 0.1
 
-    cube['D'][2] = [
-        cube['R'][2][2],
-        cube['R'][1][2],
-        cube['R'][0][2]
-    ]
+# scramble animation speed in moves per second, 0 for no animation
+DEFAULT_SCRAMBLE_RATE = 20
 
-    cube['R'][0][2] = top[2]
-    cube['R'][1][2] = top[1]
-    cube['R'][2][2] = top[0]
+def status_text(cube, message):
 
-    return cube
+    # the lines under the cube, ending in the prompt; drawn with
+    # the frame so a refresh is a single write
+    text = "\nCube Status : SOLVED" if is_solved(cube) else "\nCube Status : MIXED"
 
-# ============================================================
-# DOWN MOVE
-# ============================================================
+    if message:
+        text += "\n\n" + message
 
-def move_D(cube):
+    return text + "\n\nEnter Command : "
 
-    cube = copy_cube(cube)
+async def run(size=3, log_path=None, scramble_rate=DEFAULT_SCRAMBLE_RATE):
 
-    cube['D'] = rotate_face(cube['D'])
+    loop = asyncio.get_running_loop()
 
-    temp = cube['F'][2][:]
+    puzzle = engine.puzzle(size)
 
-    cube['F'][2] = cube['L'][2][:]
-    cube['L'][2] = cube['B'][2][:]
-    cube['B'][2] = cube['R'][2][:]
-    cube['R'][2] = temp
+    moves = puzzle.turns
 
-    return cube
+    cube = create_cube(size)
 
-# ============================================================
-# GENERATE COUNTER CLOCKWISE MOVE
-# ============================================================
+    history = History(cube)
 
-def reverse_move(move_function, cube):
+    solutions = zobrist.TranspositionTable(10_000)
 
-    for _ in range(3):
-        cube = move_function(cube)
+    optimal_solver = None
 
-    return cube
+    message = "Welcome! Type help to see the commands."
 
-# ============================================================
-# ALL MOVES
-# ============================================================
+    # every move of the session goes to a binary log on disk; an
+    # unwritable log directory must not stop the simulator
+    session = None
 
-MOVES = {
-    'F': move_F,
-    "F'": lambda c: reverse_move(move_F, c),
+    if log_path:
+        try:
+            session = sessionlog.SessionWriter(log_path, size)
+        except OSError as error:
+            message = f"Warning : session not recorded ({error})"
 
-    'U': move_U,
-    "U'": lambda c: reverse_move(move_U, c),
+    scramble_sequence = []
 
-    'R': move_R,
-    "R'": lambda c: reverse_move(move_R, c),
+    move_count = 0
 
-    'L': move_L,
-    "L'": lambda c: reverse_move(move_L, c),
+    start_time = time.monotonic()
 
-    'B': move_B,
-    "B'": lambda c: reverse_move(move_B, c),
+    reader = console.LineReader()
+    reader.start()
 
-    'D': move_D,
-    "D'": lambda c: reverse_move(move_D, c)
-}
+    async def tick_timer():
 
-# ============================================================
-# DISPLAY CUBE
-# ============================================================
+        while True:
+            await asyncio.sleep(TICK_SECONDS)
+            _renderer.tick(time.monotonic() - start_time)
 
-def display_cube(cube, move_count, elapsed):
+    timer = asyncio.create_task(tick_timer())
 
-    os.system('cls' if os.name == 'nt' else 'clear')
+    while True:
 
-    print("=" * 60)
-    print("           ADVANCED RUBIK'S CUBE SIMULATOR")
-    print("=" * 60)
+        display_cube(cube, move_count, time.monotonic() - start_time, status_text(cube, message))
 
-    print(f"\nMoves Played : {move_count}")
-    print(f"Time Elapsed : {elapsed:.2f} seconds\n")
+        message = ""
 
-    print("                 UP")
+        line = await reader.readline()
 
-    for row in cube['U']:
-        print("          ", end="")
-        for cell in row:
-            print(COLORS[cell], end=" ")
-        print()
+        if line is None:
+            line = "quit"
 
-    print("\nLEFT        FRONT       RIGHT       BACK")
+        command = line.strip()
 
-    for i in range(3):
+        if not command:
+            continue
 
-        for face in ['L', 'F', 'R', 'B']:
+        # ====================================================
+        # EXIT PROGRAM
+        # ====================================================
 
-            for cell in cube[face][i]:
-                print(COLORS[cell], end=" ")
+        if command == "quit":
 
-            print("   ", end="")
+            print("\nThanks for using the simulator!")
 
-        print()
+            if session:
+                session.close()
+                print(f"Session saved to {log_path}")
 
-    print("\n                DOWN")
+            break
 
-    for row in cube['D']:
-        print("          ", end="")
-        for cell in row:
-            print(COLORS[cell], end=" ")
-        print()
+        # ====================================================
+        # HELP MENU
+        # ====================================================
 
-# ============================================================
-# CHECK IF CUBE IS SOLVED
-# ============================================================
+        elif command == "help":
 
-def is_solved(cube):
+            _renderer.invalidate()
 
-    for face in cube:
+            show_help(size)
 
-        first = cube[face][0][0]
+            print("\nPress Enter to continue...", end='', flush=True)
 
-        for row in cube[face]:
-            for cell in row:
-                if cell != first:
-                    return False
+            await reader.readline()
 
-    return True
+        # ====================================================
+        # RESET CUBE
+        # ====================================================
 
-# ============================================================
-# GENERATE SCRAMBLE
-# ============================================================
+        elif command == "reset":
 
-def generate_scramble(length=25):
+            cube = create_cube(size)
 
-    possible = list(MOVES.keys())
+            history.clear(cube)
 
-    return [random.choice(possible) for _ in range(length)]
+            if session:
+                session.reset()
 
-# ============================================================
-# HELP MENU
-# ============================================================
+            scramble_sequence.clear()
 
-def show_help():
+            move_count = 0
 
-    print("\nAVAILABLE COMMANDS")
-    print("-" * 30)
+            message = "Cube reset complete."
 
-    print("Moves:")
-    print("F  F'  U  U'  R  R'")
-    print("L  L'  B  B'  D  D'")
+        # ====================================================
+        # SCRAMBLE
+        # ====================================================
 
-    print("\nOther Commands:")
-    print("scramble  -> Shuffle cube")
-    print("reset     -> Reset cube")
-    print("undo      -> Undo moves")
-    print("history   -> Show move history")
-    print("solve     -> Auto reverse scramble")
-    print("help      -> Show commands")
-    print("quit      -> Exit program")
+        elif command == "scramble":
 
-# ============================================================
-# MAIN APPLICATION
-# ============================================================
+            scramble_sequence, scrambled = scramble_cube(cube, size)
 
-def main():
+            if scramble_rate:
+                for move in scramble_sequence:
+                    cube = moves[move](cube)
+                    move_count += 1
+                    display_cube(cube, move_count, time.monotonic() - start_time)
+                    await asyncio.sleep(1 / scramble_rate)
+            else:
+                move_count += len(scramble_sequence)
 
-    cube = create_cube()
+            cube = scrambled
 
-    history = deque(maxlen=200)
+            history.record(scramble_sequence, cube)
 
-    scramble_sequence = []
+            if session:
+                session.record(scramble_sequence)
 
-    move_count = 0
+            message = "Cube scrambled successfully.\n" + ' '.join(scramble_sequence)
 
-    start_time = time.time()
+        # ====================================================
+        # SOLVE
+        # ====================================================
 
-    print("Loading Rubik's Cube Simulator...")
+        elif command == "solve":
 
-    time.sleep(1)
+            if size not in (2, 3):
 
-    while True:
+                message = "The solvers only handle the 2x2 and 3x3 cubes."
 
-        elapsed = time.time() - start_time
+            elif is_solved(cube):
 
-        display_cube(cube, move_count, elapsed)
+                message = "Cube is already solved."
 
-        if is_solved(cube):
-            print("\nCube Status : SOLVED")
-        else:
-            print("\nCube Status : MIXED")
+            else:
 
-        command = input("\nEnter Command : ").strip()
+                if not (pocket if size == 2 else solver).tables_ready():
+                    print("\nBuilding solver tables (cached on disk after the first run)...", flush=True)
 
-        if not command:
-            continue
+                try:
+                    solution, cube = await loop.run_in_executor(None, solve_cube, cube, solutions, size)
+                except (ValueError, TimeoutError) as error:
+                    solution = None
+                    message = f"Cannot solve cube : {error}"
 
-        # ====================================================
-        # EXIT PROGRAM
-        # ====================================================
+                if solution is not None:
 
-        if command == "quit":
+                    history.record(solution, cube)
 
-            print("\nThanks for using the simulator!")
-            break
+                    if session:
+                        session.record(solution)
+
+                    move_count += len(solution)
+
+                    scramble_sequence.clear()
+
+                    message = f"Cube solved in {len(solution)} moves.\n" + ' '.join(solution)
 
         # ====================================================
-        # HELP MENU
+        # SOLVE OPTIMALLY
         # ====================================================
 
-        elif command == "help":
+        elif command == "solve optimal":
 
-            show_help()
+            if size == 2:
 
-            input("\nPress Enter to continue...")
+                message = "On the 2x2 solve already finds a shortest solution."
 
-        # ====================================================
-        # RESET CUBE
-        # ====================================================
+            elif size != 3:
 
-        elif command == "reset":
+                message = "The optimal solver only handles the 3x3 cube."
 
-            cube = create_cube()
+            elif is_solved(cube):
 
-            history.clear()
+                message = "Cube is already solved."
 
-            scramble_sequence.clear()
+            else:
 
-            move_count = 0
+                if not optimal.tables_ready():
+                    print("\nBuilding solver tables (cached on disk after the first run)...", flush=True)
 
-            print("\nCube reset complete.")
+                if optimal_solver is None:
+                    optimal_solver = optimal.OptimalSolver()
 
-            time.sleep(1)
+                print("\nSearching for a shortest solution (Ctrl+C to cancel)...", flush=True)
 
-        # ====================================================
-        # SCRAMBLE
-        # ====================================================
+                # Ctrl+C stops the search instead of the program
+                try:
+                    loop.add_signal_handler(signal.SIGINT, optimal_solver.interrupt)
+                    cancellable = True
+                except (NotImplementedError, RuntimeError):
+                    cancellable = False
 
-        elif command == "scramble":
+                try:
+                    solution = await loop.run_in_executor(
+                        None, optimal_solver.solve, engine.normalize_centers(cube)
+                    )
+                except (ValueError, TimeoutError) as error:
+                    solution = None
+                    message = f"Cannot solve cube : {error}"
+                except optimal.Cancelled:
+                    solution = None
+                    message = "Search cancelled."
+                finally:
+                    if cancellable:
+                        loop.remove_signal_handler(signal.SIGINT)
+
+                if solution is not None:
 
-            scramble_sequence = generate_scramble()
+                    for move in solution:
+                        cube = moves[move](cube)
 
-            for move in scramble_sequence:
-                cube = MOVES[move](cube)
+                    history.record(solution, cube)
 
-            history.append(scramble_sequence)
+                    if session:
+                        session.record(solution)
 
-            move_count += len(scramble_sequence)
+                    move_count += len(solution)
 
-            print("\nCube scrambled successfully.")
+                    scramble_sequence.clear()
 
-            time.sleep(1)
+                    message = f"Cube solved optimally in {len(solution)} moves.\n" + ' '.join(solution)
 
         # ====================================================
-        # SOLVE
+        # LAST LAYER CASE
         # ====================================================
 
-        elif command == "solve":
+        elif command == "case":
 
-            if scramble_sequence:
+            if size != 3:
 
-                reverse = []
+                message = "Case recognition only handles the 3x3 cube."
 
-                for move in reversed(scramble_sequence):
+            else:
 
-                    if "'" in move:
-                        reverse.append(move[0])
+                try:
+                    step, name, algorithm = lastlayer.identify(cube)
+                except ValueError as error:
+                    message = f"No last layer case : {error}"
+                else:
+                    if step == 'solved':
+                        message = "Cube is already solved."
                     else:
-                        reverse.append(move + "'")
+                        message = f"{step} case : {name}\nAlgorithm : {' '.join(algorithm)}"
 
-                for move in reverse:
-                    cube = MOVES[move](cube)
+        # ====================================================
+        # ALGORITHM ANALYSIS
+        # ====================================================
 
-                move_count += len(reverse)
+        elif command.split()[0] == "analyze":
 
-                scramble_sequence.clear()
+            algorithm = command.split()[1:]
 
-                print("\nCube solved.")
+            if not algorithm:
+
+                message = "Usage : analyze <moves>"
 
             else:
-                print("\nNo scramble history found.")
 
-            time.sleep(1)
+                try:
+                    message = analysis.analyze(algorithm, puzzle).report()
+                except ValueError as error:
+                    message = f"Invalid algorithm : {error}"
 
         # ====================================================
         # HISTORY
@@ -453,18 +508,23 @@ def main():
 
         elif command == "history":
 
+            _renderer.invalidate()
+
             print("\nMove History")
             print("-" * 30)
 
-            if history:
+            if len(history):
 
-                for i, item in enumerate(history, 1):
-                    print(f"{i}. {' '.join(item)}")
+                for i, (item, done) in enumerate(history.actions(), 1):
+                    note = "" if done else "   (undone)"
+                    print(f"{i}. {' '.join(item)}{note}")
 
             else:
                 print("No history available.")
 
-            input("\nPress Enter to continue...")
+            print("\nPress Enter to continue...", end='', flush=True)
+
+            await reader.readline()
 
         # ====================================================
         # UNDO LAST ACTION
@@ -472,30 +532,39 @@ def main():
 
         elif command == "undo":
 
-            if history:
+            if history.can_undo():
 
-                last_moves = history.pop()
+                last_moves, cube = history.undo()
 
-                reverse = []
+                if session:
+                    session.record(engine.invert_sequence(last_moves))
 
-                for move in reversed(last_moves):
+                move_count += len(last_moves)
 
-                    if "'" in move:
-                        reverse.append(move[0])
-                    else:
-                        reverse.append(move + "'")
+                message = "Undo successful."
+
+            else:
+                message = "Nothing to undo."
+
+        # ====================================================
+        # REDO UNDONE ACTION
+        # ====================================================
 
-                for move in reverse:
-                    cube = MOVES[move](cube)
+        elif command == "redo":
 
-                move_count += len(reverse)
+            if history.can_redo():
 
-                print("\nUndo successful.")
+                next_moves, cube = history.redo()
 
-            else:
-                print("\nNothing to undo.")
+                if session:
+                    session.record(next_moves)
 
-            time.sleep(1)
+                move_count += len(next_moves)
+
+                message = "Redo successful."
+
+            else:
+                message = "Nothing to redo."
 
         # ====================================================
         # PROCESS NORMAL MOVES
@@ -505,34 +574,78 @@ def main():
 
             user_moves = command.split()
 
-            valid_moves = []
+            invalid = [move for move in user_moves if move not in moves]
 
-            invalid = False
+            if invalid:
 
-            for move in user_moves:
+                message = f"Invalid move : {invalid[0]}"
 
-                if move in MOVES:
+            else:
 
-                    cube = MOVES[move](cube)
+                valid_moves = sequences.simplify(user_moves, puzzle.perms)
 
-                    valid_moves.append(move)
+                for move in valid_moves:
+                    cube = moves[move](cube)
 
-                    move_count += 1
+                move_count += len(valid_moves)
 
-                else:
+                if valid_moves:
+                    history.record(valid_moves, cube)
 
-                    print(f"\nInvalid move : {move}")
+                    if session:
+                        session.record(valid_moves)
 
-                    invalid = True
+    timer.cancel()
+    reader.close()
 
-                    break
+    if optimal_solver is not None:
+        optimal_solver.close()
 
-            if not invalid and valid_moves:
-                history.append(valid_moves)
+def main(size=3, log_path=None, scramble_rate=DEFAULT_SCRAMBLE_RATE):
+
+    asyncio.run(run(size, log_path, scramble_rate))
 
 # ============================================================
 # START PROGRAM
 # ============================================================
 
 if __name__ == "__main__":
-    main()
+
+    if len(sys.argv) > 1 and sys.argv[1] == "batch":
+        sys.exit(batch.main(sys.argv[2:]))
+
+    if len(sys.argv) > 1 and sys.argv[1] == "scrambles":
+        sys.exit(scramble.main(sys.argv[2:]))
+
+    if len(sys.argv) > 1 and sys.argv[1] == "replay":
+        sys.exit(sessionlog.main(sys.argv[2:]))
+
+    if len(sys.argv) > 1 and sys.argv[1] == "analyze":
+        sys.exit(analysis.main(sys.argv[2:]))
+
+    if len(sys.argv) > 1 and sys.argv[1] == "pocket":
+        sys.exit(pocket.main(sys.argv[2:]))
+
+    if len(sys.argv) > 1 and sys.argv[1] == "serve":
+        sys.exit(service.main(sys.argv[2:]))
+
+    parser = argparse.ArgumentParser(description="Interactive Rubik's cube simulator.")
+    parser.add_argument('--size', type=int, default=3, metavar='N',
+                        choices=range(engine.MIN_SIZE, engine.MAX_SIZE + 1),
+                        help=f"cube size from {engine.MIN_SIZE} to {engine.MAX_SIZE} (default 3)")
+
+    parser.add_argument('--log', default=None, metavar='PATH',
+                        help="session log file (default: a new file under "
+                             f"${sessionlog.SESSION_ENV} or ~/.local/share/rubiks_cube_sessions)")
+    parser.add_argument('--no-log', action='store_true', help="do not record the session")
+    parser.add_argument('--scramble-rate', type=float, default=DEFAULT_SCRAMBLE_RATE, metavar='MOVES',
+                        help=f"scramble animation speed in moves per second, 0 to skip "
+                             f"(default {DEFAULT_SCRAMBLE_RATE})")
+
+    args = parser.parse_args()
+
+    if not args.scramble_rate >= 0:
+        parser.error("--scramble-rate must be 0 or more")
+
+    main(args.size, None if args.no_log else args.log or sessionlog.new_session_path(),
+         args.scramble_rate)
@@ -0,0 +1,403 @@
+from math import isqrt
+from operator import itemgetter
+
+# ============================================================
+# STICKER LAYOUT
+# ============================================================
+#
+# A cube state is a byte string with one byte per sticker, 54 for
+# the 3x3 and 6 * N * N for an N x N x N cube. Stickers are stored
+# face by face in U R F D L B order, each face row by row as it
+# appears in the flat net printed by display_cube. Every byte holds
+# the index of the face whose colour the sticker carries, so the
+# solved 3x3 is simply 0 x 9, 1 x 9, ... 5 x 9.
+
+FACES = ('U', 'R', 'F', 'D', 'L', 'B')
+
+FACE_INDEX = {face: i for i, face in enumerate(FACES)}
+
+# colour of each face on the solved cube
+FACE_COLORS = ('W', 'B', 'R', 'Y', 'G', 'O')
+
+COLOR_INDEX = {color: i for i, color in enumerate(FACE_COLORS)}
+
+MIN_SIZE = 2
+MAX_SIZE = 7
+
+# ============================================================
+# CUBE GEOMETRY
+# ============================================================
+#
+# x points right, y points up and z points towards the viewer.
+# With k = N - 1 the cubies of an N x N x N cube sit on the grid
+# {-k, -k + 2, ..., k}^3, which keeps every coordinate an integer
+# for even N too. For every face we give the outward normal and the
+# cubie carrying sticker (row, col). Layer d of a face, counting
+# the face itself as 0, holds the cubies at k - 2d along its normal.
+
+NORMALS = {
+    'U': (0, 1, 0),
+    'R': (1, 0, 0),
+    'F': (0, 0, 1),
+    'D': (0, -1, 0),
+    'L': (-1, 0, 0),
+    'B': (0, 0, -1),
+}
+
+def _sticker_position(face, row, col, k):
+
+    if face == 'U':
+        return (2 * col - k, k, 2 * row - k)
+    if face == 'R':
+        return (k, k - 2 * row, k - 2 * col)
+    if face == 'F':
+        return (2 * col - k, k - 2 * row, k)
+    if face == 'D':
+        return (2 * col - k, -k, k - 2 * row)
+    if face == 'L':
+        return (-k, k - 2 * row, 2 * col - k)
+
+    return (k - 2 * col, k - 2 * row, -k)
+
+def _dot(a, b):
+
+    return a[0] * b[0] + a[1] * b[1] + a[2] * b[2]
+
+def _cross(a, b):
+
+    return (
+        a[1] * b[2] - a[2] * b[1],
+        a[2] * b[0] - a[0] * b[2],
+        a[0] * b[1] - a[1] * b[0]
+    )
+
+def _rotate(vector, axis):
+
+    # quarter turn clockwise when looking at the face along -axis
+    k = _dot(axis, vector)
+    c = _cross(axis, vector)
+
+    return tuple(axis[i] * k - c[i] for i in range(3))
+
+# ============================================================
+# PERMUTATIONS
+# ============================================================
+#
+# A move is a tuple perm of source indices: the new state is
+# state[perm[0]], state[perm[1]], ... which is a single gather.
+
+def compose(first, second):
+
+    # permutation equal to applying first and then second
+    return tuple(first[i] for i in second)
+
+def inverse(perm):
+
+    result = [0] * len(perm)
+
+    for target, source in enumerate(perm):
+        result[source] = target
+
+    return tuple(result)
+
+def _make_move(perm):
+
+    gather = itemgetter(*perm)
+
+    def move(state):
+
+        return bytes(gather(state))
+
+    return move
+
+# ============================================================
+# N x N x N PUZZLES
+# ============================================================
+#
+# Every move of a size is generated by rotating a set of layers
+# about a face normal, so all sizes share the same gather engine.
+# Each move X comes as X, X2 and X':
+#
+#   R U F D L B    outer face turns
+#   Rw             the two outer layers             (N >= 3)
+#   3Rw ... NRw    the n outer layers               (3 <= n < N)
+#   2R ... NR      the n-th layer on its own        (2 <= n < N)
+#   M E S          the middle layer, turning like L, D and F (odd N)
+#   x y z          the whole cube, turning like R, U and F
+
+class Puzzle:
+
+    def __init__(self, n):
+
+        if not MIN_SIZE <= n <= MAX_SIZE:
+            raise ValueError(f"cube size must be between {MIN_SIZE} and {MAX_SIZE}")
+
+        self.n = n
+        self.face_size = n * n
+        self.stickers = 6 * n * n
+        self.solved = bytes(i // self.face_size for i in range(self.stickers))
+        self.identity = tuple(range(self.stickers))
+
+        self._sticker_at = {}
+
+        for face in FACES:
+            for row in range(n):
+                for col in range(n):
+                    key = (_sticker_position(face, row, col, n - 1), NORMALS[face])
+                    self._sticker_at[key] = self.index(face, row, col)
+
+        # grid position of the cubie carrying each sticker
+        cubie_of = [None] * self.stickers
+
+        for (position, _), index in self._sticker_at.items():
+            cubie_of[index] = position
+
+        self.cubie_of = tuple(cubie_of)
+
+        self.perms = {}
+
+        for face in FACES:
+            self._add(face, [0])
+
+        self.face_turns = tuple(self.perms)
+
+        for face in FACES:
+            for depth in range(2, n):
+                self._add(face, range(depth), ('' if depth == 2 else str(depth)) + face + 'w')
+
+        for face in FACES:
+            for depth in range(2, n):
+                self._add(face, [depth - 1], str(depth) + face)
+
+        if n % 2:
+            for name, face in (('M', 'L'), ('E', 'D'), ('S', 'F')):
+                self._add(face, [n // 2], name)
+
+        for name, face in (('x', 'R'), ('y', 'U'), ('z', 'F')):
+            self._add(face, range(n), name)
+
+        self.move_names = tuple(self.perms)
+        self.turns = {name: _make_move(perm) for name, perm in self.perms.items()}
+        self.mirror = self._mirror()
+
+    def index(self, face, row, col):
+
+        return FACE_INDEX[face] * self.face_size + row * self.n + col
+
+    def _layer_turn(self, face, depths):
+
+        axis = NORMALS[face]
+        levels = {self.n - 1 - 2 * depth for depth in depths}
+
+        perm = list(self.identity)
+
+        for (position, normal), source in self._sticker_at.items():
+
+            if _dot(position, axis) not in levels:
+                continue
+
+            target = self._sticker_at[(_rotate(position, axis), _rotate(normal, axis))]
+
+            perm[target] = source
+
+        return tuple(perm)
+
+    def _add(self, face, depths, name=None):
+
+        name = name or face
+
+        quarter = self._layer_turn(face, depths)
+        half = compose(quarter, quarter)
+
+        self.perms[name] = quarter
+        self.perms[name + '2'] = half
+        self.perms[name + "'"] = compose(half, quarter)
+
+    def _mirror(self):
+
+        # reflection through the plane between L and R
+        perm = list(self.identity)
+
+        for (position, normal), source in self._sticker_at.items():
+
+            target = self._sticker_at[(
+                (-position[0], position[1], position[2]),
+                (-normal[0], normal[1], normal[2])
+            )]
+
+            perm[target] = source
+
+        return tuple(perm)
+
+    def apply_moves(self, state, moves):
+
+        turns = self.turns
+
+        for name in moves:
+            state = turns[name](state)
+
+        return state
+
+_PUZZLES = {}
+
+def size_of(state):
+
+    return isqrt(len(state) // 6)
+
+def puzzle(n):
+
+    # every size is generated once and shared
+    if n not in _PUZZLES:
+        _PUZZLES[n] = Puzzle(n)
+
+    return _PUZZLES[n]
+
+# ============================================================
+# THE 3x3x3 CUBE
+# ============================================================
+#
+# The solvers, hashing and analysis modules work on the 3x3 through
+# the names below. PERMS, TURNS and MOVE_NAMES hold the 18 outer
+# face turns in a fixed order; CUBE.perms adds the wide, slice and
+# rotation moves.
+
+CUBE = puzzle(3)
+
+STICKERS = CUBE.stickers
+
+SOLVED = CUBE.solved
+
+IDENTITY = CUBE.identity
+
+PERMS = {name: CUBE.perms[name] for name in CUBE.face_turns}
+
+MOVE_NAMES = tuple(PERMS)
+
+# whole cube rotations x, y and z turn the cube like R, U and F
+ROTATIONS = {name: CUBE.perms[name] for name in ('x', 'y', 'z')}
+
+MIRROR = CUBE.mirror
+
+def conjugate(state, rotation):
+
+    # the same cube seen after a whole cube rotation (or in the
+    # MIRROR), recoloured so every centre is back on its own face
+    recolor = [0] * 6
+
+    for face in range(6):
+        recolor[rotation[face * 9 + 4] // 9] = face
+
+    return bytes(recolor[state[i]] for i in rotation)
+
+def normalize_centers(state):
+
+    # slice moves and rotations carry the centres away from their
+    # faces; renaming the colours after the centre each face now
+    # shows gives the equivalent state the solvers expect
+    recolor = bytearray(range(256))
+
+    for face in range(6):
+        recolor[state[face * 9 + 4]] = face
+
+    return bytes(state).translate(recolor)
+
+# ============================================================
+# INVERTING MOVES
+# ============================================================
+
+def inverse_move(name):
+
+    if name.endswith("'"):
+        return name[:-1]
+
+    if name.endswith('2'):
+        return name
+
+    return name + "'"
+
+def invert_sequence(moves):
+
+    return [inverse_move(name) for name in reversed(moves)]
+
+# ============================================================
+# APPLYING MOVES
+# ============================================================
+
+TURNS = {name: CUBE.turns[name] for name in MOVE_NAMES}
+
+def apply_move(state, name):
+
+    return TURNS[name](state)
+
+def apply_moves(state, moves):
+
+    for name in moves:
+        state = TURNS[name](state)
+
+    return state
+
+def sequence_perm(moves, cube=CUBE):
+
+    perm = cube.identity
+
+    for name in moves:
+        perm = compose(perm, cube.perms[name])
+
+    return perm
+
+# ============================================================
+# STATE QUERIES
+# ============================================================
+
+def solved_state():
+
+    return SOLVED
+
+def is_solved(state):
+
+    # works for every size: each face shows a single colour
+    size = len(state) // 6
+
+    for start in range(0, len(state), size):
+
+        if state[start:start + size] != state[start:start + 1] * size:
+            return False
+
+    return True
+
+def face_rows(state, face):
+
+    n = size_of(state)
+    start = FACE_INDEX[face] * n * n
+
+    return [
+        [FACE_COLORS[state[start + row * n + col]] for col in range(n)]
+        for row in range(n)
+    ]
+
+# ============================================================
+# DICT ADAPTER
+# ============================================================
+#
+# The original simulator kept the cube as a dict of 3x3 lists of
+# colour letters keyed by face. These helpers convert between
+# that form (N x N lists for other sizes) and the compact state.
+
+def to_dict(state):
+
+    return {face: face_rows(state, face) for face in FACES}
+
+def from_dict(cube):
+
+    n = len(cube['U'])
+    stickers = bytearray(6 * n * n)
+
+    for face in FACES:
+
+        start = FACE_INDEX[face] * n * n
+
+        for row in range(n):
+            for col in range(n):
+                stickers[start + row * n + col] = COLOR_INDEX[cube[face][row][col]]
+
+    return bytes(stickers)
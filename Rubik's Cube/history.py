@@ -0,0 +1,143 @@
+# ============================================================
+# SNAPSHOT HISTORY
+# ============================================================
+#
+# Every action (a scramble, a solve, a line of typed moves) is
+# stored together with the 54 byte cube state it produced. Undo,
+# redo and jumping to any earlier point just move a cursor and
+# hand back the stored state, so their cost does not depend on how
+# many moves the action contained or how far back the jump goes.
+#
+# History depth is bounded only by a memory budget. When the
+# estimated size of all entries goes over it, the oldest entries
+# are dropped and the first kept state becomes the new starting
+# point.
+
+DEFAULT_BUDGET = 64 * 1024 * 1024
+
+# rough per-entry cost of the tuple, the list and the bytes object
+# on top of the 54 state bytes and the move names themselves
+ENTRY_OVERHEAD = 200
+
+def entry_size(moves, state):
+
+    return ENTRY_OVERHEAD + len(state) + sum(len(move) + 50 for move in moves)
+
+class History:
+
+    def __init__(self, state, budget=DEFAULT_BUDGET):
+
+        self.budget = budget
+        self.clear(state)
+
+    def clear(self, state):
+
+        # entries[start] is the oldest state still reachable; each
+        # later entry is (moves, state after those moves)
+        self._entries = [((), bytes(state))]
+        self._start = 0
+        self._cursor = 0
+        self._size = entry_size((), state)
+
+    @property
+    def state(self):
+
+        return self._entries[self._cursor][1]
+
+    @property
+    def position(self):
+
+        # number of actions between the oldest kept state and now
+        return self._cursor - self._start
+
+    def __len__(self):
+
+        # number of actions that can be undone or redone
+        return len(self._entries) - 1 - self._start
+
+    def can_undo(self):
+
+        return self._cursor > self._start
+
+    def can_redo(self):
+
+        return self._cursor < len(self._entries) - 1
+
+    def actions(self):
+
+        # (moves, is_current_or_earlier) for every kept action
+        return [
+            (moves, index <= self._cursor)
+            for index, (moves, _) in enumerate(self._entries)
+            if index > self._start
+        ]
+
+    def record(self, moves, state):
+
+        # a new action after some undos discards the redo branch
+        while len(self._entries) - 1 > self._cursor:
+            dropped_moves, dropped_state = self._entries.pop()
+            self._size -= entry_size(dropped_moves, dropped_state)
+
+        moves = tuple(moves)
+        state = bytes(state)
+
+        self._entries.append((moves, state))
+        self._cursor += 1
+        self._size += entry_size(moves, state)
+
+        self._trim()
+
+    def undo(self):
+
+        # returns (moves that were undone, new state)
+        if not self.can_undo():
+            raise IndexError("nothing to undo")
+
+        moves = self._entries[self._cursor][0]
+        self._cursor -= 1
+
+        return moves, self.state
+
+    def redo(self):
+
+        # returns (moves that were redone, new state)
+        if not self.can_redo():
+            raise IndexError("nothing to redo")
+
+        self._cursor += 1
+
+        return self._entries[self._cursor][0], self.state
+
+    def goto(self, position):
+
+        # position 0 is the oldest kept state, len(self) the newest
+        if not 0 <= position <= len(self):
+            raise IndexError("no such point in history")
+
+        self._cursor = self._start + position
+
+        return self.state
+
+    def _trim(self):
+
+        entries = self._entries
+
+        while self._size > self.budget and self._start < self._cursor:
+
+            moves, state = entries[self._start]
+            self._size -= entry_size(moves, state)
+            entries[self._start] = None
+            self._start += 1
+
+            # the new oldest entry becomes a plain starting point
+            base_moves, base_state = entries[self._start]
+            self._size -= entry_size(base_moves, base_state) - entry_size((), base_state)
+            entries[self._start] = ((), base_state)
+
+        # drop dead slots once they make up half of the list, which
+        # keeps trimming amortised constant time
+        if self._start and self._start * 2 >= len(entries):
+            del entries[:self._start]
+            self._cursor -= self._start
+            self._start = 0
@@ -0,0 +1,242 @@
+import engine
+
+# ============================================================
+# LAST LAYER CASE INDEX
+# ============================================================
+#
+# Recognises the OLL and PLL case on the U layer of a cube whose
+# first two layers are solved and looks up an algorithm for it.
+#
+# Only the 12 side stickers of the U layer are read:
+#
+#   OLL key  one bit per sticker, set when it shows the U colour.
+#            Every U layer piece has exactly one U coloured sticker,
+#            so these 12 bits fix the whole orientation pattern.
+#   PLL key  two bits per sticker, its colour's place in the F R B
+#            L cycle relative to the first sticker. Turning the
+#            layer shifts every colour by the same step, so the key
+#            does not depend on the AUF needed after the algorithm.
+#
+# Every case is stored under all four U turns of its pattern, each
+# with the U turn that brings it to the position the algorithm
+# expects, so recognition is one dict lookup.
+
+U = engine.FACE_INDEX['U']
+
+SIDE_FACES = ('F', 'R', 'B', 'L')
+
+# the top row of F, R, B and L
+SIDE_STICKERS = tuple(
+    engine.FACE_INDEX[face] * 9 + col
+    for face in SIDE_FACES
+    for col in range(3)
+)
+
+# place of each side colour in the order a U turn moves colours
+CYCLE = {engine.FACE_INDEX[face]: i for i, face in enumerate(SIDE_FACES)}
+
+# stickers outside the U layer, which the algorithms must keep
+F2L_STICKERS = tuple(
+    i for i in range(engine.STICKERS)
+    if i // 9 != U and not (i // 9 != engine.FACE_INDEX['D'] and i % 9 < 3)
+)
+
+AUF = ('', 'U', 'U2', "U'")
+
+OLL = {
+    'OLL 1': "R U2 R2 F R F' U2 R' F R F'",
+    'OLL 2': "F R U R' U' F' Fw R U R' U' Fw'",
+    'OLL 3': "Fw R U R' U' Fw' U' F R U R' U' F'",
+    'OLL 4': "Fw R U R' U' Fw' U F R U R' U' F'",
+    'OLL 5': "Rw' U2 R U R' U Rw",
+    'OLL 6': "Rw U2 R' U' R U' Rw'",
+    'OLL 7': "Rw U R' U R U2 Rw'",
+    'OLL 8': "Lw' U' L U' L' U2 Lw",
+    'OLL 9': "R U R' U' R' F R2 U R' U' F'",
+    'OLL 10': "R U R' U R' F R F' R U2 R'",
+    'OLL 11': "Rw U R' U R' F R F' R U2 Rw'",
+    'OLL 12': "M' R' U' R U' R' U2 R U' R Rw'",
+    'OLL 13': "F U R U' R2 F' R U R U' R'",
+    'OLL 14': "R' F R U R' F' R F U' F'",
+    'OLL 15': "Rw' U' Rw R' U' R U Rw' U Rw",
+    'OLL 16': "Rw U Rw' R U R' U' Rw U' Rw'",
+    'OLL 17': "R U R' U R' F R F' U2 R' F R F'",
+    'OLL 18': "Rw U R' U R U2 Rw2 U' R U' R' U2 Rw",
+    'OLL 19': "M U R U R' U' M' R' F R F'",
+    'OLL 20': "Rw U R' U' M2 U R U' R' U' M'",
+    'OLL 21': "R U2 R' U' R U R' U' R U' R'",
+    'OLL 22': "R U2 R2 U' R2 U' R2 U2 R",
+    'OLL 23': "R2 D' R U2 R' D R U2 R",
+    'OLL 24': "Rw U R' U' Rw' F R F'",
+    'OLL 25': "F' Rw U R' U' Rw' F R",
+    'OLL 26': "R U2 R' U' R U' R'",
+    'OLL 27': "R U R' U R U2 R'",
+    'OLL 28': "Rw U R' U' Rw' R U R U' R'",
+    'OLL 29': "R U R' U' R U' R' F' U' F R U R'",
+    'OLL 30': "F R' F R2 U' R' U' R U R' F2",
+    'OLL 31': "R' U' F U R U' R' F' R",
+    'OLL 32': "L U F' U' L' U L F L'",
+    'OLL 33': "R U R' U' R' F R F'",
+    'OLL 34': "R U R2 U' R' F R U R U' F'",
+    'OLL 35': "R U2 R2 F R F' R U2 R'",
+    'OLL 36': "L' U' L U' L' U L U L F' L' F",
+    'OLL 37': "F R' F' R U R U' R'",
+    'OLL 38': "R U R' U R U' R' U' R' F R F'",
+    'OLL 39': "L F' L' U' L U F U' L'",
+    'OLL 40': "R' F R U R' U' F' U R",
+    'OLL 41': "R U R' U R U2 R' F R U R' U' F'",
+    'OLL 42': "R' U' R U' R' U2 R F R U R' U' F'",
+    'OLL 43': "F' U' L' U L F",
+    'OLL 44': "F U R U' R' F'",
+    'OLL 45': "F R U R' U' F'",
+    'OLL 46': "R' U' R' F R F' U R",
+    'OLL 47': "R' U' R' F R F' R' F R F' U R",
+    'OLL 48': "F R U R' U' R U R' U' F'",
+    'OLL 49': "Rw U' Rw2 U Rw2 U Rw2 U' Rw",
+    'OLL 50': "Rw' U Rw2 U' Rw2 U' Rw2 U Rw'",
+    'OLL 51': "F U R U' R' U R U' R' F'",
+    'OLL 52': "R U R' U R U' B U' B' R'",
+    'OLL 53': "Lw' U2 L U L' U' L U L' U Lw",
+    'OLL 54': "Rw U2 R' U' R U R' U' R U' Rw'",
+    'OLL 55': "R' F R U R U' R2 F' R2 U' R' U R U R'",
+    'OLL 56': "Rw' U' Rw U' R' U R U' R' U R Rw' U Rw",
+    'OLL 57': "R U R' U' M' U R U' Rw'",
+}
+
+PLL = {
+    'Aa': "R' F R' B2 R F' R' B2 R2",
+    'Ab': "R B' R F2 R' B R F2 R2",
+    'E': "x' R U' R' D R U R' D' R U R' D R U' R' D' x",
+    'F': "R' U' F' R U R' U' R' F R2 U' R' U' R U R' U R",
+    'Ga': "R2 U R' U R' U' R U' R2 U' D R' U R D'",
+    'Gb': "R' U' R U D' R2 U R' U R U' R U' R2 D",
+    'Gc': "R2 U' R U' R U R' U R2 U D' R U' R' D",
+    'Gd': "R U R' U' D R2 U' R U' R' U R' U R2 D'",
+    'H': "M2 U M2 U2 M2 U M2",
+    'Ja': "R' U L' U2 R U' R' U2 R L",
+    'Jb': "R U R' F' R U R' U' R' F R2 U' R'",
+    'Na': "R U R' U R U R' F' R U R' U' R' F R2 U' R' U2 R U' R'",
+    'Nb': "R' U R U' R' F' U' F R U R' F R' F' R U' R",
+    'Ra': "R U' R' U' R U R D R' U' R D' R' U2 R'",
+    'Rb': "R2 F R U R U' R' F' R U2 R' U2 R",
+    'T': "R U R' U' R' F R2 U' R' U' R U R' F'",
+    'Ua': "M2 U M U2 M' U M2",
+    'Ub': "M2 U' M U2 M' U' M2",
+    'V': "R U' R U R' D R D' R U' D R2 U R2 D' R2",
+    'Y': "F R U' R' U' R U R' F' R U R' U' R' F R F'",
+    'Z': "M' U M2 U M2 U M' U2 M2",
+}
+
+# ============================================================
+# KEYS
+# ============================================================
+
+def f2l_solved(state):
+
+    return all(state[i] == i // 9 for i in F2L_STICKERS)
+
+def oll_key(state):
+
+    key = 0
+
+    for i in SIDE_STICKERS:
+        key = key << 1 | (state[i] == U)
+
+    return key
+
+def pll_key(state):
+
+    first = CYCLE[state[SIDE_STICKERS[0]]]
+    key = 0
+
+    for i in SIDE_STICKERS:
+        key = key << 2 | (CYCLE[state[i]] - first) & 3
+
+    return key
+
+# ============================================================
+# TABLES
+# ============================================================
+
+def _build(algorithms, key):
+
+    # key -> (case name, pre-AUF, algorithm moves)
+    table = {}
+
+    for name, text in algorithms.items():
+
+        moves = text.split()
+        after = engine.CUBE.apply_moves(engine.SOLVED, moves)
+
+        if not f2l_solved(after) or not all(after[i * 9 + 4] == i for i in range(6)):
+            raise ValueError(f"{name} does not keep the first two layers")
+
+        case = engine.CUBE.apply_moves(engine.SOLVED, engine.invert_sequence(moves))
+
+        for turn in AUF:
+
+            state = engine.CUBE.apply_moves(case, turn.split())
+            value = (name, engine.inverse_move(turn) if turn else '', moves)
+            entry = table.setdefault(key(state), value)
+
+            if entry[0] != name:
+                raise ValueError(f"{name} and {entry[0]} are the same case")
+
+    return table
+
+OLL_TABLE = _build(OLL, oll_key)
+
+PLL_TABLE = _build(PLL, pll_key)
+
+# ============================================================
+# RECOGNITION
+# ============================================================
+
+def _post_auf(state):
+
+    for turn in AUF:
+        if engine.is_solved(engine.CUBE.apply_moves(state, turn.split())):
+            return turn
+
+    return None
+
+def identify(state):
+
+    # returns (step, case name, moves) where step is 'OLL', 'PLL'
+    # or 'solved'; moves take the cube through that step, AUF
+    # included. Raises ValueError when the first two layers are not
+    # solved with the last layer on top.
+    state = engine.normalize_centers(state)
+
+    if not f2l_solved(state):
+        raise ValueError("the first two layers are not solved")
+
+    if engine.is_solved(state):
+        return 'solved', None, []
+
+    if state[U * 9:U * 9 + 9] != bytes([U]) * 9:
+
+        entry = OLL_TABLE.get(oll_key(state))
+
+        if entry is None:
+            raise ValueError("the last layer cannot be reached with legal moves")
+
+        name, pre, moves = entry
+
+        return 'OLL', name, ([pre] if pre else []) + moves
+
+    entry = PLL_TABLE.get(pll_key(state))
+
+    if entry is None:
+        # a U turn away from solved
+        return 'PLL', 'AUF', [_post_auf(state)]
+
+    name, pre, moves = entry
+    moves = ([pre] if pre else []) + moves
+
+    post = _post_auf(engine.CUBE.apply_moves(state, moves))
+
+    if post is None:
+        raise ValueError("the last layer cannot be reached with legal moves")
+
+    return 'PLL', name, moves + ([post] if post else [])
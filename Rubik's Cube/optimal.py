@@ -0,0 +1,388 @@
+import multiprocessing
+import os
+import threading
+
+import engine
+import solver
+import symmetry
+import tablecache
+
+# ============================================================
+# OPTIMAL SOLVER
+# ============================================================
+#
+# Plain IDA* over all 18 face turns, returning a shortest
+# solution. The lower bound is the largest of
+#
+#   - the phase 1 slice/twist and slice/flip pruning values, read
+#     once for each of the three axes (the cube is looked at after
+#     a whole cube rotation so that the R-L and F-B middle layers
+#     play the role of the U-D middle layer)
+#   - the distance of the corner permutation from solved
+#
+# Each depth iteration is split into the 18 first-move subtrees
+# and handed to a process pool. The tables are the mmap'd cache
+# files, so all workers share one copy of them through the page
+# cache. As soon as one worker finds a solution it sets a shared
+# event and the others abandon their subtrees.
+
+N_MOVES = solver.N_MOVES
+N_TWIST = solver.N_TWIST
+N_FLIP = solver.N_FLIP
+
+# rotations bringing the U-D, R-L and F-B axes onto the U-D axis
+AXIS_ROTATIONS = (engine.IDENTITY, engine.ROTATIONS['z'], engine.ROTATIONS['x'])
+
+def _move_map(rotation):
+
+    # move index m on the cube becomes move_map[m] on the rotated cube
+    mapping = symmetry.move_map(rotation)
+
+    return tuple(engine.MOVE_NAMES.index(mapping[name]) for name in engine.MOVE_NAMES)
+
+MOVE_MAPS = tuple(_move_map(rotation) for rotation in AXIS_ROTATIONS)
+
+# ============================================================
+# TABLES
+# ============================================================
+
+TABLE_VERSION = 1
+
+_cache = tablecache.TableCache(
+    'optimal', tablecache.content_hash(TABLE_VERSION, solver.TABLE_DIGEST)
+)
+
+def _corner_pruning_table():
+
+    corner_move = solver.get_table('corner_perm')
+
+    depths = bytearray([solver.UNKNOWN]) * solver.N_CORNER_PERM
+    depths[0] = 0
+
+    frontier = [0]
+    depth = 0
+
+    while frontier:
+
+        depth += 1
+        following = []
+
+        for corner in frontier:
+            for m in range(N_MOVES):
+
+                target = corner_move[corner * N_MOVES + m]
+
+                if depths[target] == solver.UNKNOWN:
+                    depths[target] = depth
+                    following.append(target)
+
+        frontier = following
+
+    return tablecache.pack_nibbles(depths)
+
+def load_tables():
+
+    tables = {name: solver.get_table(name) for name in (
+        'twist', 'flip', 'slice', 'corner_perm', 'slice_twist_prun', 'slice_flip_prun'
+    )}
+
+    tables['corner_prun'] = _cache.load('corner_prun', _corner_pruning_table)
+
+    return tables
+
+def tables_ready():
+
+    return solver.tables_ready() and _cache.exists('corner_prun')
+
+# ============================================================
+# COORDINATES
+# ============================================================
+
+def coordinates(state):
+
+    # twist, flip and slice for each axis, then the corner permutation
+    coords = []
+
+    for rotation in AXIS_ROTATIONS:
+
+        _, co, ep, eo = solver.to_cubies(engine.conjugate(state, rotation))
+
+        coords += [solver.get_twist(co), solver.get_flip(eo), solver.get_slice(ep)]
+
+    cp = solver.to_cubies(state)[0]
+
+    coords.append(solver.get_corner_perm(cp))
+
+    return tuple(coords)
+
+# ============================================================
+# SEARCH
+# ============================================================
+
+class Cancelled(Exception):
+    pass
+
+_NEXT = {
+    last_face: tuple(
+        (m, m // 3) for m in range(N_MOVES) if solver._allowed(m // 3, last_face)
+    )
+    for last_face in range(-1, 6)
+}
+
+class _Search:
+
+    def __init__(self, tables, cancel=None):
+
+        self.twist_move = tables['twist']
+        self.flip_move = tables['flip']
+        self.slice_move = tables['slice']
+        self.corner_move = tables['corner_perm']
+        self.slice_twist_prun = tables['slice_twist_prun']
+        self.slice_flip_prun = tables['slice_flip_prun']
+        self.corner_prun = tables['corner_prun']
+
+        self.cancel = cancel
+        self.nodes = 0
+
+    def step(self, coords, m):
+
+        twist_move = self.twist_move
+        flip_move = self.flip_move
+        slice_move = self.slice_move
+
+        result = []
+
+        for axis, move_map in enumerate(MOVE_MAPS):
+
+            k = move_map[m]
+            t, f, s = coords[3 * axis:3 * axis + 3]
+
+            result += [
+                twist_move[t * N_MOVES + k],
+                flip_move[f * N_MOVES + k],
+                slice_move[s * N_MOVES + k]
+            ]
+
+        result.append(self.corner_move[coords[9] * N_MOVES + m])
+
+        return result
+
+    def bound(self, coords):
+
+        st = self.slice_twist_prun
+        sf = self.slice_flip_prun
+
+        i = coords[9]
+        best = (self.corner_prun[i >> 1] >> ((i & 1) << 2)) & 15
+
+        for axis in range(3):
+
+            t, f, s = coords[3 * axis:3 * axis + 3]
+
+            i = s * N_TWIST + t
+            best = max(best, (st[i >> 1] >> ((i & 1) << 2)) & 15)
+
+            i = s * N_FLIP + f
+            best = max(best, (sf[i >> 1] >> ((i & 1) << 2)) & 15)
+
+        return best
+
+    def search(self, state, coords, depth, last_face, moves):
+
+        # depth-first search for a solution of exactly depth moves
+        if depth == 0:
+            return engine.is_solved(engine.apply_moves(state, [engine.MOVE_NAMES[m] for m in moves]))
+
+        self.nodes += 1
+
+        if self.cancel is not None and self.nodes & 0xFFF == 0 and self.cancel.is_set():
+            raise Cancelled()
+
+        for m, face in _NEXT[last_face]:
+
+            child = self.step(coords, m)
+
+            if self.bound(child) >= depth:
+                continue
+
+            moves.append(m)
+
+            if self.search(state, child, depth - 1, face, moves):
+                return True
+
+            moves.pop()
+
+        return False
+
+# ============================================================
+# WORKER PROCESSES
+# ============================================================
+
+_worker = None
+
+def _init_worker(cancel):
+
+    global _worker
+
+    _worker = _Search(load_tables(), cancel)
+
+def _search_subtree(task):
+
+    # returns the move indices of a solution starting with first
+    # and exactly depth moves long, or None
+    state, coords, first, depth = task
+
+    # subtrees still queued when the search is cancelled are skipped
+    if _worker.cancel.is_set():
+        return None
+
+    child = _worker.step(coords, first)
+
+    if _worker.bound(child) >= depth:
+        return None
+
+    moves = [first]
+
+    try:
+        if _worker.search(state, child, depth - 1, first // 3, moves):
+            _worker.cancel.set()
+            return moves
+    except Cancelled:
+        pass
+
+    return None
+
+# ============================================================
+# PUBLIC API
+# ============================================================
+
+class OptimalSolver:
+
+    # keeps a warm pool so many cubes can be solved in a row:
+    #
+    #     with OptimalSolver() as opt:
+    #         for state in states:
+    #             print(opt.solve(state))
+
+    def __init__(self, processes=None):
+
+        self.processes = processes or os.cpu_count() or 1
+
+        # build any missing tables before the workers map them
+        self.tables = load_tables()
+
+        self.pool = None
+        self.cancel = multiprocessing.Event()
+        self.interrupted = False
+        self.expired = False
+
+        if self.processes > 1:
+            self.pool = multiprocessing.Pool(
+                self.processes, initializer=_init_worker, initargs=(self.cancel,)
+            )
+
+    def solve(self, state, max_depth=20, timeout=None):
+
+        solver.verify(state)
+
+        if engine.is_solved(state):
+            return []
+
+        self.interrupted = False
+        self.expired = False
+        self.cancel.clear()
+
+        # the searches poll the cancel event every 4096 nodes, so the
+        # timer stops a long depth iteration part way through
+        timer = None
+
+        if timeout is not None:
+            timer = threading.Timer(timeout, self._expire)
+            timer.daemon = True
+            timer.start()
+
+        coords = coordinates(state)
+        local = _Search(self.tables, self.cancel)
+
+        try:
+            for depth in range(local.bound(coords), max_depth + 1):
+
+                if self.pool is None:
+                    moves = []
+                    try:
+                        found = local.search(state, coords, depth, -1, moves)
+                    except Cancelled:
+                        found = False
+                    solution = moves if found else None
+                else:
+                    solution = self._parallel_depth(state, coords, depth)
+
+                if solution is not None:
+                    return [engine.MOVE_NAMES[m] for m in solution]
+
+                if self.interrupted:
+                    raise Cancelled("search cancelled")
+
+                if self.expired:
+                    raise TimeoutError(f"no solution within {timeout} s, searched up to {depth} moves")
+
+        finally:
+            if timer is not None:
+                timer.cancel()
+
+        raise ValueError(f"no solution within {max_depth} moves")
+
+    def interrupt(self):
+
+        # stops a solve running in another thread, which then raises
+        # Cancelled; safe to call from a signal handler
+        self.interrupted = True
+        self.cancel.set()
+
+    def _expire(self):
+
+        # runs on the timer thread when the timeout is reached
+        self.expired = True
+        self.cancel.set()
+
+    def _parallel_depth(self, state, coords, depth):
+
+        # an interrupt or timeout that lands before the clear() must survive it
+        self.cancel.clear()
+
+        if self.interrupted or self.expired:
+            self.cancel.set()
+
+        tasks = [(state, coords, m, depth) for m in range(N_MOVES)]
+
+        found = []
+
+        for result in self.pool.imap_unordered(_search_subtree, tasks):
+
+            if result is not None and not found:
+                found.append(result)
+
+        if not (self.interrupted or self.expired):
+            self.cancel.clear()
+
+        return found[0] if found else None
+
+    def close(self):
+
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool.join()
+            self.pool = None
+
+    def __enter__(self):
+
+        return self
+
+    def __exit__(self, *exc):
+
+        self.close()
+
+def solve_optimal(state, processes=None, max_depth=20, timeout=None):
+
+    with OptimalSolver(processes) as opt:
+        return opt.solve(state, max_depth, timeout)
@@ -0,0 +1,378 @@
+import argparse
+import time
+from array import array
+
+import engine
+import solver
+import tablecache
+
+# ============================================================
+# 2x2x2 STATE SPACE
+# ============================================================
+#
+# The 2x2 cube has no centres, so with the DBL corner held in place
+# every position is reached with U, R and F turns alone. The other
+# seven corners give two coordinates:
+#
+#   perm   rank of the order of the seven corners      5040 values
+#   twist  twist of the first six, base 3 (the seventh
+#          follows from the sum)                         729 values
+#
+# and index = perm * 729 + twist numbers all 3,674,160 positions.
+# A breadth-first search from solved fills one byte per position
+# with its distance in face turns; the table is stored with the
+# solver tables and doubles as a perfect solver, since from any
+# position one move always leads to a position one closer.
+
+MOVES = ('U', 'U2', "U'", 'R', 'R2', "R'", 'F', 'F2', "F'")
+
+N_MOVES = len(MOVES)
+
+N_PERM = 5040
+N_TWIST = 729
+N_STATES = N_PERM * N_TWIST
+
+UNKNOWN = 0xFF
+
+TABLE_VERSION = 1
+
+# the seven corners that move, by their index in solver's
+# URF UFL ULB UBR DFR DLF DBL DRB order
+FREE = (0, 1, 2, 3, 4, 5, 7)
+
+FIXED = 6
+
+PUZZLE = engine.puzzle(2)
+
+def _facelet(index):
+
+    # a 3x3 corner sticker index to the same sticker on the 2x2
+    face, pos = divmod(index, 9)
+
+    return face * 4 + (pos // 6) * 2 + (pos % 3) // 2
+
+CORNER_FACELETS = tuple(
+    tuple(_facelet(i) for i in facelets)
+    for facelets in solver.CORNER_FACELETS
+)
+
+# ============================================================
+# COORDINATES
+# ============================================================
+
+def _corner_cubies(name):
+
+    cp, co, _, _ = solver.MOVE_CUBIES[engine.MOVE_NAMES.index(name)]
+
+    return cp, co
+
+MOVE_CORNERS = tuple(_corner_cubies(name) for name in MOVES)
+
+def get_perm(cp):
+
+    return solver._perm_rank([FREE.index(cp[i]) for i in FREE])
+
+def set_perm(rank):
+
+    cp = [FIXED] * 8
+
+    for i, piece in zip(FREE, solver._perm_unrank(rank, 7)):
+        cp[i] = FREE[piece]
+
+    return cp
+
+def get_twist(co):
+
+    twist = 0
+
+    for i in FREE[:6]:
+        twist = twist * 3 + co[i]
+
+    return twist
+
+def set_twist(twist):
+
+    co = [0] * 8
+
+    for i in reversed(FREE[:6]):
+        co[i] = twist % 3
+        twist //= 3
+
+    co[FREE[6]] = -sum(co) % 3
+
+    return co
+
+def _perm_table():
+
+    table = array('H', bytes(2 * N_PERM * N_MOVES))
+
+    for rank in range(N_PERM):
+
+        cp = set_perm(rank)
+
+        for m, (mcp, _) in enumerate(MOVE_CORNERS):
+            table[rank * N_MOVES + m] = get_perm([cp[mcp[i]] for i in range(8)])
+
+    return table
+
+def _twist_table():
+
+    table = array('H', bytes(2 * N_TWIST * N_MOVES))
+
+    for twist in range(N_TWIST):
+
+        co = set_twist(twist)
+
+        for m, (mcp, mco) in enumerate(MOVE_CORNERS):
+            table[twist * N_MOVES + m] = get_twist([(co[mcp[i]] + mco[i]) % 3 for i in range(8)])
+
+    return table
+
+# ============================================================
+# BREADTH-FIRST SEARCH
+# ============================================================
+
+def _bfs_numpy(perm_move, twist_move, np):
+
+    # one vectorised step per depth: the whole frontier is expanded
+    # by each move at once
+    perm_move = np.frombuffer(perm_move, dtype=np.uint16).reshape(N_PERM, N_MOVES)
+    twist_move = np.frombuffer(twist_move, dtype=np.uint16).reshape(N_TWIST, N_MOVES)
+
+    depth = np.full(N_STATES, UNKNOWN, dtype=np.uint8)
+    depth[0] = 0
+
+    frontier = np.zeros(1, dtype=np.int64)
+    level = 0
+
+    while len(frontier):
+
+        perm, twist = np.divmod(frontier, N_TWIST)
+        found = []
+
+        for m in range(N_MOVES):
+
+            children = perm_move[perm, m].astype(np.int64) * N_TWIST + twist_move[twist, m]
+            children = children[depth[children] == UNKNOWN]
+
+            depth[children] = level + 1
+            found.append(children)
+
+        frontier = np.unique(np.concatenate(found))
+        level += 1
+
+    return depth.tobytes()
+
+def _bfs_python(perm_move, twist_move):
+
+    depth = bytearray([UNKNOWN]) * N_STATES
+    depth[0] = 0
+
+    frontier = [0]
+    level = 0
+
+    while frontier:
+
+        next_frontier = []
+        append = next_frontier.append
+        level += 1
+
+        for index in frontier:
+
+            perm, twist = divmod(index, N_TWIST)
+            p = perm * N_MOVES
+            t = twist * N_MOVES
+
+            for m in range(N_MOVES):
+
+                child = perm_move[p + m] * N_TWIST + twist_move[t + m]
+
+                if depth[child] == UNKNOWN:
+                    depth[child] = level
+                    append(child)
+
+        frontier = next_frontier
+
+    return bytes(depth)
+
+def enumerate_states():
+
+    # returns the depth of every position as bytes
+    perm_move = _perm_table()
+    twist_move = _twist_table()
+
+    try:
+        import numpy as np
+    except ImportError:
+        return _bfs_python(perm_move, twist_move)
+
+    return _bfs_numpy(perm_move, twist_move, np)
+
+# ============================================================
+# CACHED TABLES
+# ============================================================
+
+TABLE_DIGEST = tablecache.content_hash(TABLE_VERSION, MOVES, FREE, MOVE_CORNERS)
+
+_cache = tablecache.TableCache('pocket', TABLE_DIGEST)
+
+_tables = {}
+
+def load_tables():
+
+    if not _tables:
+        _tables['perm'] = _cache.load('perm', _perm_table, 'H')
+        _tables['twist'] = _cache.load('twist', _twist_table, 'H')
+        _tables['depth'] = _cache.load('depth', enumerate_states, 'B')
+
+    return _tables
+
+def tables_ready():
+
+    return bool(_tables) or _cache.exists('depth')
+
+def distribution(depth):
+
+    # {depth: number of positions}, counted in C one value at a time
+    data = bytes(depth)
+
+    return {d: data.count(d) for d in sorted(set(data))}
+
+# ============================================================
+# PERFECT SOLVER
+# ============================================================
+
+def _rotations():
+
+    # the 24 whole cube rotations of the 2x2 as gathers
+    found = {PUZZLE.identity}
+    frontier = [PUZZLE.identity]
+
+    while frontier:
+        perm = frontier.pop()
+        for name in ('x', 'y'):
+            child = engine.compose(perm, PUZZLE.perms[name])
+            if child not in found:
+                found.add(child)
+                frontier.append(child)
+
+    return tuple(sorted(found))
+
+ROTATIONS = _rotations()
+
+_FACE_TURN = {PUZZLE.perms[name]: name for name in PUZZLE.face_turns}
+
+_HOME = tuple(PUZZLE.solved[i] for i in CORNER_FACELETS[FIXED])
+
+def coordinates(state):
+
+    # (index, rotation) for a 2x2 state in any orientation; the
+    # rotation turns the cube so the D, B and L coloured corner
+    # sits at DBL the right way round
+    for rotation in ROTATIONS:
+
+        view = bytes(state[i] for i in rotation)
+
+        if tuple(view[i] for i in CORNER_FACELETS[FIXED]) == _HOME:
+            break
+    else:
+        raise ValueError("no corner with the D, B and L colours")
+
+    cp = []
+    co = []
+
+    for facelets in CORNER_FACELETS:
+
+        colors = [view[i] for i in facelets]
+
+        for ori in range(3):
+            if colors[ori] in (0, 3):
+                break
+        else:
+            raise ValueError("corner without a U or D sticker")
+
+        key = (colors[ori], colors[(ori + 1) % 3], colors[(ori + 2) % 3])
+
+        if key not in solver.CORNER_COLORS:
+            raise ValueError("impossible corner colours")
+
+        cp.append(solver.CORNER_COLORS.index(key))
+        co.append(ori)
+
+    if len(set(cp)) != 8:
+        raise ValueError("duplicate pieces")
+
+    if sum(co) % 3:
+        raise ValueError("a corner is twisted")
+
+    return get_perm(cp) * N_TWIST + get_twist(co), rotation
+
+def solve(state):
+
+    # shortest solution in face turns for a 2x2 state, as moves to
+    # apply to state in its own orientation
+    tables = load_tables()
+    perm_move, twist_move, depth = tables['perm'], tables['twist'], tables['depth']
+
+    index, rotation = coordinates(state)
+    back = engine.inverse(rotation)
+
+    solution = []
+
+    while depth[index]:
+
+        perm, twist = divmod(index, N_TWIST)
+
+        for m in range(N_MOVES):
+
+            child = perm_move[perm * N_MOVES + m] * N_TWIST + twist_move[twist * N_MOVES + m]
+
+            if depth[child] < depth[index]:
+                break
+
+        # the move in the rotated view is a different face turn in
+        # the cube's own orientation
+        turn = engine.compose(engine.compose(rotation, PUZZLE.perms[MOVES[m]]), back)
+
+        solution.append(_FACE_TURN[turn])
+        index = child
+
+    return solution
+
+# ============================================================
+# COMMAND LINE
+# ============================================================
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(
+        prog="cube.py pocket",
+        description="Enumerate every 2x2x2 position by breadth-first search."
+    )
+    parser.add_argument('--rebuild', action='store_true',
+                        help="search again instead of reading the cached table")
+
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+
+    if args.rebuild:
+        depth = enumerate_states()
+        source = "enumerated"
+    else:
+        source = "loaded" if tables_ready() else "enumerated"
+        depth = load_tables()['depth']
+
+    elapsed = time.perf_counter() - start
+
+    counts = distribution(depth)
+
+    print(f"{sum(counts.values()):,} positions {source} in {elapsed:.2f} seconds")
+    print("\nDepth   Positions")
+
+    for d, count in counts.items():
+        print(f"{d:>5}   {count:>9,}")
+
+    print(f"\nGod's number (face turns): {max(counts)}")
+
+    return 0 if sum(counts.values()) == N_STATES and UNKNOWN not in counts else 1
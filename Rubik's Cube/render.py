@@ -0,0 +1,216 @@
+import os
+import shutil
+import sys
+
+import engine
+
+# ============================================================
+# BUFFERED TERMINAL RENDERER
+# ============================================================
+#
+# Draws the simulator screen with ANSI escape sequences instead of
+# clearing the terminal through a subprocess. The first frame is
+# written in full; after that only the sticker cells and header
+# lines that changed are rewritten, each preceded by a cursor
+# move. Everything for one refresh, including the status text and
+# prompt shown under the frame, is gathered in a single string and
+# written with one write() call.
+#
+# Anything else printed below the frame is erased on the next
+# refresh. Call invalidate() before printing enough to scroll the
+# terminal, e.g. the help screen. tick() updates just the timer
+# between refreshes.
+
+HOME = '\033[H'
+SAVE_CURSOR = '\0337'
+RESTORE_CURSOR = '\0338'
+CLEAR_SCREEN = '\033[2J'
+CLEAR_LINE = '\033[K'
+CLEAR_BELOW = '\033[J'
+
+TITLE = "ADVANCED RUBIK'S CUBE SIMULATOR"
+
+# screen rows are 1-based; every sticker cell is 4 columns wide
+MOVES_ROW = 5
+TIME_ROW = 6
+UP_ROW = 9
+
+# rows kept free under the status text: the newline of Enter and
+# up to two notices printed while a command runs
+SPARE_ROWS = 5
+
+CELL_WIDTH = 4
+FACE_GAP = 3
+
+MIDDLE_FACES = ('L', 'F', 'R', 'B')
+
+LABELS = {'U': "UP", 'L': "LEFT", 'F': "FRONT", 'R': "RIGHT", 'B': "BACK", 'D': "DOWN"}
+
+class Layout:
+
+    # screen geometry of the net for an n x n x n cube: U and D sit
+    # above and below F, with L F R B side by side in the middle
+    def __init__(self, n):
+
+        self.n = n
+        self.face_width = n * CELL_WIDTH + FACE_GAP
+        self.width = max(60, 4 * self.face_width)
+
+        self.middle_row = UP_ROW + n + 2
+        self.down_row = self.middle_row + n + 2
+        self.frame_rows = self.down_row + n - 1
+
+        self.positions = self._cell_positions()
+
+    def _cell_positions(self):
+
+        # (screen row, screen column) of every sticker index
+        n = self.n
+        positions = {}
+
+        places = [('U', UP_ROW, 1), ('D', self.down_row, 1)]
+        places += [(face, self.middle_row, slot) for slot, face in enumerate(MIDDLE_FACES)]
+
+        for face, top, slot in places:
+            for row in range(n):
+                for col in range(n):
+                    index = engine.FACE_INDEX[face] * n * n + row * n + col
+                    positions[index] = (top + row, slot * self.face_width + col * CELL_WIDTH + 1)
+
+        return positions
+
+def _goto(row, col=1):
+
+    return f'\033[{row};{col}H'
+
+def _time_line(elapsed):
+
+    return f"Time Elapsed : {elapsed:.1f} seconds"
+
+class TerminalRenderer:
+
+    def __init__(self, colors, stream=None, n=3):
+
+        self.colors = colors
+        self.stream = stream or sys.stdout
+        self.layout = Layout(n)
+        self.previous = None
+        self.header = {}
+        self.status_rows = 0
+
+        if os.name == 'nt':
+            # makes the Windows console interpret ANSI sequences
+            os.system('')
+
+    def invalidate(self):
+
+        self.previous = None
+
+    def _fits(self):
+
+        # with room for the status text and what follows it the
+        # frame never scrolls, so the diff stays valid
+        size = shutil.get_terminal_size()
+        rows = self.layout.frame_rows + self.status_rows + SPARE_ROWS
+
+        return size.lines >= rows and size.columns >= self.layout.width
+
+    def _cell(self, state, index):
+
+        return self.colors[engine.FACE_COLORS[state[index]]] + ' '
+
+    def _face_row(self, state, face, row):
+
+        n = self.layout.n
+        start = engine.FACE_INDEX[face] * n * n + row * n
+
+        return ''.join(self._cell(state, start + col) for col in range(n))
+
+    def _full_frame(self, state, header):
+
+        layout = self.layout
+        indent = " " * layout.face_width
+
+        lines = [
+            "=" * layout.width,
+            TITLE.center(layout.width).rstrip(),
+            "=" * layout.width,
+            "",
+            header[MOVES_ROW],
+            header[TIME_ROW],
+            "",
+            indent + LABELS['U'],
+        ]
+
+        for row in range(layout.n):
+            lines.append(indent + self._face_row(state, 'U', row))
+
+        lines += ["", ''.join(LABELS[face].ljust(layout.face_width) for face in MIDDLE_FACES).rstrip()]
+
+        for row in range(layout.n):
+            lines.append(''.join(
+                self._face_row(state, face, row) + " " * FACE_GAP for face in MIDDLE_FACES
+            ))
+
+        lines += ["", indent + LABELS['D']]
+
+        for row in range(layout.n):
+            lines.append(indent + self._face_row(state, 'D', row))
+
+        return HOME + CLEAR_SCREEN + '\n'.join(lines) + '\n'
+
+    def _changes(self, state, header):
+
+        parts = []
+
+        for row, text in header.items():
+            if self.header.get(row) != text:
+                parts.append(_goto(row) + text + CLEAR_LINE)
+
+        previous = self.previous
+        positions = self.layout.positions
+
+        for index in range(len(state)):
+            if state[index] != previous[index]:
+                row, col = positions[index]
+                parts.append(_goto(row, col) + self.colors[engine.FACE_COLORS[state[index]]])
+
+        parts.append(_goto(self.layout.frame_rows + 1))
+
+        return ''.join(parts)
+
+    def draw(self, state, move_count, elapsed, status=''):
+
+        # status is shown under the frame, the cursor is left at its
+        # end (after a prompt) and the rest of the screen is cleared
+        header = {
+            MOVES_ROW: f"Moves Played : {move_count}",
+            TIME_ROW: _time_line(elapsed),
+        }
+
+        self.status_rows = status.count('\n') + 1 if status else 0
+
+        if self.previous is None or not self._fits():
+            frame = self._full_frame(state, header)
+        else:
+            frame = self._changes(state, header)
+
+        self.stream.write(frame + status.replace('\n', CLEAR_LINE + '\n') + CLEAR_BELOW)
+        self.stream.flush()
+
+        self.previous = bytes(state)
+        self.header = header
+
+    def tick(self, elapsed):
+
+        # rewrites only the timer line and puts the cursor back where
+        # it was, so a command being typed below is left alone
+        text = _time_line(elapsed)
+
+        if self.previous is None or self.header.get(TIME_ROW) == text or not self._fits():
+            return
+
+        self.stream.write(SAVE_CURSOR + _goto(TIME_ROW) + text + CLEAR_LINE + RESTORE_CURSOR)
+        self.stream.flush()
+
+        self.header[TIME_ROW] = text
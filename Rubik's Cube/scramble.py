@@ -0,0 +1,281 @@
+import argparse
+import random
+import sys
+
+import engine
+
+# ============================================================
+# NON-REDUNDANT SCRAMBLES
+# ============================================================
+#
+# Random-move scrambles that follow the WCA rules for random move
+# sequences: never two turns of the same face in a row and never
+# three turns on one axis in a row (so no "R R'", no "R L R").
+#
+# Generation is a walk over a small transition table. A context
+# is the face of the last move plus whether the last two moves
+# shared an axis; each context lists the moves allowed next and
+# the context every one of them leads to. Moves are drawn from
+# bulk random bytes: for a context with k allowed moves, byte b
+# picks move b % k, and the few top byte values that would bias
+# the choice are skipped.
+
+MOVE_NAMES = engine.MOVE_NAMES
+
+START = 12
+
+def _axis(face):
+
+    return face % 3
+
+def _context(face, same_axis):
+
+    return face + 6 * same_axis
+
+def _allowed(context):
+
+    if context == START:
+        return list(range(len(MOVE_NAMES)))
+
+    face, same_axis = context % 6, context // 6
+
+    return [
+        m for m in range(len(MOVE_NAMES))
+        if m // 3 != face and not (same_axis and _axis(m // 3) == _axis(face))
+    ]
+
+def _next_context(context, m):
+
+    if context == START:
+        return _context(m // 3, 0)
+
+    return _context(m // 3, int(_axis(m // 3) == _axis(context % 6)))
+
+# ALLOWED[context] is the tuple of move indices that may follow
+ALLOWED = tuple(tuple(_allowed(c)) for c in range(START + 1))
+
+# TABLE[context][byte] is (move, next context) or None to skip
+TABLE = tuple(
+    tuple(
+        (ALLOWED[c][b % len(ALLOWED[c])], _next_context(c, ALLOWED[c][b % len(ALLOWED[c])]))
+        if b < 256 - 256 % len(ALLOWED[c]) else None
+        for b in range(256)
+    )
+    for c in range(START + 1)
+)
+
+# ============================================================
+# GENERATOR
+# ============================================================
+
+class ScrambleGenerator:
+
+    # gen = ScrambleGenerator(seed=1)
+    # gen.generate()          -> ["R", "U2", "F'", ...]
+    # gen.codes(1000)         -> 1000 * length move indices as bytes
+    # gen.write(file, 10**6)  -> one scramble per line
+
+    def __init__(self, length=25, seed=None):
+
+        if length < 1:
+            raise ValueError("a scramble needs at least one move")
+
+        self.length = length
+        self.random = random.Random(seed)
+
+    def codes(self, count):
+
+        # count scrambles as one bytes object of move indices,
+        # scramble i occupying [i * length, (i + 1) * length)
+        length = self.length
+        total = count * length
+
+        out = bytearray()
+        append = out.append
+        table = TABLE
+
+        randbytes = self.random.randbytes
+        context = START
+        made = 0
+
+        while len(out) < total:
+
+            # a little extra covers skipped bytes
+            for byte in randbytes(total - len(out) + 64):
+
+                entry = table[context][byte]
+
+                if entry is None:
+                    continue
+
+                append(entry[0])
+                context = entry[1]
+                made += 1
+
+                if made == length:
+                    context = START
+                    made = 0
+                    if len(out) == total:
+                        break
+
+        return bytes(out)
+
+    def generate(self):
+
+        return [MOVE_NAMES[m] for m in self.codes(1)]
+
+    def stream(self, count, chunk=10_000):
+
+        # yields count scrambles as move name lists, generated in
+        # chunks so memory stays flat for any count
+        length = self.length
+
+        while count > 0:
+
+            n = min(chunk, count)
+            data = self.codes(n)
+
+            for start in range(0, n * length, length):
+                yield [MOVE_NAMES[m] for m in data[start:start + length]]
+
+            count -= n
+
+    def write(self, out, count, binary=False, chunk=10_000):
+
+        # text: one space separated scramble per line; binary: the
+        # raw move indices, length bytes per scramble
+        length = self.length
+        names = MOVE_NAMES
+
+        while count > 0:
+
+            n = min(chunk, count)
+            data = self.codes(n)
+
+            if binary:
+                out.write(data)
+            else:
+                out.write(''.join(
+                    ' '.join([names[m] for m in data[start:start + length]]) + '\n'
+                    for start in range(0, n * length, length)
+                ))
+
+            count -= n
+
+def generate_array(count, length=25, seed=None):
+
+    # the same walk for many scrambles at once with numpy: returns
+    # a (count, length) uint8 array of move indices
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+
+    width = max(len(a) for a in ALLOWED)
+    sizes = np.array([len(a) for a in ALLOWED])
+    moves = np.zeros((START + 1, width), dtype=np.uint8)
+    following = np.zeros((START + 1, width), dtype=np.uint8)
+
+    for c, allowed in enumerate(ALLOWED):
+        for k, m in enumerate(allowed):
+            moves[c, k] = m
+            following[c, k] = _next_context(c, m)
+
+    result = np.empty((count, length), dtype=np.uint8)
+    context = np.full(count, START, dtype=np.intp)
+
+    for step in range(length):
+        pick = (rng.random(count) * sizes[context]).astype(np.intp)
+        result[:, step] = moves[context, pick]
+        context = following[context, pick]
+
+    return result
+
+# ============================================================
+# OTHER CUBE SIZES
+# ============================================================
+#
+# For sizes other than 3 scrambles use outer and wide turns, as in
+# competition scrambles, with no two moves about the same axis in
+# a row: those commute, so such a pair could always be shortened.
+
+SCRAMBLE_LENGTHS = {2: 11, 3: 25, 4: 40, 5: 60, 6: 80, 7: 100}
+
+def _turn_axis(name):
+
+    # "3Rw'" -> axis of R
+    face = name.lstrip('0123456789')[0]
+
+    return engine.FACE_INDEX[face] % 3
+
+def _is_scramble_turn(name, n):
+
+    # outer turns and wide turns of at most half the cube
+    family = name[:-1] if name[-1] in "2'" else name
+
+    if family in engine.FACE_INDEX:
+        return True
+
+    if not family.endswith('w'):
+        return False
+
+    depth = int(family[:-2] or 2)
+
+    return depth <= n // 2
+
+def random_moves(n, length=None, seed=None):
+
+    rng = random.Random(seed)
+
+    if length is None:
+        length = SCRAMBLE_LENGTHS[n]
+
+    names = [name for name in engine.puzzle(n).move_names if _is_scramble_turn(name, n)]
+
+    moves = []
+    axis = None
+
+    while len(moves) < length:
+
+        name = rng.choice(names)
+
+        if _turn_axis(name) != axis:
+            moves.append(name)
+            axis = _turn_axis(name)
+
+    return moves
+
+# ============================================================
+# COMMAND LINE
+# ============================================================
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(
+        prog="cube.py scrambles",
+        description="Write non-redundant random-move scrambles, one per line."
+    )
+    parser.add_argument('count', type=int, help="number of scrambles")
+    parser.add_argument('-o', '--output', default='-', help="output file, '-' for stdout")
+    parser.add_argument('-n', '--length', type=int, default=25, help="moves per scramble")
+    parser.add_argument('--seed', type=int, default=None, help="seed for reproducible output")
+    parser.add_argument('--binary', action='store_true',
+                        help="write raw move indices (length bytes per scramble)")
+
+    args = parser.parse_args(argv)
+
+    if args.count < 0:
+        parser.error("count must be 0 or more")
+
+    if args.length < 1:
+        parser.error("--length must be at least 1")
+
+    generator = ScrambleGenerator(args.length, args.seed)
+
+    if args.output == '-':
+        out = sys.stdout.buffer if args.binary else sys.stdout
+        generator.write(out, args.count, args.binary)
+    else:
+        with open(args.output, 'wb' if args.binary else 'w') as out:
+            generator.write(out, args.count, args.binary)
+
+    return 0
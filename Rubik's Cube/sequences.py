@@ -0,0 +1,80 @@
+import engine
+
+# ============================================================
+# MOVE SEQUENCE SIMPLIFICATION
+# ============================================================
+#
+# simplify() rewrites a move list into a shorter equivalent one:
+#
+#   - turns of the same face are merged ("U U U" -> "U'",
+#     "R R'" -> nothing, "F F" -> "F2")
+#   - turns of opposite faces commute, so a turn can merge with
+#     the same face across one opposite turn ("R L R" -> "R2 L")
+#   - every pair of opposite turns is written in U R F before
+#     D L B order ("D U" -> "U D")
+#
+# Wide, slice and rotation moves ("Rw", "2R", "M", "x") merge with
+# turns of the same kind in the same way; only outer face turns are
+# treated as commuting with their opposite face.
+#
+# The result never has two turns of the same face in a row or
+# three turns on one axis in a row, and equal inputs up to these
+# rules give the same output, so it doubles as a cache key.
+
+OPPOSITE = {face: engine.FACES[(i + 3) % 6] for i, face in enumerate(engine.FACES)}
+
+_ORDER = engine.FACE_INDEX
+
+_SUFFIX = {1: '', 2: '2', 3: "'"}
+
+def parse_move(name, perms=engine.PERMS):
+
+    # "R" -> ('R', 1), "R2" -> ('R', 2), "3Rw'" -> ('3Rw', 3); perms
+    # is the move table of the puzzle, the 3x3 face turns by default
+    if name not in perms:
+        raise ValueError(f"invalid move : {name}")
+
+    if name.endswith("'"):
+        return name[:-1], 3
+
+    if name.endswith('2'):
+        return name[:-1], 2
+
+    return name, 1
+
+def move_name(face, amount):
+
+    return face + _SUFFIX[amount]
+
+def simplify(moves, perms=engine.PERMS):
+
+    stack = []
+
+    for name in moves:
+
+        face, amount = parse_move(name, perms)
+
+        if stack and stack[-1][0] == face:
+            target = len(stack) - 1
+        elif (len(stack) > 1 and stack[-1][0] == OPPOSITE.get(face)
+                and stack[-2][0] == face):
+            target = len(stack) - 2
+        else:
+            target = None
+
+        if target is None:
+            stack.append([face, amount])
+        else:
+            stack[target][1] = (stack[target][1] + amount) % 4
+            if stack[target][1] == 0:
+                del stack[target]
+
+        if (len(stack) > 1 and stack[-1][0] == OPPOSITE.get(stack[-2][0])
+                and _ORDER[stack[-1][0]] < _ORDER[stack[-2][0]]):
+            stack[-1], stack[-2] = stack[-2], stack[-1]
+
+    return [move_name(face, amount) for face, amount in stack]
+
+def canonical_key(moves, perms=engine.PERMS):
+
+    return ' '.join(simplify(moves, perms))
@@ -0,0 +1,425 @@
+import argparse
+import json
+import os
+import signal
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import engine
+import pocket
+import solver
+import symmetry
+import zobrist
+
+# ============================================================
+# LOCAL SOLVER SERVICE
+# ============================================================
+#
+# A long running HTTP/JSON server, so other tools pay the start up
+# and table loading cost once instead of on every call:
+#
+#     POST /solve     {"scramble": "R U R' U'"}
+#                     {"state": "WWWWWWWWWBBB...", "max_length": 24}
+#     GET  /metrics   request counts, cache hits and latencies
+#     GET  /health    {"status": "ok"}
+#
+# A state is 6 * N * N colour letters in U R F D L B order, as in
+# the flat net; a scramble is applied to the solved cube of "size"
+# (default 3). The 3x3 is solved by the two-phase solver and the
+# 2x2 by the pocket table.
+#
+# Solves run in a pool of worker processes. The tables are built
+# once by the server before the pool starts and every worker maps
+# the same cache files, so the operating system keeps one copy of
+# each table in memory however many workers there are. Solutions
+# are kept in a least recently used table keyed by the canonical
+# state hash, so a cube that is a rotation or mirror image of one
+# solved before is answered without reaching the pool.
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8642
+
+# most recent request latencies kept for the percentiles
+LATENCY_WINDOW = 10_000
+
+MAX_BODY = 64 * 1024
+
+class RequestError(ValueError):
+
+    # a request the client got wrong: answered with 400
+    pass
+
+# ============================================================
+# WORKERS
+# ============================================================
+
+def _warm():
+
+    # pool initializer: map the cached tables before the first job
+    solver.load_tables()
+    pocket.load_tables()
+
+def _solve(size, state, max_length, timeout):
+
+    if size == 2:
+        return pocket.solve(state)
+
+    return solver.solve(state, max_length, timeout)
+
+# ============================================================
+# REQUESTS
+# ============================================================
+
+def parse_request(body):
+
+    # returns (size, state, request) for a /solve body
+    try:
+        request = json.loads(body or b'{}')
+    except ValueError as error:
+        raise RequestError(f"invalid JSON : {error}")
+
+    if not isinstance(request, dict):
+        raise RequestError("the request must be a JSON object")
+
+    if 'state' in request:
+
+        text = str(request['state']).replace(' ', '').upper()
+        size = engine.size_of(text)
+
+        if 6 * size * size != len(text) or size not in (2, 3):
+            raise RequestError("a state has 24 or 54 stickers")
+
+        for color in text:
+            if color not in engine.COLOR_INDEX:
+                raise RequestError(f"invalid colour : {color}")
+
+        state = bytes(engine.COLOR_INDEX[color] for color in text)
+
+    elif 'scramble' in request:
+
+        size = request.get('size', 3)
+
+        if size not in (2, 3):
+            raise RequestError("the solvers only handle the 2x2 and 3x3 cubes")
+
+        cube = engine.puzzle(size)
+        moves = str(request['scramble']).split()
+
+        for move in moves:
+            if move not in cube.perms:
+                raise RequestError(f"invalid move : {move}")
+
+        state = cube.apply_moves(cube.solved, moves)
+
+    else:
+        raise RequestError("expected a \"state\" or a \"scramble\"")
+
+    max_length = request.get('max_length')
+    if max_length is not None and (isinstance(max_length, bool) or not isinstance(max_length, int) or max_length <= 0):
+        raise RequestError("max_length must be a positive integer")
+
+    timeout = request.get('timeout')
+    if timeout is not None and (isinstance(timeout, bool) or not isinstance(timeout, (int, float)) or timeout <= 0):
+        raise RequestError("timeout must be a positive number")
+
+    if size == 3:
+        # slice moves and rotations leave the centres elsewhere
+        state = engine.normalize_centers(state)
+
+    return size, state, request
+
+# ============================================================
+# METRICS
+# ============================================================
+
+def _percentile(ordered, fraction):
+
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+class Metrics:
+
+    def __init__(self, window=LATENCY_WINDOW):
+
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.requests = 0
+        self.errors = 0
+        self.latency = deque(maxlen=window)
+        self.solve_time = deque(maxlen=window)
+
+    def record(self, latency_us, solve_us=None, error=False):
+
+        with self.lock:
+            self.requests += 1
+            self.errors += error
+            self.latency.append(latency_us)
+            if solve_us is not None:
+                self.solve_time.append(solve_us)
+
+    @staticmethod
+    def _summary(values):
+
+        if not values:
+            return {'count': 0}
+
+        ordered = sorted(values)
+
+        return {
+            'count': len(ordered),
+            'mean': sum(ordered) // len(ordered),
+            'p50': _percentile(ordered, 0.50),
+            'p90': _percentile(ordered, 0.90),
+            'p99': _percentile(ordered, 0.99),
+            'max': ordered[-1],
+        }
+
+    def snapshot(self):
+
+        # latencies in microseconds over the last `window` requests;
+        # solve_us only counts requests that went to the pool
+        with self.lock:
+            return {
+                'uptime_s': round(time.time() - self.started, 1),
+                'requests': self.requests,
+                'errors': self.errors,
+                'latency_us': self._summary(self.latency),
+                'solve_us': self._summary(self.solve_time),
+            }
+
+# ============================================================
+# SERVICE
+# ============================================================
+
+class SolverService:
+
+    def __init__(self, workers=1, cache_size=100_000, max_length=24, timeout=10.0):
+
+        self.max_length = max_length
+        self.timeout = timeout
+
+        # built here once, so the workers only ever read the cache files
+        solver.load_tables()
+        pocket.load_tables()
+
+        self.workers = workers
+        self.pool = ProcessPoolExecutor(workers, initializer=_warm)
+        self.pool_lock = threading.Lock()
+        self.metrics = Metrics()
+
+        # the 3x3 table is keyed by canonical hash; the 2x2 has no
+        # symmetry reduction and is keyed by its stickers
+        self.cache = {2: zobrist.TranspositionTable(cache_size), 3: zobrist.TranspositionTable(cache_size)}
+        self.cache_lock = threading.Lock()
+
+    def solve(self, size, state, max_length=None, timeout=None):
+
+        # returns (moves, cached, microseconds spent in the pool)
+        if size == 3:
+            key, index = zobrist.canonical_key(state)
+        else:
+            key, index = state, None
+
+        table = self.cache[size]
+        max_length = max_length or self.max_length
+
+        with self.cache_lock:
+            moves = table.get(key)
+
+        # a solution found under a looser limit may be too long for this
+        # request: solve again, the shorter one then replaces it
+        if moves is not None and len(moves) <= max_length:
+            return (moves if index is None else symmetry.unmap_moves(moves, index)), True, None
+
+        pool = self.pool
+        start = time.perf_counter_ns()
+        try:
+            moves = pool.submit(_solve, size, state, max_length, timeout or self.timeout).result()
+        except BrokenProcessPool:
+            # a worker died: start a fresh pool for the requests to come
+            self.restart(pool)
+            raise
+        elapsed = (time.perf_counter_ns() - start) // 1000
+
+        with self.cache_lock:
+            table.put(key, moves if index is None else symmetry.map_moves(moves, index))
+
+        return moves, False, elapsed
+
+    def stats(self):
+
+        stats = self.metrics.snapshot()
+
+        with self.cache_lock:
+            stats['cache'] = {
+                str(size): {'entries': len(table), 'hits': table.hits, 'misses': table.misses}
+                for size, table in self.cache.items()
+            }
+
+        return stats
+
+    def restart(self, broken):
+
+        # several requests can see the same pool break; replace it once
+        with self.pool_lock:
+            if self.pool is broken:
+                self.pool.shutdown(wait=False, cancel_futures=True)
+                self.pool = ProcessPoolExecutor(self.workers, initializer=_warm)
+
+    def close(self):
+
+        self.pool.shutdown(cancel_futures=True)
+
+class Handler(BaseHTTPRequestHandler):
+
+    server_version = "CubeSolver/1"
+
+    # the SolverService, set by serve()
+    service = None
+    verbose = False
+
+    def _reply(self, status, payload):
+
+        body = json.dumps(payload).encode() + b'\n'
+
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+
+        if self.path == '/health':
+            self._reply(200, {'status': 'ok'})
+        elif self.path == '/metrics':
+            self._reply(200, self.service.stats())
+        else:
+            self._reply(404, {'error': f"unknown path : {self.path}"})
+
+    def _body_length(self):
+
+        # a negative length would make rfile.read() wait for EOF on a
+        # keep-alive connection, so the header is checked before reading
+        header = self.headers.get('Content-Length')
+
+        if header is None:
+            raise RequestError("missing Content-Length")
+
+        try:
+            length = int(header)
+        except ValueError:
+            raise RequestError(f"invalid Content-Length : {header}")
+
+        if length < 0:
+            raise RequestError(f"invalid Content-Length : {header}")
+
+        if length > MAX_BODY:
+            raise RequestError("request too large")
+
+        return length
+
+    def do_POST(self):
+
+        if self.path != '/solve':
+            self._reply(404, {'error': f"unknown path : {self.path}"})
+            return
+
+        start = time.perf_counter_ns()
+        solve_us = None
+        status = 200
+
+        try:
+            size, state, request = parse_request(self.rfile.read(self._body_length()))
+
+            moves, cached, solve_us = self.service.solve(
+                size, state, request.get('max_length'), request.get('timeout')
+            )
+
+            payload = {'solution': ' '.join(moves), 'length': len(moves), 'cached': cached}
+
+        except RequestError as error:
+            status, payload = 400, {'error': str(error)}
+
+        except (ValueError, TimeoutError) as error:
+            # a valid request for a cube that cannot be solved (in time)
+            status, payload = 422, {'error': str(error)}
+
+        except Exception as error:
+            # a worker crashed or the pool broke: still answer, and count it
+            status, payload = 500, {'error': f"{type(error).__name__} : {error}"}
+
+        latency = (time.perf_counter_ns() - start) // 1000
+        payload['time_us'] = latency
+
+        self.service.metrics.record(latency, solve_us, status != 200)
+        self._reply(status, payload)
+
+    def log_message(self, format, *args):
+
+        if self.verbose:
+            super().log_message(format, *args)
+
+def _stop(signum, frame):
+
+    raise KeyboardInterrupt
+
+def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, workers=1, cache_size=100_000,
+          max_length=24, timeout=10.0, verbose=False):
+
+    service = SolverService(workers, cache_size, max_length, timeout)
+
+    handler = type('BoundHandler', (Handler,), {'service': service, 'verbose': verbose})
+
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+
+    host, port = server.server_address[:2]
+    print(f"Solver service on http://{host}:{port} with {workers} worker(s)", flush=True)
+
+    # a service manager stops us with SIGTERM: shut down the same way
+    signal.signal(signal.SIGTERM, _stop)
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+
+# ============================================================
+# COMMAND LINE
+# ============================================================
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(
+        prog="cube.py serve",
+        description="Run a local HTTP/JSON solver service with a warm worker pool."
+    )
+    parser.add_argument('--host', default=DEFAULT_HOST, help=f"address to bind (default {DEFAULT_HOST})")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f"port to bind (default {DEFAULT_PORT})")
+    parser.add_argument('-j', '--workers', type=int, default=os.cpu_count() or 1,
+                        help="number of worker processes")
+    parser.add_argument('--cache', type=int, default=100_000, metavar='ENTRIES',
+                        help="solutions kept per cube size")
+    parser.add_argument('--max-length', type=int, default=24,
+                        help="longest solution to accept unless the request says otherwise")
+    parser.add_argument('--timeout', type=float, default=10.0,
+                        help="seconds allowed per solve unless the request says otherwise")
+    parser.add_argument('-v', '--verbose', action='store_true', help="log every request to stderr")
+
+    args = parser.parse_args(argv)
+
+    if args.workers < 1:
+        print("need at least one worker", file=sys.stderr)
+        return 1
+
+    serve(args.host, args.port, args.workers, args.cache, args.max_length, args.timeout, args.verbose)
+
+    return 0
@@ -0,0 +1,388 @@
+import argparse
+import mmap
+import os
+import struct
+import sys
+import time
+
+import engine
+
+# ============================================================
+# BINARY SESSION LOG
+# ============================================================
+#
+# A session is written as two files:
+#
+#   <name>.cubelog      header, then one record per event
+#   <name>.cubelog.idx  header, then one fixed size checkpoint
+#                       every `every` records
+#
+# A record is one byte plus a varint: the byte is the index of the
+# move in the puzzle's move_names (RESET for a reset to solved) and
+# the varint is the time in milliseconds since the previous record,
+# seven bits per byte with the high bit set on every byte but the
+# last. A typical move costs two bytes.
+#
+# Checkpoint j holds the record count j * every, the byte offset of
+# the next record in the log, the elapsed milliseconds and the full
+# cube state. Finding the state after record n reads checkpoint
+# n // every and replays at most every - 1 records, so seeking costs
+# the same for a session of a hundred moves or ten million. Both
+# files are plain little endian data and the reader maps them with
+# mmap, so nothing is loaded until it is touched.
+
+SESSION_ENV = 'CUBE_SESSION_DIR'
+
+LOG_MAGIC = b'CLOG'
+INDEX_MAGIC = b'CIDX'
+VERSION = 1
+
+# magic, version, cube size, start time in unix milliseconds
+LOG_HEADER = struct.Struct('<4sBB2xQ')
+
+# magic, version, cube size, records per checkpoint
+INDEX_HEADER = struct.Struct('<4sBB2xI4x')
+
+# record count, log offset, elapsed milliseconds; the state follows
+CHECKPOINT = struct.Struct('<QQQ')
+
+RESET = 0xFF
+
+DEFAULT_EVERY = 1024
+
+def default_root():
+
+    root = os.environ.get(SESSION_ENV)
+
+    if root:
+        return root
+
+    base = os.environ.get('XDG_DATA_HOME') or os.path.join(os.path.expanduser('~'), '.local', 'share')
+
+    return os.path.join(base, 'rubiks_cube_sessions')
+
+def new_session_path(root=None):
+
+    # the directory is made by SessionWriter, so that picking a path
+    # never fails
+    root = root or default_root()
+
+    return os.path.join(root, time.strftime('%Y%m%d-%H%M%S') + f'-{os.getpid()}.cubelog')
+
+def index_path(path):
+
+    return path + '.idx'
+
+def _varint(value):
+
+    out = bytearray()
+
+    while value > 0x7F:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+
+    out.append(value)
+
+    return bytes(out)
+
+def _read_varint(data, offset):
+
+    # returns (value, offset after it)
+    value = 0
+    shift = 0
+
+    while True:
+
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+
+        if byte < 0x80:
+            return value, offset
+
+        shift += 7
+
+# ============================================================
+# WRITER
+# ============================================================
+
+class SessionWriter:
+
+    # log = SessionWriter(path, size=3)
+    # log.record(["R", "U'"])     one record per move
+    # log.reset()
+    # log.close()
+
+    def __init__(self, path, size=3, every=DEFAULT_EVERY):
+
+        self.path = path
+        self.puzzle = engine.puzzle(size)
+        self.every = every
+        self.codes = {name: code for code, name in enumerate(self.puzzle.move_names)}
+
+        if len(self.codes) >= RESET:
+            raise ValueError("too many moves for one byte codes")
+
+        self.state = self.puzzle.solved
+        self.count = 0
+        self.elapsed = 0
+
+        self._clock = time.monotonic()
+
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+
+        self._log = open(path, 'wb')
+
+        try:
+            self._index = open(index_path(path), 'wb')
+        except OSError:
+            self._log.close()
+            raise
+
+        self._log.write(LOG_HEADER.pack(LOG_MAGIC, VERSION, size, int(time.time() * 1000)))
+        self._index.write(INDEX_HEADER.pack(INDEX_MAGIC, VERSION, size, every))
+        self._offset = LOG_HEADER.size
+
+        self._checkpoint(0)
+        self.flush()
+
+    def _checkpoint(self, elapsed):
+
+        self._index.write(CHECKPOINT.pack(self.count, self._offset, elapsed) + self.state)
+
+    def _delta(self):
+
+        # milliseconds since the previous record
+        now = int((time.monotonic() - self._clock) * 1000)
+        delta = now - self.elapsed
+        self.elapsed = now
+
+        return delta
+
+    def _append(self, out, code, delta):
+
+        if self.count and self.count % self.every == 0:
+            self._log.write(out)
+            self._offset += len(out)
+            out.clear()
+            # self.elapsed already includes the pending delta, which
+            # belongs to the record after the checkpoint
+            self._checkpoint(self.elapsed - delta)
+
+        out.append(code)
+        out += _varint(delta)
+        self.count += 1
+
+    def record(self, moves):
+
+        # the moves of one action share its timestamp
+        delta = self._delta()
+        turns = self.puzzle.turns
+        out = bytearray()
+
+        for name in moves:
+            self._append(out, self.codes[name], delta)
+            self.state = turns[name](self.state)
+            delta = 0
+
+        self._log.write(out)
+        self._offset += len(out)
+        self.flush()
+
+    def reset(self):
+
+        out = bytearray()
+
+        self._append(out, RESET, self._delta())
+        self.state = self.puzzle.solved
+
+        self._log.write(out)
+        self._offset += len(out)
+        self.flush()
+
+    def flush(self):
+
+        self._log.flush()
+        self._index.flush()
+
+    def close(self):
+
+        self._log.close()
+        self._index.close()
+
+    def __enter__(self):
+
+        return self
+
+    def __exit__(self, *exc):
+
+        self.close()
+
+# ============================================================
+# READER
+# ============================================================
+
+class SessionReader:
+
+    # log = SessionReader(path)
+    # len(log)                 number of records
+    # log.state_at(500_000)    cube state after 500 000 records
+    # log.records(start)       (code, elapsed ms) from record start
+
+    def __init__(self, path):
+
+        self.path = path
+
+        with open(path, 'rb') as log_file, open(index_path(path), 'rb') as index_file:
+            self._log = mmap.mmap(log_file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._index = mmap.mmap(index_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, size, self.started = LOG_HEADER.unpack_from(self._log)
+
+        if magic != LOG_MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} session log")
+
+        magic, version, index_size, self.every = INDEX_HEADER.unpack_from(self._index)
+
+        if magic != INDEX_MAGIC or version != VERSION or index_size != size:
+            raise ValueError(f"{index_path(path)} does not belong to {path}")
+
+        self.puzzle = engine.puzzle(size)
+        self.size = size
+        self.move_names = self.puzzle.move_names
+
+        self._entry_size = CHECKPOINT.size + self.puzzle.stickers
+        self.checkpoints = (len(self._index) - INDEX_HEADER.size) // self._entry_size
+
+        # records after the last checkpoint are counted once here
+        count, offset, elapsed, _ = self._checkpoint(self.checkpoints - 1)
+
+        for _ in self._scan(offset):
+            count += 1
+
+        self._count = count
+
+    def __len__(self):
+
+        return self._count
+
+    def _checkpoint(self, j):
+
+        start = INDEX_HEADER.size + j * self._entry_size
+        count, offset, elapsed = CHECKPOINT.unpack_from(self._index, start)
+        state = self._index[start + CHECKPOINT.size:start + self._entry_size]
+
+        return count, offset, elapsed, state
+
+    def _scan(self, offset):
+
+        # yields (code, delta ms) up to the end of the log
+        data = self._log
+        end = len(data)
+
+        while offset < end:
+            code = data[offset]
+            delta, offset = _read_varint(data, offset + 1)
+            yield code, delta
+
+    def _seek(self, n):
+
+        # (state, elapsed ms, log offset) after record n
+        if not 0 <= n <= self._count:
+            raise IndexError("no such move in the session")
+
+        j = min(n // self.every, self.checkpoints - 1)
+        count, offset, elapsed, state = self._checkpoint(j)
+
+        data = self._log
+        turns = self.puzzle.turns
+        names = self.move_names
+        solved = self.puzzle.solved
+
+        while count < n:
+
+            code = data[offset]
+            delta, offset = _read_varint(data, offset + 1)
+
+            state = solved if code == RESET else turns[names[code]](state)
+            elapsed += delta
+            count += 1
+
+        return state, elapsed, offset
+
+    def state_at(self, n):
+
+        return self._seek(n)[0]
+
+    def time_at(self, n):
+
+        # milliseconds from the session start to record n
+        return self._seek(n)[1]
+
+    def records(self, start=0):
+
+        # yields (move name or None for a reset, elapsed ms)
+        _, elapsed, offset = self._seek(start)
+
+        for code, delta in self._scan(offset):
+            elapsed += delta
+            yield (None if code == RESET else self.move_names[code]), elapsed
+
+    def close(self):
+
+        self._log.close()
+        self._index.close()
+
+    def __enter__(self):
+
+        return self
+
+    def __exit__(self, *exc):
+
+        self.close()
+
+# ============================================================
+# COMMAND LINE
+# ============================================================
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(
+        prog="cube.py replay",
+        description="Summarise a recorded session and show the cube at any move."
+    )
+    parser.add_argument('log', help="a .cubelog file")
+    parser.add_argument('--at', type=int, default=None, help="show the cube after this many records")
+    parser.add_argument('--moves', action='store_true', help="print every record")
+
+    args = parser.parse_args(argv)
+
+    with SessionReader(args.log) as log:
+
+        n = len(log) if args.at is None else args.at
+
+        started = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(log.started / 1000))
+
+        print(f"{args.log}: {log.size}x{log.size}x{log.size} session started {started}")
+        print(f"{len(log)} records, {log.time_at(len(log)) / 1000:.1f} seconds")
+
+        if args.moves:
+            for i, (name, elapsed) in enumerate(log.records(), 1):
+                print(f"{i}\t{elapsed / 1000:.3f}\t{name or 'reset'}")
+
+        try:
+            state = log.state_at(n)
+        except IndexError as error:
+            print(error, file=sys.stderr)
+            return 1
+
+        print(f"\nCube after record {n} ({log.time_at(n) / 1000:.1f} seconds):")
+
+        for face in engine.FACES:
+            for row in engine.face_rows(state, face):
+                print(f"  {face}  {' '.join(row)}")
+                face = ' '
+
+        print("\nSOLVED" if engine.is_solved(state) else "\nMIXED")
+
+    return 0
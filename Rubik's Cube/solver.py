@@ -0,0 +1,759 @@
+from array import array
+import time
+
+import engine
+import tablecache
+
+# ============================================================
+# TWO-PHASE SOLVER
+# ============================================================
+#
+# Kociemba's two-phase algorithm. Phase 1 brings the cube into
+# the subgroup G1 = <U, D, R2, L2, F2, B2> where every corner and
+# edge is oriented and the four middle-layer edges sit in the
+# middle layer. Phase 2 solves the cube using G1 moves only.
+#
+# Both phases run IDA* over small integer coordinates. Each
+# coordinate has a move table (coordinate x move -> coordinate)
+# and pairs of coordinates have pruning tables holding the exact
+# number of moves needed to solve that pair, which is a lower
+# bound for the whole phase.
+
+MOVE_NAMES = engine.MOVE_NAMES
+
+N_MOVES = len(MOVE_NAMES)
+
+# moves are numbered face * 3 + power with faces in U R F D L B
+# order and power 0, 1, 2 meaning quarter turn, half turn, prime
+PHASE2_MOVES = tuple(
+    m for m in range(N_MOVES)
+    if m // 3 in (0, 3) or m % 3 == 1
+)
+
+N_TWIST = 2187
+N_FLIP = 2048
+N_SLICE = 495
+N_CORNER_PERM = 40320
+N_UD_EDGE_PERM = 40320
+N_SLICE_PERM = 24
+
+# ============================================================
+# CUBIE LEVEL DESCRIPTION
+# ============================================================
+#
+# Corners URF UFL ULB UBR DFR DLF DBL DRB and edges UR UF UL UB
+# DR DF DL DB FR FL BL BR. For every position we list the sticker
+# indices of that cubie, starting with the U or D sticker (or the
+# F or B sticker for middle-layer edges).
+
+CORNER_FACELETS = (
+    (8, 9, 20), (6, 18, 38), (0, 36, 47), (2, 45, 11),
+    (29, 26, 15), (27, 44, 24), (33, 53, 42), (35, 17, 51)
+)
+
+EDGE_FACELETS = (
+    (5, 10), (7, 19), (3, 37), (1, 46), (32, 16), (28, 25),
+    (30, 43), (34, 52), (23, 12), (21, 41), (50, 39), (48, 14)
+)
+
+CORNER_COLORS = tuple(
+    tuple(engine.SOLVED[i] for i in facelets)
+    for facelets in CORNER_FACELETS
+)
+
+EDGE_COLORS = tuple(
+    tuple(engine.SOLVED[i] for i in facelets)
+    for facelets in EDGE_FACELETS
+)
+
+def to_cubies(state):
+
+    # returns (cp, co, ep, eo) or raises ValueError if the sticker
+    # pattern does not describe real pieces
+    cp = []
+    co = []
+
+    for facelets in CORNER_FACELETS:
+
+        colors = [state[i] for i in facelets]
+
+        for ori in range(3):
+            if colors[ori] in (0, 3):
+                break
+        else:
+            raise ValueError("corner without a U or D sticker")
+
+        key = (colors[ori], colors[(ori + 1) % 3], colors[(ori + 2) % 3])
+
+        if key not in CORNER_COLORS:
+            raise ValueError("impossible corner colours")
+
+        cp.append(CORNER_COLORS.index(key))
+        co.append(ori)
+
+    ep = []
+    eo = []
+
+    for facelets in EDGE_FACELETS:
+
+        colors = (state[facelets[0]], state[facelets[1]])
+
+        if colors in EDGE_COLORS:
+            ep.append(EDGE_COLORS.index(colors))
+            eo.append(0)
+        elif colors[::-1] in EDGE_COLORS:
+            ep.append(EDGE_COLORS.index(colors[::-1]))
+            eo.append(1)
+        else:
+            raise ValueError("impossible edge colours")
+
+    return cp, co, ep, eo
+
+def _parity(perm):
+
+    parity = 0
+
+    for i in range(len(perm)):
+        for j in range(i + 1, len(perm)):
+            if perm[j] < perm[i]:
+                parity ^= 1
+
+    return parity
+
+def verify(state):
+
+    if len(state) != engine.STICKERS:
+        raise ValueError("a cube state has 54 stickers")
+
+    for color in range(6):
+        if state.count(color) != 9:
+            raise ValueError("every colour must appear exactly 9 times")
+
+    for face in range(6):
+        if state[face * 9 + 4] != face:
+            raise ValueError("centre stickers are out of place")
+
+    cp, co, ep, eo = to_cubies(state)
+
+    if len(set(cp)) != 8 or len(set(ep)) != 12:
+        raise ValueError("duplicate pieces")
+
+    if sum(co) % 3:
+        raise ValueError("a corner is twisted")
+
+    if sum(eo) % 2:
+        raise ValueError("an edge is flipped")
+
+    if _parity(cp) != _parity(ep):
+        raise ValueError("two pieces are swapped")
+
+    return cp, co, ep, eo
+
+# the cubie form of every move, taken from the sticker tables so
+# the solver always agrees with the engine
+MOVE_CUBIES = tuple(
+    to_cubies(engine.apply_move(engine.SOLVED, name))
+    for name in MOVE_NAMES
+)
+
+def apply_cubie_move(cubies, m):
+
+    cp, co, ep, eo = cubies
+    mcp, mco, mep, meo = MOVE_CUBIES[m]
+
+    return (
+        [cp[mcp[i]] for i in range(8)],
+        [(co[mcp[i]] + mco[i]) % 3 for i in range(8)],
+        [ep[mep[i]] for i in range(12)],
+        [(eo[mep[i]] + meo[i]) % 2 for i in range(12)]
+    )
+
+# ============================================================
+# COORDINATES
+# ============================================================
+
+def _binomial(n, k):
+
+    if k < 0 or k > n:
+        return 0
+
+    result = 1
+
+    for i in range(k):
+        result = result * (n - i) // (i + 1)
+
+    return result
+
+_CHOOSE = [[_binomial(n, k) for k in range(5)] for n in range(12)]
+
+def _perm_rank(perm):
+
+    rank = 0
+    n = len(perm)
+
+    for i in range(n):
+        smaller = 0
+        for j in range(i + 1, n):
+            if perm[j] < perm[i]:
+                smaller += 1
+        rank = rank * (n - i) + smaller
+
+    return rank
+
+def _perm_unrank(rank, n):
+
+    digits = []
+
+    for base in range(1, n + 1):
+        digits.append(rank % base)
+        rank //= base
+
+    digits.reverse()
+
+    remaining = list(range(n))
+
+    return [remaining.pop(d) for d in digits]
+
+def get_twist(co):
+
+    twist = 0
+
+    for i in range(7):
+        twist = twist * 3 + co[i]
+
+    return twist
+
+def set_twist(twist):
+
+    co = [0] * 8
+
+    for i in range(6, -1, -1):
+        co[i] = twist % 3
+        twist //= 3
+
+    co[7] = -sum(co) % 3
+
+    return co
+
+def get_flip(eo):
+
+    flip = 0
+
+    for i in range(11):
+        flip = flip * 2 + eo[i]
+
+    return flip
+
+def set_flip(flip):
+
+    eo = [0] * 12
+
+    for i in range(10, -1, -1):
+        eo[i] = flip % 2
+        flip //= 2
+
+    eo[11] = sum(eo) % 2
+
+    return eo
+
+def get_slice(ep):
+
+    # which four positions hold the FR FL BL BR edges
+    index = 0
+    found = 0
+
+    for j in range(11, -1, -1):
+        if ep[j] >= 8:
+            found += 1
+            index += _CHOOSE[11 - j][found]
+
+    return index
+
+def set_slice(index):
+
+    ep = [-1] * 12
+    left = 4
+
+    for j in range(12):
+        if left and index >= _CHOOSE[11 - j][left]:
+            index -= _CHOOSE[11 - j][left]
+            ep[j] = 12 - left
+            left -= 1
+
+    other = 0
+
+    for j in range(12):
+        if ep[j] < 0:
+            ep[j] = other
+            other += 1
+
+    return ep
+
+def get_corner_perm(cp):
+
+    return _perm_rank(cp)
+
+def get_ud_edge_perm(ep):
+
+    return _perm_rank(ep[:8])
+
+def get_slice_perm(ep):
+
+    return _perm_rank([e - 8 for e in ep[8:]])
+
+# ============================================================
+# MOVE TABLES
+# ============================================================
+#
+# Every table is a flat array indexed by coordinate * 18 + move.
+# The UD edge and slice permutation tables are only meaningful
+# for phase 2 moves; the other entries stay zero.
+
+def _twist_table():
+
+    table = array('H', bytes(2 * N_TWIST * N_MOVES))
+
+    for twist in range(N_TWIST):
+
+        co = set_twist(twist)
+
+        for m, (mcp, mco, _, _) in enumerate(MOVE_CUBIES):
+            table[twist * N_MOVES + m] = get_twist(
+                [(co[mcp[i]] + mco[i]) % 3 for i in range(8)]
+            )
+
+    return table
+
+def _flip_table():
+
+    table = array('H', bytes(2 * N_FLIP * N_MOVES))
+
+    for flip in range(N_FLIP):
+
+        eo = set_flip(flip)
+
+        for m, (_, _, mep, meo) in enumerate(MOVE_CUBIES):
+            table[flip * N_MOVES + m] = get_flip(
+                [(eo[mep[i]] + meo[i]) % 2 for i in range(12)]
+            )
+
+    return table
+
+def _slice_table():
+
+    table = array('H', bytes(2 * N_SLICE * N_MOVES))
+
+    for index in range(N_SLICE):
+
+        ep = set_slice(index)
+
+        for m, (_, _, mep, _) in enumerate(MOVE_CUBIES):
+            table[index * N_MOVES + m] = get_slice([ep[i] for i in mep])
+
+    return table
+
+def _corner_perm_table():
+
+    table = array('H', bytes(2 * N_CORNER_PERM * N_MOVES))
+
+    for index in range(N_CORNER_PERM):
+
+        cp = _perm_unrank(index, 8)
+
+        for m, (mcp, _, _, _) in enumerate(MOVE_CUBIES):
+            table[index * N_MOVES + m] = _perm_rank([cp[i] for i in mcp])
+
+    return table
+
+def _ud_edge_perm_table():
+
+    table = array('H', bytes(2 * N_UD_EDGE_PERM * N_MOVES))
+
+    for index in range(N_UD_EDGE_PERM):
+
+        ep = _perm_unrank(index, 8)
+
+        for m in PHASE2_MOVES:
+            mep = MOVE_CUBIES[m][2]
+            table[index * N_MOVES + m] = _perm_rank([ep[mep[i]] for i in range(8)])
+
+    return table
+
+def _slice_perm_table():
+
+    table = array('H', bytes(2 * N_SLICE_PERM * N_MOVES))
+
+    for index in range(N_SLICE_PERM):
+
+        ep = [0] * 8 + [e + 8 for e in _perm_unrank(index, 4)]
+
+        for m in PHASE2_MOVES:
+            mep = MOVE_CUBIES[m][2]
+            table[index * N_MOVES + m] = get_slice_perm([ep[i] for i in mep])
+
+    return table
+
+# ============================================================
+# PRUNING TABLES
+# ============================================================
+
+UNKNOWN = 0xFF
+
+def _pruning_table(outer_table, outer_size, inner_table, inner_size, moves):
+
+    # breadth-first search over the product of two coordinates;
+    # entry outer * inner_size + inner is its distance to solved
+    size = outer_size * inner_size
+
+    table = bytearray([UNKNOWN]) * size
+    table[0] = 0
+
+    filled = 1
+    depth = 0
+
+    while filled < size:
+
+        index = table.find(depth)
+
+        if index < 0:
+            break
+
+        while index >= 0:
+
+            outer, inner = divmod(index, inner_size)
+            outer *= N_MOVES
+            inner *= N_MOVES
+
+            for m in moves:
+
+                target = outer_table[outer + m] * inner_size + inner_table[inner + m]
+
+                if table[target] == UNKNOWN:
+                    table[target] = depth + 1
+                    filled += 1
+
+            index = table.find(depth, index + 1)
+
+        depth += 1
+
+    return table
+
+# ============================================================
+# TABLE STORE
+# ============================================================
+
+# Tables live in the on-disk cache described in tablecache.py.
+# Move tables are stored as unsigned 16-bit arrays and pruning
+# tables as 4-bit packed depths; bump TABLE_VERSION whenever the
+# layout of either changes.
+
+TABLE_VERSION = 1
+
+TABLE_DIGEST = tablecache.content_hash(
+    TABLE_VERSION, engine.PERMS, CORNER_FACELETS, EDGE_FACELETS, PHASE2_MOVES
+)
+
+def _packed_pruning_table(outer, outer_size, inner, inner_size, moves):
+
+    return lambda: tablecache.pack_nibbles(_pruning_table(
+        get_table(outer), outer_size, get_table(inner), inner_size, moves
+    ))
+
+_BUILDERS = {
+    'twist': (_twist_table, 'H'),
+    'flip': (_flip_table, 'H'),
+    'slice': (_slice_table, 'H'),
+    'corner_perm': (_corner_perm_table, 'H'),
+    'ud_edge_perm': (_ud_edge_perm_table, 'H'),
+    'slice_perm': (_slice_perm_table, 'H'),
+    'slice_twist_prun': (_packed_pruning_table(
+        'slice', N_SLICE, 'twist', N_TWIST, range(N_MOVES)
+    ), 'B'),
+    'slice_flip_prun': (_packed_pruning_table(
+        'slice', N_SLICE, 'flip', N_FLIP, range(N_MOVES)
+    ), 'B'),
+    'corner_slice_prun': (_packed_pruning_table(
+        'corner_perm', N_CORNER_PERM, 'slice_perm', N_SLICE_PERM, PHASE2_MOVES
+    ), 'B'),
+    'edge_slice_prun': (_packed_pruning_table(
+        'ud_edge_perm', N_UD_EDGE_PERM, 'slice_perm', N_SLICE_PERM, PHASE2_MOVES
+    ), 'B'),
+}
+
+TABLE_NAMES = tuple(_BUILDERS)
+
+_cache = tablecache.TableCache('two_phase', TABLE_DIGEST)
+
+_tables = {}
+
+def get_table(name):
+
+    table = _tables.get(name)
+
+    if table is None:
+        build, typecode = _BUILDERS[name]
+        table = _tables[name] = _cache.load(name, build, typecode)
+
+    return table
+
+def tables_ready():
+
+    return all(name in _tables or _cache.exists(name) for name in TABLE_NAMES)
+
+def load_tables():
+
+    return {name: get_table(name) for name in TABLE_NAMES}
+
+# ============================================================
+# SEARCH
+# ============================================================
+
+def _allowed(face, last_face):
+
+    # never turn the same face twice in a row, and play opposite
+    # faces in one fixed order only
+    return face != last_face and face != last_face - 3
+
+# (move, face) pairs worth trying after a move on last_face, with
+# -1 standing for the start of the search
+_PHASE1_NEXT = {
+    last_face: tuple(
+        (m, m // 3) for m in range(N_MOVES) if _allowed(m // 3, last_face)
+    )
+    for last_face in range(-1, 6)
+}
+
+_PHASE2_NEXT = {
+    last_face: tuple(
+        (m, m // 3) for m in PHASE2_MOVES if _allowed(m // 3, last_face)
+    )
+    for last_face in range(-1, 6)
+}
+
+class _Search:
+
+    def __init__(self, cubies, max_length, deadline):
+
+        tables = load_tables()
+
+        self.cubies = cubies
+        self.max_length = max_length
+        self.deadline = deadline
+
+        self.twist_move = tables['twist']
+        self.flip_move = tables['flip']
+        self.slice_move = tables['slice']
+        self.corner_move = tables['corner_perm']
+        self.edge_move = tables['ud_edge_perm']
+        self.slice_perm_move = tables['slice_perm']
+
+        self.slice_twist_prun = tables['slice_twist_prun']
+        self.slice_flip_prun = tables['slice_flip_prun']
+        self.corner_slice_prun = tables['corner_slice_prun']
+        self.edge_slice_prun = tables['edge_slice_prun']
+
+        self.moves = []
+        self.split = 0
+        self.nodes = 0
+
+    def run(self):
+
+        cp, co, ep, eo = self.cubies
+
+        twist = get_twist(co)
+        flip = get_flip(eo)
+        slc = get_slice(ep)
+
+        for depth in range(self.max_length + 1):
+
+            if self._phase1(twist, flip, slc, depth, -1):
+                return [MOVE_NAMES[m] for m in _merge(self.moves, self.split)]
+
+        return None
+
+    def _phase1(self, twist, flip, slc, depth, last_face):
+
+        if depth == 0:
+            return not (twist or flip or slc) and self._start_phase2()
+
+        self.nodes += 1
+
+        if self.nodes & 0x3FF == 0 and time.perf_counter() > self.deadline:
+            raise TimeoutError("no solution found in time")
+
+        twist_move = self.twist_move
+        flip_move = self.flip_move
+        slice_move = self.slice_move
+        slice_twist_prun = self.slice_twist_prun
+        slice_flip_prun = self.slice_flip_prun
+
+        for m, face in _PHASE1_NEXT[last_face]:
+
+            t = twist_move[twist * N_MOVES + m]
+            f = flip_move[flip * N_MOVES + m]
+            s = slice_move[slc * N_MOVES + m]
+
+            i = s * N_TWIST + t
+
+            if (slice_twist_prun[i >> 1] >> ((i & 1) << 2)) & 15 >= depth:
+                continue
+
+            i = s * N_FLIP + f
+
+            if (slice_flip_prun[i >> 1] >> ((i & 1) << 2)) & 15 >= depth:
+                continue
+
+            # a phase 1 solution ending in a G1 move was already
+            # tried one depth earlier
+            if depth == 1 and m in PHASE2_MOVES:
+                continue
+
+            self.moves.append(m)
+
+            if self._phase1(t, f, s, depth - 1, face):
+                return True
+
+            self.moves.pop()
+
+        return False
+
+    def _start_phase2(self):
+
+        cubies = self.cubies
+
+        for m in self.moves:
+            cubies = apply_cubie_move(cubies, m)
+
+        cp, _, ep, _ = cubies
+
+        corner = get_corner_perm(cp)
+        edge = get_ud_edge_perm(ep)
+        slice_perm = get_slice_perm(ep)
+
+        budget = self.max_length - len(self.moves)
+
+        bound = max(
+            tablecache.nibble(self.corner_slice_prun, corner * N_SLICE_PERM + slice_perm),
+            tablecache.nibble(self.edge_slice_prun, edge * N_SLICE_PERM + slice_perm)
+        )
+
+        self.split = len(self.moves)
+
+        for depth in range(bound, budget + 1):
+
+            if self._phase2(corner, edge, slice_perm, depth, -1):
+                return True
+
+        if not self.moves:
+            return False
+
+        # phase 2 may open on the face phase 1 ended with, since a
+        # cube one R from solved is R away from G1 and then R2 from
+        # solved: R R2 is played as R'. The merged turn buys one more
+        # move, and as phase 1 always ends in a quarter turn of R, L,
+        # F or B, only the half turn of that face can use it
+        m = self.moves[-1] // 3 * 3 + 1
+
+        c = self.corner_move[corner * N_MOVES + m]
+        e = self.edge_move[edge * N_MOVES + m]
+        s = self.slice_perm_move[slice_perm * N_MOVES + m]
+
+        if max(
+            tablecache.nibble(self.corner_slice_prun, c * N_SLICE_PERM + s),
+            tablecache.nibble(self.edge_slice_prun, e * N_SLICE_PERM + s)
+        ) > budget:
+            return False
+
+        self.moves.append(m)
+
+        if self._phase2(c, e, s, budget, m // 3):
+            return True
+
+        self.moves.pop()
+
+        return False
+
+    def _phase2(self, corner, edge, slice_perm, depth, last_face):
+
+        if depth == 0:
+            return corner == 0 and edge == 0 and slice_perm == 0
+
+        self.nodes += 1
+
+        if self.nodes & 0x3FF == 0 and time.perf_counter() > self.deadline:
+            raise TimeoutError("no solution found in time")
+
+        corner_move = self.corner_move
+        edge_move = self.edge_move
+        slice_perm_move = self.slice_perm_move
+        corner_slice_prun = self.corner_slice_prun
+        edge_slice_prun = self.edge_slice_prun
+
+        corner *= N_MOVES
+        edge *= N_MOVES
+        slice_perm *= N_MOVES
+
+        for m, face in _PHASE2_NEXT[last_face]:
+
+            c = corner_move[corner + m]
+            s = slice_perm_move[slice_perm + m]
+
+            i = c * N_SLICE_PERM + s
+
+            if (corner_slice_prun[i >> 1] >> ((i & 1) << 2)) & 15 >= depth:
+                continue
+
+            e = edge_move[edge + m]
+
+            i = e * N_SLICE_PERM + s
+
+            if (edge_slice_prun[i >> 1] >> ((i & 1) << 2)) & 15 >= depth:
+                continue
+
+            self.moves.append(m)
+
+            if self._phase2(c, e, s, depth - 1, face):
+                return True
+
+            self.moves.pop()
+
+        return False
+
+def _merge(moves, split):
+
+    # joins the last phase 1 turn and the first phase 2 turn when
+    # they are on the same face; a phase 1 solution never ends in a
+    # G1 move, so the pair is a quarter and a half turn and never
+    # cancels out
+    if 0 < split < len(moves) and moves[split - 1] // 3 == moves[split] // 3:
+        face = moves[split] // 3
+        power = (moves[split - 1] % 3 + moves[split] % 3 + 2) % 4 - 1
+        return moves[:split - 1] + [face * 3 + power] + moves[split + 1:]
+
+    return moves
+
+# ============================================================
+# PUBLIC API
+# ============================================================
+
+def solve(state, max_length=24, timeout=10.0):
+
+    # returns a list of move names in MOVES notation that brings
+    # state back to solved; raises ValueError for impossible cubes
+    # and TimeoutError when no solution of at most max_length moves
+    # turns up within timeout seconds
+    cubies = verify(state)
+
+    if engine.is_solved(state):
+        return []
+
+    load_tables()
+
+    search = _Search(cubies, max_length, time.perf_counter() + timeout)
+
+    solution = search.run()
+
+    if solution is None:
+        raise ValueError(f"no solution within {max_length} moves")
+
+    return solution
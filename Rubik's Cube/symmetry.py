@@ -0,0 +1,102 @@
+from operator import itemgetter
+
+import engine
+
+# ============================================================
+# CUBE SYMMETRIES
+# ============================================================
+#
+# The 24 whole cube rotations, each optionally combined with the
+# L-R mirror, give 48 sticker permutations. Looking at a state
+# through any of them (engine.conjugate) gives a cube that is
+# solved by the "same" solution with its moves relabelled, so the
+# smallest of the 48 views is a canonical form shared by all
+# equivalent states.
+
+def _closure(generators):
+
+    found = [engine.IDENTITY]
+    index = 0
+
+    while index < len(found):
+
+        for generator in generators:
+            perm = engine.compose(found[index], generator)
+            if perm not in found:
+                found.append(perm)
+
+        index += 1
+
+    return found
+
+ROTATIONS = tuple(_closure([engine.ROTATIONS['x'], engine.ROTATIONS['y']]))
+
+SYMMETRIES = ROTATIONS + tuple(engine.compose(engine.MIRROR, r) for r in ROTATIONS)
+
+def _recolor_table(perm):
+
+    recolor = bytearray(range(256))
+
+    for face in range(6):
+        recolor[perm[face * 9 + 4] // 9] = face
+
+    return bytes(recolor)
+
+# one gather plus one bytes.translate per symmetry
+_VIEWS = tuple((itemgetter(*perm), _recolor_table(perm)) for perm in SYMMETRIES)
+
+def conjugate(state, symmetry):
+
+    gather, recolor = _VIEWS[symmetry]
+
+    return bytes(gather(state)).translate(recolor)
+
+def canonical(state):
+
+    # returns (canonical state, index of the symmetry producing it)
+    best = None
+    best_index = 0
+
+    for index, (gather, recolor) in enumerate(_VIEWS):
+
+        view = bytes(gather(state)).translate(recolor)
+
+        if best is None or view < best:
+            best = view
+            best_index = index
+
+    return best, best_index
+
+# ============================================================
+# RELABELLING MOVES
+# ============================================================
+
+_MOVE_OF_STATE = {
+    engine.apply_move(engine.SOLVED, name): name
+    for name in engine.MOVE_NAMES
+}
+
+def move_map(perm):
+
+    # move names on a cube -> move names on its conjugate view
+    return {
+        name: _MOVE_OF_STATE[engine.conjugate(engine.apply_move(engine.SOLVED, name), perm)]
+        for name in engine.MOVE_NAMES
+    }
+
+MOVE_MAPS = tuple(move_map(perm) for perm in SYMMETRIES)
+
+_INVERSE_MOVE_MAPS = tuple(
+    {view: name for name, view in mapping.items()}
+    for mapping in MOVE_MAPS
+)
+
+def map_moves(moves, symmetry):
+
+    # moves on a state -> the same moves on conjugate(state, symmetry)
+    return [MOVE_MAPS[symmetry][name] for name in moves]
+
+def unmap_moves(moves, symmetry):
+
+    # moves on conjugate(state, symmetry) -> the same moves on state
+    return [_INVERSE_MOVE_MAPS[symmetry][name] for name in moves]
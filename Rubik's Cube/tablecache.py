@@ -0,0 +1,138 @@
+import hashlib
+import mmap
+import os
+import shutil
+from array import array
+
+# ============================================================
+# TABLE CACHE
+# ============================================================
+#
+# Solver tables are built once and written as flat binary files
+# under <root>/<namespace>/<digest>/<name>.bin. The digest is a
+# hash of everything the tables are derived from (move
+# definitions, coordinate layouts, file format), so changing any
+# of those starts a fresh directory. Files are opened with mmap,
+# which means loading costs nothing until pages are touched and
+# every process solving at once shares one copy of each table.
+
+CACHE_ENV = 'CUBE_TABLE_CACHE'
+
+def default_root():
+
+    root = os.environ.get(CACHE_ENV)
+
+    if root:
+        return root
+
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+
+    return os.path.join(base, 'rubiks_cube_tables')
+
+def content_hash(*parts):
+
+    digest = hashlib.sha256()
+
+    for part in parts:
+        digest.update(repr(part).encode())
+        digest.update(b'\0')
+
+    return digest.hexdigest()[:16]
+
+# ============================================================
+# 4-BIT PACKED DEPTHS
+# ============================================================
+#
+# Pruning tables only hold small move counts, so two entries
+# share a byte: entry i lives in the low nibble of byte i >> 1
+# when i is even and in the high nibble when it is odd. Read it
+# with (table[i >> 1] >> ((i & 1) << 2)) & 15.
+
+def pack_nibbles(depths):
+
+    if len(depths) % 2:
+        depths = bytes(depths) + b'\0'
+
+    if max(depths) > 15:
+        raise ValueError("depth does not fit in 4 bits")
+
+    low = depths[0::2]
+    high = bytes(d << 4 for d in depths[1::2])
+
+    return bytes(a | b for a, b in zip(low, high))
+
+def nibble(table, index):
+
+    return (table[index >> 1] >> ((index & 1) << 2)) & 15
+
+# ============================================================
+# CACHE DIRECTORY
+# ============================================================
+
+class TableCache:
+
+    def __init__(self, namespace, digest, root=None):
+
+        self.base = os.path.join(root or default_root(), namespace)
+        self.directory = os.path.join(self.base, digest)
+        self._maps = []
+
+    def path(self, name):
+
+        return os.path.join(self.directory, name + '.bin')
+
+    def exists(self, name):
+
+        return os.path.exists(self.path(name))
+
+    def load(self, name, build, typecode='B'):
+
+        # returns a read-only memoryview of the table, building and
+        # writing it first when it is not in the cache yet
+        path = self.path(name)
+
+        if not os.path.exists(path):
+
+            data = build()
+
+            if isinstance(data, array):
+                data = data.tobytes()
+
+            if not self._write(path, data):
+                return memoryview(bytes(data)).cast(typecode)
+
+        with open(path, 'rb') as handle:
+            mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+
+        self._maps.append(mapped)
+
+        return memoryview(mapped).cast(typecode)
+
+    def _write(self, path, data):
+
+        try:
+            if not os.path.isdir(self.directory):
+                self._drop_stale()
+                os.makedirs(self.directory, exist_ok=True)
+
+            temp = f"{path}.{os.getpid()}.tmp"
+
+            with open(temp, 'wb') as handle:
+                handle.write(data)
+
+            os.replace(temp, path)
+
+        except OSError:
+            return False
+
+        return True
+
+    def _drop_stale(self):
+
+        # tables built from older move definitions are never read
+        # again, so clear them out when a new digest shows up
+        if not os.path.isdir(self.base):
+            return
+
+        for entry in os.listdir(self.base):
+            shutil.rmtree(os.path.join(self.base, entry), ignore_errors=True)
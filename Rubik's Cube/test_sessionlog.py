@@ -0,0 +1,34 @@
+import os
+import tempfile
+import time
+import unittest
+
+import sessionlog
+
+class CheckpointTimeTest(unittest.TestCase):
+
+    def test_time_at_matches_records_across_a_checkpoint(self):
+
+        with tempfile.TemporaryDirectory() as root:
+
+            path = os.path.join(root, 'session.cubelog')
+
+            # the pause falls between record 4, which ends the first
+            # checkpoint block, and record 5
+            with sessionlog.SessionWriter(path, size=3, every=4) as log:
+                log.record(["R", "U", "R'", "U'"])
+                time.sleep(0.5)
+                log.record(["F", "F'"])
+
+            with sessionlog.SessionReader(path) as log:
+
+                times = [0] + [elapsed for _, elapsed in log.records()]
+
+                self.assertEqual(len(times), 7)
+                self.assertGreaterEqual(times[5] - times[4], 450)
+
+                for n, elapsed in enumerate(times):
+                    self.assertEqual(log.time_at(n), elapsed)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+import engine
+
+try:
+    import numpy as np
+except ImportError as error:
+    raise ImportError("vectorized.py needs numpy (pip install numpy)") from error
+
+# ============================================================
+# BATCHED CUBES
+# ============================================================
+#
+# N cubes are an (N, 54) uint8 array laid out exactly like the
+# engine's 54 byte states, one cube per row. Every move is one
+# fancy-index gather over the whole batch.
+#
+#     cubes = solved(1_000_000)
+#     cubes = random_walk(cubes, 20, np.random.default_rng(1))
+#     print(np.bincount(misplaced_stickers(cubes)))
+
+MOVE_NAMES = engine.MOVE_NAMES
+
+# row m is the gather index of move MOVE_NAMES[m]
+PERMS = np.array([engine.PERMS[name] for name in MOVE_NAMES], dtype=np.intp)
+
+SOLVED = np.frombuffer(engine.SOLVED, dtype=np.uint8)
+
+def solved(n):
+
+    return np.tile(SOLVED, (n, 1))
+
+def from_states(states):
+
+    return np.frombuffer(b''.join(states), dtype=np.uint8).reshape(-1, engine.STICKERS).copy()
+
+def to_states(cubes):
+
+    return [row.tobytes() for row in cubes]
+
+# ============================================================
+# MOVES
+# ============================================================
+
+# np.take along axis 1 runs several times faster than the
+# equivalent cubes[:, perm] indexing on uint8 rows
+
+def apply_move(cubes, name):
+
+    # the same move on every cube
+    return np.take(cubes, PERMS[MOVE_NAMES.index(name)], axis=1)
+
+def apply_sequence(cubes, moves):
+
+    # the whole sequence is folded into one permutation first
+    return np.take(cubes, np.array(engine.sequence_perm(moves), dtype=np.intp), axis=1)
+
+def apply_move_indices(cubes, moves):
+
+    # a different move on each cube: moves holds one index into
+    # MOVE_NAMES per row. Rows are grouped by move so that each
+    # group is still a single gather.
+    result = np.empty_like(cubes)
+
+    for m in range(len(MOVE_NAMES)):
+
+        rows = np.flatnonzero(moves == m)
+
+        if len(rows):
+            result[rows] = np.take(cubes[rows], PERMS[m], axis=1)
+
+    return result
+
+def random_walk(cubes, length, rng=None):
+
+    # length uniformly random moves on every cube, like
+    # generate_scramble does for a single one
+    rng = rng or np.random.default_rng()
+
+    for _ in range(length):
+        cubes = apply_move_indices(cubes, rng.integers(0, len(MOVE_NAMES), len(cubes)))
+
+    return cubes
+
+# ============================================================
+# REDUCTIONS
+# ============================================================
+
+def is_solved(cubes):
+
+    faces = cubes.reshape(len(cubes), 6, 9)
+
+    return (faces == faces[:, :, 4:5]).all(axis=(1, 2))
+
+def misplaced_stickers(cubes):
+
+    # how many stickers differ from the solved cube (0 .. 48)
+    return (cubes != SOLVED).sum(axis=1)
+
+def solved_faces(cubes):
+
+    faces = cubes.reshape(len(cubes), 6, 9)
+
+    return (faces == faces[:, :, 4:5]).all(axis=2).sum(axis=1)
+
+def sticker_histogram(cubes):
+
+    # counts[n, face, color]: stickers of each colour on each face
+    faces = cubes.reshape(len(cubes), 6, 9)
+    counts = np.empty((len(cubes), 6, 6), dtype=np.uint8)
+
+    for color in range(6):
+        counts[:, :, color] = (faces == color).sum(axis=2)
+
+    return counts
+
+def batch_sticker_histogram(cubes):
+
+    # the same counts summed over the whole batch, shape (6, 6)
+    faces = cubes.reshape(len(cubes), 6, 9)
+
+    return np.stack([
+        np.bincount(faces[:, face, :].ravel(), minlength=6)
+        for face in range(6)
+    ])
@@ -0,0 +1,177 @@
+import random
+from collections import OrderedDict
+
+import engine
+import symmetry
+
+# ============================================================
+# ZOBRIST HASHING
+# ============================================================
+#
+# Every (sticker, colour) pair gets a fixed random 64-bit key and
+# the hash of a state is the XOR of the keys of its 54 stickers.
+# A face turn only moves 20 stickers, so the hash after a move is
+# the old hash XOR the keys those 20 stickers leave and enter:
+# constant work per move instead of rehashing the whole state.
+
+_rng = random.Random(0x5EED_C0BE)
+
+KEYS = tuple(
+    tuple(_rng.getrandbits(64) for _ in range(6))
+    for _ in range(engine.STICKERS)
+)
+
+def zobrist_hash(state):
+
+    value = 0
+
+    for index, color in enumerate(state):
+        value ^= KEYS[index][color]
+
+    return value
+
+# the sticker positions each move rewrites
+MOVED = {
+    name: tuple(i for i, source in enumerate(perm) if source != i)
+    for name, perm in engine.PERMS.items()
+}
+
+def update_hash(value, state, name):
+
+    # hash of apply_move(state, name) given value == hash of state
+    perm = engine.PERMS[name]
+
+    for index in MOVED[name]:
+        keys = KEYS[index]
+        value ^= keys[state[index]] ^ keys[state[perm[index]]]
+
+    return value
+
+class HashedCube:
+
+    # an immutable cube state that carries its own Zobrist hash
+
+    __slots__ = ('state', 'hash')
+
+    def __init__(self, state=engine.SOLVED, value=None):
+
+        self.state = bytes(state)
+        self.hash = zobrist_hash(self.state) if value is None else value
+
+    def move(self, name):
+
+        return HashedCube(
+            engine.apply_move(self.state, name),
+            update_hash(self.hash, self.state, name)
+        )
+
+    def moves(self, names):
+
+        cube = self
+
+        for name in names:
+            cube = cube.move(name)
+
+        return cube
+
+    def __hash__(self):
+
+        return self.hash
+
+    def __eq__(self, other):
+
+        return isinstance(other, HashedCube) and self.state == other.state
+
+# ============================================================
+# SYMMETRY-REDUCED KEYS
+# ============================================================
+
+def canonical_key(state):
+
+    # returns (hash of the canonical state, symmetry index); states
+    # that are rotations or mirror images of each other share the
+    # hash, and the index relates each one to the canonical view
+    view, index = symmetry.canonical(state)
+
+    return zobrist_hash(view), index
+
+# ============================================================
+# TRANSPOSITION TABLE
+# ============================================================
+
+class TranspositionTable:
+
+    # least recently used cache keyed by canonical hash:
+    #
+    #     table = TranspositionTable(100_000)
+    #     value, index = table.lookup(state)
+    #     if value is None:
+    #         table.store(state, compute(state))
+
+    def __init__(self, capacity=100_000):
+
+        self.capacity = capacity
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+
+        return len(self.entries)
+
+    def get(self, key, default=None):
+
+        value = self.entries.get(key, default)
+
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+        else:
+            self.misses += 1
+
+        return value
+
+    def put(self, key, value):
+
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+
+        while len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+
+    def lookup(self, state):
+
+        # returns (stored value or None, symmetry index of state)
+        key, index = canonical_key(state)
+
+        return self.get(key), index
+
+    def store(self, state, value):
+
+        key, index = canonical_key(state)
+
+        self.put(key, value)
+
+        return index
+
+    def clear(self):
+
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+def memoized(table, state, compute):
+
+    # compute(state) returns a move list that solves state. Results
+    # are stored for the canonical view, so every rotation or mirror
+    # image of a solved-before state is answered from the table.
+    key, index = canonical_key(state)
+
+    moves = table.get(key)
+
+    if moves is None:
+        moves = compute(state)
+        table.put(key, symmetry.map_moves(moves, index))
+        return moves
+
+    return symmetry.unmap_moves(moves, index)
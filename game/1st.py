@@ -2,18 +2,20 @@ import pygame
 import random
 import math
 import json
+from functools import lru_cache
+
+from cosmic_core import (
+    SW, SH, FPS, PLAYER_SPEED, PLAYER_SIZE, COIN_SIZE, PLATFORM_H, ENEMY_SIZE,
+    DIVE_SIZE, POWERUP_SIZE, PLAYING, GAME_OVER, WIN, DiveEnemy, Input, Player, World,
+)
+from cosmic_particles import ParticleSystem
 
 # ─── INIT ────────────────────────────────────────────────────────────────────
 pygame.init()
 pygame.mixer.init()
 
 # ─── CONSTANTS ───────────────────────────────────────────────────────────────
-SW, SH = 900, 650
-FPS    = 60
-
-GRAVITY      = 0.7
-JUMP_POWER   = -15
-PLAYER_SPEED = 5
+# Screen size, frame rate and physics live in cosmic_core.
 
 # Colour palette
 BLACK   = (0,   0,   0)
@@ -49,6 +51,12 @@ font_md = pygame.font.SysFont("consolas", 28, bold=True)
 font_sm = pygame.font.SysFont("consolas", 20)
 font_xs = pygame.font.SysFont("consolas", 15)
 
+# ─── TEXT CACHE ──────────────────────────────────────────────────────────────
+@lru_cache(maxsize=1024)
+def render_text(font, text, color):
+    """Cached text surface; shared between callers, so never modify it."""
+    return font.render(text, True, color)
+
 # ─── SYNTHESISED SOUNDS  (no .wav files needed) ───────────────────────────────
 def _beep(freq=440, dur=0.08, vol=0.25, shape="square"):
     rate = 44100
@@ -115,40 +123,22 @@ def draw_bg(surf):
         s.draw(surf)
 
 # ─── PARTICLES ───────────────────────────────────────────────────────────────
-particles = []
+particles = ParticleSystem()
 
 def spawn_particles(x, y, color, n=12, spd=(1, 5)):
-    for _ in range(n):
-        a = random.uniform(0, 2 * math.pi)
-        v = random.uniform(*spd)
-        particles.append({
-            "x": float(x), "y": float(y),
-            "vx": math.cos(a) * v, "vy": math.sin(a) * v,
-            "life": random.randint(20, 45),
-            "max":  45,
-            "r":    random.randint(2, 5),
-            "col":  color,
-        })
+    particles.spawn(x, y, color, n, spd)
 
 def update_draw_particles(surf):
-    survivors = []
-    for p in particles:
-        p["x"]  += p["vx"]
-        p["y"]  += p["vy"]
-        p["vy"] += 0.15          # weak gravity pulls sparks downward
-        p["life"] -= 1
-        if p["life"] > 0:
-            a = p["life"] / p["max"]
-            c = tuple(max(0, int(v * a)) for v in p["col"])
-            pygame.draw.circle(surf, c, (int(p["x"]), int(p["y"])), p["r"])
-            survivors.append(p)
-    particles[:] = survivors
+    particles.update()
+    particles.draw(surf)
 
 # ─── FLOATING SCORE POPUP ────────────────────────────────────────────────────
 popups = []
 
 def spawn_popup(x, y, text, color=YELLOW):
-    popups.append({"x": x, "y": float(y), "text": text, "col": color, "life": 55})
+    # Each popup fades its own copy of the cached text
+    img = render_text(font_xs, text, color).copy()
+    popups.append({"x": x, "y": float(y), "img": img, "life": 55})
 
 def update_draw_popups(surf):
     survivors = []
@@ -156,505 +146,284 @@ def update_draw_popups(surf):
         p["y"]   -= 1.1
         p["life"] -= 1
         if p["life"] > 0:
-            a = p["life"] / 55
-            c = tuple(max(0, int(v * a)) for v in p["col"])
-            img = font_xs.render(p["text"], True, c)
+            img = p["img"]
+            img.set_alpha(int(255 * p["life"] / 55))
             surf.blit(img, (p["x"] - img.get_width() // 2, int(p["y"])))
             survivors.append(p)
     popups[:] = survivors
 
-# ─── PLAYER ──────────────────────────────────────────────────────────────────
-class Player(pygame.sprite.Sprite):
-    TRAIL_LEN  = 12
-    INV_FRAMES = 110     # invincibility frames after getting hit
-
-    def __init__(self):
-        super().__init__()
-        # Build drawn ship sprite at runtime — no image files needed
-        self.base_img = self._make_img()
-        self.image    = self.base_img.copy()
-        self.rect     = self.image.get_rect(center=(SW // 2, SH - 100))
-
-        self.vx = self.vy = 0.0
-        self.on_ground     = False
-        self.double_avail  = True   # can we still double-jump?
-        self.lives         = 3
-        self.inv_t         = 0      # invincibility countdown
-        self.speed         = PLAYER_SPEED
-        self.speed_timer   = 0
-        self.cur_platform  = None   # platform we're standing on (for moving-platform drag)
-        self.magnet        = False  # magnet power-up active?
-        self.magnet_timer  = 0
-        self.trail         = []     # list of (x, y) for afterimage trail
-        self.dir           = 1      # 1 = facing right, -1 = facing left
-
-    @staticmethod
-    def _make_img():
-        """Draw a small spaceship polygon — distinct from simple rectangles."""
-        s = pygame.Surface((38, 44), pygame.SRCALPHA)
-        # Fuselage
-        pygame.draw.polygon(s, CYAN,   [(19, 0), (4, 38), (34, 38)])
-        pygame.draw.polygon(s, BLUE,   [(19, 6), (8, 36), (30, 36)])
-        # Cockpit window
-        pygame.draw.ellipse(s, WHITE,  (12, 10, 14, 10))
-        pygame.draw.ellipse(s, CYAN,   (13, 11, 12,  8))
-        # Engine glow (bottom)
-        pygame.draw.ellipse(s, ORANGE, (12, 36, 14,  6))
-        return s
-
-    def update(self, platforms_group, coin_group):
-        # ── Speed boost countdown ────────────────────────────────────────────
-        if self.speed_timer > 0:
-            self.speed_timer -= 1
-            if self.speed_timer == 0:
-                self.speed = PLAYER_SPEED
-
-        # ── Magnet countdown ─────────────────────────────────────────────────
-        if self.magnet_timer > 0:
-            self.magnet_timer -= 1
-            self.magnet = self.magnet_timer > 0
-            # Pull nearby coins toward player
-            if self.magnet:
-                for coin in coin_group:
-                    dx = self.rect.centerx - coin.rect.centerx
-                    dy = self.rect.centery  - coin.rect.centery
-                    dist = math.hypot(dx, dy)
-                    if dist < 180 and dist > 1:
-                        coin.rect.x += int(dx / dist * 4)
-                        coin.rect.y += int(dy / dist * 4)
-
-        # ── Moving-platform drag ─────────────────────────────────────────────
-        if self.cur_platform:
-            self.rect.x += self.cur_platform.velocity
-
-        # ── Horizontal movement ──────────────────────────────────────────────
-        keys = pygame.key.get_pressed()
-        self.vx = 0
-        if keys[pygame.K_LEFT]  or keys[pygame.K_a]:
-            self.vx  = -self.speed
-            self.dir = -1
-        if keys[pygame.K_RIGHT] or keys[pygame.K_d]:
-            self.vx  =  self.speed
-            self.dir =  1
-
-        self.rect.x += int(self.vx)
-
-        # Horizontal screen wrapping
-        if self.rect.right < 0:        self.rect.left  = SW
-        elif self.rect.left > SW:      self.rect.right = 0
-
-        # ── Gravity & vertical movement ──────────────────────────────────────
-        self.vy      += GRAVITY
-        self.rect.y  += int(self.vy)
-
-        # Ground floor
-        if self.rect.bottom >= SH - 10:
-            self.rect.bottom = SH - 10
-            self._land()
-
-        # ── Platform collisions ──────────────────────────────────────────────
-        self.on_ground    = False
-        self.cur_platform = None
-        for plat in platforms_group:
-            # Only land on top surface when falling downward
-            if (self.vy >= 0
-                    and self.rect.bottom > plat.rect.top
-                    and self.rect.bottom - self.vy <= plat.rect.top + 4
-                    and self.rect.right  > plat.rect.left + 4
-                    and self.rect.left   < plat.rect.right - 4):
-                self.rect.bottom  = plat.rect.top
-                self.cur_platform = plat
-                self._land()
-                break
-
-        # ── Trail (for speed-boost afterimage) ──────────────────────────────
-        self.trail.append((self.rect.centerx, self.rect.centery))
-        if len(self.trail) > self.TRAIL_LEN:
-            self.trail.pop(0)
-
-        # ── Invincibility flicker ────────────────────────────────────────────
-        if self.inv_t > 0:
-            self.inv_t -= 1
-            # Alternate opacity so the player visibly blinks
-            alpha = 80 if (self.inv_t // 5) % 2 == 0 else 255
-        else:
-            alpha = 255
-
-        # Flip sprite horizontally when moving left
-        flipped = pygame.transform.flip(self.base_img, self.dir == -1, False)
-        flipped.set_alpha(alpha)
-        self.image = flipped
-
-    def _land(self):
-        self.vy           = 0
-        self.on_ground    = True
-        self.double_avail = True
-
-    def jump(self):
-        if self.on_ground:
-            self.vy        = JUMP_POWER
-            self.on_ground = False
+# ─── SPRITE IMAGES ───────────────────────────────────────────────────────────
+# Drawn once at start-up; the simulation only knows rectangles.
+def _player_img():
+    """Draw a small spaceship polygon — distinct from simple rectangles."""
+    s = pygame.Surface(PLAYER_SIZE, pygame.SRCALPHA)
+    # Fuselage
+    pygame.draw.polygon(s, CYAN,   [(19, 0), (4, 38), (34, 38)])
+    pygame.draw.polygon(s, BLUE,   [(19, 6), (8, 36), (30, 36)])
+    # Cockpit window
+    pygame.draw.ellipse(s, WHITE,  (12, 10, 14, 10))
+    pygame.draw.ellipse(s, CYAN,   (13, 11, 12,  8))
+    # Engine glow (bottom)
+    pygame.draw.ellipse(s, ORANGE, (12, 36, 14,  6))
+    return s
+
+def _coin_img():
+    s = pygame.Surface(COIN_SIZE, pygame.SRCALPHA)
+    pygame.draw.circle(s, YELLOW,            (11, 11), 11)
+    pygame.draw.circle(s, (200, 170, 0),     (11, 11),  9)
+    pygame.draw.circle(s, (240, 210, 80),    ( 8,  8),  4)
+    return s
+
+def _platform_img(w, crumble):
+    s = pygame.Surface((w, PLATFORM_H), pygame.SRCALPHA)
+    col = (180, 80, 80) if crumble else (60, 200, 120)
+    dim = (100, 40, 40) if crumble else (30, 120, 60)
+    pygame.draw.rect(s, col, (0, 0, w, 18), border_radius=6)
+    pygame.draw.rect(s, dim, (0, 0, w, 18), width=2, border_radius=6)
+    # Dashed top highlight
+    for i in range(0, w - 10, 18):
+        pygame.draw.line(s, WHITE, (i + 4, 4), (i + 12, 4), 1)
+    return s
+
+def _enemy_img():
+    s = pygame.Surface(ENEMY_SIZE, pygame.SRCALPHA)
+    pygame.draw.ellipse(s, RED,    (0,  4, 46, 20))
+    pygame.draw.ellipse(s, ORANGE, (6,  8, 34, 12))
+    # Eyes
+    pygame.draw.circle(s, WHITE,   (14, 10),  5)
+    pygame.draw.circle(s, WHITE,   (32, 10),  5)
+    pygame.draw.circle(s, BLACK,   (15, 10),  3)
+    pygame.draw.circle(s, BLACK,   (33, 10),  3)
+    # Tentacles
+    for i, tx in enumerate([8, 18, 28, 38]):
+        pygame.draw.line(s, RED, (tx, 24), (tx + (i % 2)*4 - 2, 28), 2)
+    return s
+
+def _dive_img():
+    s = pygame.Surface(DIVE_SIZE, pygame.SRCALPHA)
+    pygame.draw.polygon(s, PURPLE, [(17, 0), (34, 34), (17, 24), (0, 34)])
+    pygame.draw.circle(s, WHITE,   (17, 12), 5)
+    pygame.draw.circle(s, RED,     (17, 12), 3)
+    return s
+
+def _powerup_img(col, icon):
+    s = pygame.Surface(POWERUP_SIZE, pygame.SRCALPHA)
+    pygame.draw.circle(s, col,   (14, 14), 14)
+    pygame.draw.circle(s, WHITE, (14, 14), 14, 2)
+    txt = font_xs.render(icon, True, BLACK)
+    s.blit(txt, txt.get_rect(center=(14, 14)))
+    return s
+
+# ─── ASSET CACHE ─────────────────────────────────────────────────────────────
+# Every variant a frame can ask for is baked here once, converted to the display
+# format, so drawing the world only picks surfaces and never allocates.
+BLINK_ALPHA = 80      # player opacity on the "off" beat while invincible
+CRUMBLE_T   = 60      # frames a crumbling platform takes to vanish
+ROT_STEP    = 1.5     # degrees a power-up turns per frame
+
+def _baked(s, alpha=None):
+    s = s.convert_alpha()
+    if alpha is not None:
+        s.set_alpha(alpha)
+    return s
+
+def _trail_alphas():
+    """Every alpha draw_trail can ask for, over all trail lengths."""
+    return {int(120 * i / n) for n in range(1, Player.TRAIL_LEN + 1) for i in range(n)}
+
+def _trail_img(a):
+    s = pygame.Surface(PLAYER_SIZE, pygame.SRCALPHA)
+    s.fill((0, 220, 255, a))
+    return _baked(s)
+
+def _spin_frames(img):
+    """One rotated copy per angle a power-up passes through, with its centre offset."""
+    frames = []
+    for i in range(round(360 / ROT_STEP)):
+        r = _baked(pygame.transform.rotate(img, i * ROT_STEP))
+        frames.append((r, (r.get_width() // 2, r.get_height() // 2)))
+    return frames
+
+# (facing, alpha) -> surface; facing is Player.dir
+_ship       = _player_img()
+img_player  = {(d, a): _baked(pygame.transform.flip(_ship, d == -1, False), a)
+               for d in (1, -1) for a in (255, BLINK_ALPHA)}
+img_trail   = {a: _trail_img(a) for a in _trail_alphas()}
+img_coin    = _baked(_coin_img())
+img_enemy   = _baked(_enemy_img())
+img_dive    = _baked(_dive_img())
+img_powerup = {kind: _spin_frames(_powerup_img(col, icon)) for kind, (col, icon) in PU_DEFS.items()}
+# (width, crumble) -> surface; widths are random per level, so each one is
+# baked the first frame its level is drawn
+img_plat    = {}
+
+def platform_img(plat):
+    key = (plat.rect.w, plat.crumble)
+    if key not in img_plat:
+        img_plat[key] = _baked(_platform_img(*key))
+    img = img_plat[key]
+    if plat.crumble:
+        # Crumbling platforms of one width share a surface, so its fade is set
+        # right before every blit rather than baked 60 times over
+        img.set_alpha(int(255 * plat.crumble_t / CRUMBLE_T) if plat.crumble_t else 255)
+    return img
+
+# ─── WORLD RENDERING ─────────────────────────────────────────────────────────
+def draw_trail(surf, pl):
+    """Draw faint afterimage trail (visible during speed boost)."""
+    if pl.speed <= PLAYER_SPEED:
+        return
+    for i, (tx, ty) in enumerate(pl.trail):
+        surf.blit(img_trail[int(120 * i / len(pl.trail))], (tx - 19, ty - 22))
+
+def draw_world(surf, world):
+    for plat in world.platforms:
+        # Crumbling platforms fade out over their last 60 frames
+        surf.blit(platform_img(plat), plat.rect.topleft)
+
+    for coin in world.coins:
+        surf.blit(img_coin, coin.rect.topleft)
+
+    for pu in world.powerups:
+        img, (hw, hh) = img_powerup[pu.kind][round(pu.rot / ROT_STEP)]
+        cx, cy = pu.rect.center
+        surf.blit(img, (cx - hw, cy - hh))
+
+    for en in world.enemies:
+        surf.blit(img_dive if isinstance(en, DiveEnemy) else img_enemy, en.rect.topleft)
+
+    pl = world.player
+    # Alternate opacity so the player visibly blinks while invincible
+    alpha = BLINK_ALPHA if pl.inv_t > 0 and (pl.inv_t // 5) % 2 == 0 else 255
+    surf.blit(img_player[pl.dir, alpha], pl.rect.topleft)
+
+def play_events(events):
+    """Sounds, sparks and popups for what happened in the last frame."""
+    for event in events:
+        kind, x, y = event[:3]
+        if kind == "jump":
             snd_jump.play()
-            spawn_particles(self.rect.centerx, self.rect.bottom, CYAN, 8, (1, 3))
-        elif self.double_avail:
-            # Double-jump: slightly weaker, different sound
-            self.vy           = JUMP_POWER * 0.85
-            self.double_avail = False
+            spawn_particles(x, y, CYAN, 8, (1, 3))
+        elif kind == "double_jump":
+            # Different sound for the double-jump
             snd_djump.play()
-            spawn_particles(self.rect.centerx, self.rect.bottom, YELLOW, 12, (1, 4))
-
-    def hurt(self):
-        """Called when the player takes a hit; starts invincibility frames."""
-        if self.inv_t > 0:
-            return False      # still invincible — ignore hit
-        self.lives -= 1
-        self.inv_t  = self.INV_FRAMES
-        snd_hit.play()
-        spawn_particles(self.rect.centerx, self.rect.centery, RED, 25, (2, 6))
-        return True
-
-    def draw_trail(self, surf):
-        """Draw faint afterimage trail (visible during speed boost)."""
-        if self.speed <= PLAYER_SPEED:
-            return
-        for i, (tx, ty) in enumerate(self.trail):
-            a = int(120 * i / len(self.trail))
-            s = pygame.Surface((38, 44), pygame.SRCALPHA)
-            s.fill((0, 220, 255, a))
-            surf.blit(s, (tx - 19, ty - 22))
-
-# ─── COIN ────────────────────────────────────────────────────────────────────
-class Coin(pygame.sprite.Sprite):
-    def __init__(self, x, y, value=10):
-        super().__init__()
-        self.value  = value
-        self.offset = random.uniform(0, 2 * math.pi)
-        self.image  = self._make_img()
-        self.rect   = self.image.get_rect(center=(x, y))
-        self._base_y = y   # stored so floating bob is relative to spawn
-
-    @staticmethod
-    def _make_img():
-        s = pygame.Surface((22, 22), pygame.SRCALPHA)
-        pygame.draw.circle(s, YELLOW,            (11, 11), 11)
-        pygame.draw.circle(s, (200, 170, 0),     (11, 11),  9)
-        pygame.draw.circle(s, (240, 210, 80),    ( 8,  8),  4)
-        return s
-
-    def update(self):
-        # Gentle sine-wave float
-        self.rect.centery = int(self._base_y + math.sin(
-            pygame.time.get_ticks() / 400 + self.offset) * 5)
-
-# ─── PLATFORM ────────────────────────────────────────────────────────────────
-class Platform(pygame.sprite.Sprite):
-    def __init__(self, x, y, w, velocity=0, crumble=False):
-        super().__init__()
-        self.velocity  = velocity
-        self.crumble   = crumble       # crumbling platforms disappear after being stood on
-        self.crumble_t = 0             # countdown once player lands
-        self.image     = self._make_img(w, crumble)
-        self.rect      = self.image.get_rect(topleft=(x, y))
-
-    @staticmethod
-    def _make_img(w, crumble):
-        s = pygame.Surface((w, 18), pygame.SRCALPHA)
-        col = (180, 80, 80) if crumble else (60, 200, 120)
-        dim = (100, 40, 40) if crumble else (30, 120, 60)
-        pygame.draw.rect(s, col, (0, 0, w, 18), border_radius=6)
-        pygame.draw.rect(s, dim, (0, 0, w, 18), width=2, border_radius=6)
-        # Dashed top highlight
-        for i in range(0, w - 10, 18):
-            pygame.draw.line(s, WHITE, (i + 4, 4), (i + 12, 4), 1)
-        return s
-
-    def update(self):
-        # Bounce moving platforms off screen edges
-        if self.velocity:
-            self.rect.x += self.velocity
-            if self.rect.left < 0 or self.rect.right > SW:
-                self.velocity *= -1
-
-        # Crumble: start dissolving after player stands on it
-        if self.crumble_t > 0:
-            self.crumble_t -= 1
-            # Flash red then vanish
-            alpha = int(255 * self.crumble_t / 60)
-            self.image.set_alpha(alpha)
-            if self.crumble_t == 0:
-                self.kill()
-
-    def trigger_crumble(self):
-        if self.crumble and self.crumble_t == 0:
-            self.crumble_t = 60
-
-# ─── ENEMIES ─────────────────────────────────────────────────────────────────
-class Enemy(pygame.sprite.Sprite):
-    """Horizontal patrol enemy that floats sinusoidally."""
-    def __init__(self, x, y, spd=None):
-        super().__init__()
-        self.speed  = (spd or random.uniform(2, 5)) * random.choice([-1, 1])
-        self.offset = random.uniform(0, 2 * math.pi)
-        self.base_y = float(y)
-        self.image  = self._make_img()
-        self.rect   = self.image.get_rect(center=(x, y))
-
-    @staticmethod
-    def _make_img():
-        s = pygame.Surface((46, 28), pygame.SRCALPHA)
-        pygame.draw.ellipse(s, RED,    (0,  4, 46, 20))
-        pygame.draw.ellipse(s, ORANGE, (6,  8, 34, 12))
-        # Eyes
-        pygame.draw.circle(s, WHITE,   (14, 10),  5)
-        pygame.draw.circle(s, WHITE,   (32, 10),  5)
-        pygame.draw.circle(s, BLACK,   (15, 10),  3)
-        pygame.draw.circle(s, BLACK,   (33, 10),  3)
-        # Tentacles
-        for i, tx in enumerate([8, 18, 28, 38]):
-            pygame.draw.line(s, RED, (tx, 24), (tx + (i % 2)*4 - 2, 28), 2)
-        return s
-
-    def update(self):
-        self.rect.x += int(self.speed)
-        # Wrap around screen edges instead of despawning
-        if self.rect.right < 0:   self.rect.left  = SW
-        elif self.rect.left > SW: self.rect.right = 0
-        # Bob up and down
-        self.rect.centery = int(self.base_y + math.sin(
-            pygame.time.get_ticks() / 350 + self.offset) * 8)
-
-
-class DiveEnemy(pygame.sprite.Sprite):
-    """Swoops down at the player periodically."""
-    DIVE_SPEED = 8
-
-    def __init__(self, x):
-        super().__init__()
-        self.image  = self._make_img()
-        self.rect   = self.image.get_rect(center=(x, 30))
-        self.base_x = float(x)
-        self.base_y = 30.0
-        self.diving = False
-        self.timer  = random.randint(90, 200)   # frames until next dive
-        self.target_y = SH // 2
-
-    @staticmethod
-    def _make_img():
-        s = pygame.Surface((34, 34), pygame.SRCALPHA)
-        pygame.draw.polygon(s, PURPLE, [(17, 0), (34, 34), (17, 24), (0, 34)])
-        pygame.draw.circle(s, WHITE,   (17, 12), 5)
-        pygame.draw.circle(s, RED,     (17, 12), 3)
-        return s
-
-    def update(self):
-        if not self.diving:
-            # Hover slowly across the top
-            self.base_x += 1.2
-            if self.base_x > SW: self.base_x = 0
-            self.rect.centerx = int(self.base_x)
-            self.timer -= 1
-            if self.timer <= 0:
-                self.diving  = True
-                self.timer   = 0
-        else:
-            # Dive straight down
-            self.rect.y += self.DIVE_SPEED
-            if self.rect.top > SH:
-                # Reset back to top after completing dive
-                self.rect.center = (int(self.base_x), 30)
-                self.diving = False
-                self.timer  = random.randint(90, 200)
-
-# ─── POWER-UP ────────────────────────────────────────────────────────────────
-class PowerUp(pygame.sprite.Sprite):
-    def __init__(self, x, y, kind):
-        super().__init__()
-        self.kind   = kind
-        self.offset = random.uniform(0, 2 * math.pi)
-        self.base_y = float(y)
-        self.rot    = 0
-        col, icon   = PU_DEFS[kind]
-        self._orig  = self._make_img(col, icon)
-        self.image  = self._orig
-        self.rect   = self.image.get_rect(center=(x, y))
-
-    @staticmethod
-    def _make_img(col, icon):
-        s = pygame.Surface((28, 28), pygame.SRCALPHA)
-        pygame.draw.circle(s, col,   (14, 14), 14)
-        pygame.draw.circle(s, WHITE, (14, 14), 14, 2)
-        txt = font_xs.render(icon, True, BLACK)
-        s.blit(txt, txt.get_rect(center=(14, 14)))
-        return s
-
-    def update(self):
-        self.rot = (self.rot + 1.5) % 360
-        self.image = pygame.transform.rotate(self._orig, self.rot)
-        self.rect  = self.image.get_rect(center=(
-            self.rect.centerx,
-            int(self.base_y + math.sin(pygame.time.get_ticks() / 300 + self.offset) * 6)
-        ))
-
-# ─── LEVEL GENERATOR ─────────────────────────────────────────────────────────
-def generate_level(level_num):
-    """
-    Procedurally place platforms, coins, and enemies scaled to level number.
-    Higher levels: more gaps, faster enemies, crumbling platforms.
-    """
-    plats = []
-    # Guaranteed safe ground-level platform at start
-    plats.append({"x": SW // 2 - 80, "y": SH - 70, "w": 160, "v": 0, "c": False})
-
-    rows = 5
-    for row in range(rows):
-        y   = SH - 130 - row * 100
-        n   = random.randint(2, 4)
-        xs  = sorted(random.sample(range(0, SW - 120, 60), min(n, (SW - 120) // 60)))
-        for x in xs:
-            w       = random.randint(80, 160)
-            moving  = random.random() < 0.2 + level_num * 0.06
-            crumble = random.random() < level_num * 0.07
-            vel     = random.uniform(1.5, 2.5 + level_num * 0.3) * random.choice([-1, 1]) if moving else 0
-            plats.append({"x": x, "y": y, "w": w, "v": vel, "c": crumble})
-
-    # Coins: more per level
-    coin_count = 12 + level_num * 3
-    coins = [{"x": random.randint(40, SW - 40), "y": random.randint(60, SH - 80)}
-             for _ in range(coin_count)]
-
-    # Enemies: more and faster
-    enemy_count = 2 + level_num
-    enemies = [{"x": random.randint(0, SW), "y": SH - 50, "spd": 2 + level_num * 0.4}
-               for _ in range(enemy_count)]
-
-    return plats, coins, enemies
+            spawn_particles(x, y, YELLOW, 12, (1, 4))
+        elif kind == "coin":
+            snd_coin.play()
+            spawn_particles(x, y, YELLOW, 10, (1, 4))
+            spawn_popup(x, y, f"+{event[3]}")
+        elif kind == "powerup":
+            snd_pu.play()
+            spawn_particles(x, y, WHITE, 18, (2, 5))
+            spawn_popup(x, y, event[3].upper(), PU_DEFS[event[3]][0])
+        elif kind == "hurt":
+            snd_hit.play()
+            spawn_particles(x, y, RED, 25, (2, 6))
+        elif kind == "death":
+            snd_death.play()
 
 # ─── GAME STATE ──────────────────────────────────────────────────────────────
+# PLAYING, GAME_OVER and WIN come from the world; the menu and pause
+# screens only exist in the front end.
 MENU      = "menu"
-PLAYING   = "playing"
 PAUSED    = "paused"
-GAME_OVER = "gameover"
-WIN       = "win"
-
-COINS_PER_LEVEL = 30   # coins needed to advance to next level
-
-def new_game():
-    """Initialise/reset all mutable game state."""
-    state = {
-        "mode":     PLAYING,
-        "score":    0,
-        "level":    1,
-        "coin_goal": COINS_PER_LEVEL,
-        "coins_got": 0,
-        "hs":       load_hs(),
-        "all":      pygame.sprite.Group(),
-        "plat_g":   pygame.sprite.Group(),
-        "coin_g":   pygame.sprite.Group(),
-        "enemy_g":  pygame.sprite.Group(),
-        "pu_g":     pygame.sprite.Group(),
-        "pu_timer": pygame.time.get_ticks(),
-        "enemy_timer": pygame.time.get_ticks(),
-    }
-    state["player"] = Player()
-    state["all"].add(state["player"])
-    _load_level(state)
-    return state
-
-def _load_level(st):
-    """Build sprites for the current level number."""
-    for g in ("plat_g", "coin_g", "enemy_g", "pu_g"):
-        st[g].empty()
-    # Rebuild 'all' keeping only player
-    st["all"].empty()
-    st["all"].add(st["player"])
-
-    plats, coins, enms = generate_level(st["level"])
-
-    for p in plats:
-        pl = Platform(p["x"], p["y"], p["w"], p["v"], p["c"])
-        st["all"].add(pl); st["plat_g"].add(pl)
-
-    for c in coins:
-        co = Coin(c["x"], c["y"])
-        st["all"].add(co); st["coin_g"].add(co)
-
-    for e in enms:
-        en = Enemy(e["x"], e["y"], e["spd"])
-        st["all"].add(en); st["enemy_g"].add(en)
-
-    # One dive enemy from level 2 onward
-    if st["level"] >= 2:
-        de = DiveEnemy(random.randint(100, SW - 100))
-        st["all"].add(de); st["enemy_g"].add(de)
-
-    # Reset per-level counters
-    st["coins_got"]  = 0
-    st["coin_goal"]  = COINS_PER_LEVEL + (st["level"] - 1) * 5
-    st["pu_timer"]   = pygame.time.get_ticks()
-    st["enemy_timer"]= pygame.time.get_ticks()
 
 # ─── HUD ─────────────────────────────────────────────────────────────────────
-def draw_hud(surf, st):
-    pl = st["player"]
-    # Semi-transparent top bar
-    bar = pygame.Surface((SW, 50), pygame.SRCALPHA)
-    bar.fill((10, 10, 40, 180))
-    surf.blit(bar, (0, 0))
-    pygame.draw.line(surf, CYAN, (0, 50), (SW, 50), 1)
+# The HUD is drawn into two transparent layers, the top bar and the
+# bottom strip, which are only redrawn when something they show changes.
+# The semi-transparent bar behind the top layer never changes.
+HUD_BOTTOM = 80   # height of the bottom strip: coin bar and power-up tags
+
+hud_bar    = pygame.Surface((SW, 51), pygame.SRCALPHA)
+hud_bar.fill((10, 10, 40, 180))
+pygame.draw.line(hud_bar, CYAN, (0, 50), (SW, 50), 1)
 
-    surf.blit(font_md.render(f"SCORE {st['score']:06d}", True, WHITE), (12, 10))
+hud_top    = pygame.Surface((SW, 50), pygame.SRCALPHA)
+hud_bottom = pygame.Surface((SW, HUD_BOTTOM), pygame.SRCALPHA)
+hud_key    = None
 
-    hi = st["hs"][0] if st["hs"] else 0
-    ht = font_sm.render(f"BEST {hi:06d}", True, YELLOW)
-    surf.blit(ht, (SW // 2 - ht.get_width() // 2, 14))
+def _hud_tags(pl):
+    """Active power-up indicators, listed bottom-left."""
+    tags = []
+    if pl.speed > PLAYER_SPEED:        tags.append(("SPEED",    GREEN))
+    if pl.inv_t > 0:                   tags.append(("INVINCIBLE", YELLOW))
+    if pl.magnet:                      tags.append(("MAGNET",   CYAN))
+    if pl.double_avail and not pl.on_ground: tags.append(("2×JUMP", WHITE))
+    return tuple(tags)
 
-    lv = font_md.render(f"LVL {st['level']}", True, CYAN)
-    surf.blit(lv, (SW - lv.get_width() - 120, 10))
+def _build_hud(st, hi, tags):
+    pl = st.player
+
+    hud_top.fill((0, 0, 0, 0))
+    hud_top.blit(render_text(font_md, f"SCORE {st.score:06d}", WHITE), (12, 10))
+
+    ht = render_text(font_sm, f"BEST {hi:06d}", YELLOW)
+    hud_top.blit(ht, (SW // 2 - ht.get_width() // 2, 14))
+
+    lv = render_text(font_md, f"LVL {st.level}", CYAN)
+    hud_top.blit(lv, (SW - lv.get_width() - 120, 10))
 
     # Hearts for lives
     for i in range(3):
         hx = SW - 35 - i * 28
         hy = 15
         col = RED if i < pl.lives else GREY
-        pygame.draw.circle(surf, col, (hx - 5, hy + 5), 7)
-        pygame.draw.circle(surf, col, (hx + 5, hy + 5), 7)
-        pygame.draw.polygon(surf, col, [(hx - 12, hy + 6), (hx + 12, hy + 6), (hx, hy + 20)])
+        pygame.draw.circle(hud_top, col, (hx - 5, hy + 5), 7)
+        pygame.draw.circle(hud_top, col, (hx + 5, hy + 5), 7)
+        pygame.draw.polygon(hud_top, col, [(hx - 12, hy + 6), (hx + 12, hy + 6), (hx, hy + 20)])
 
-    # Coin progress bar for level goal
+    # Coin progress bar for level goal (y is relative to the bottom strip)
+    hud_bottom.fill((0, 0, 0, 0))
     bar_w = 200
     bx = SW // 2 - bar_w // 2
-    by = SH - 24
-    pygame.draw.rect(surf, GREY, (bx, by, bar_w, 12), border_radius=6)
-    fill = int(bar_w * min(1.0, st["coins_got"] / st["coin_goal"]))
+    by = HUD_BOTTOM - 24
+    pygame.draw.rect(hud_bottom, GREY, (bx, by, bar_w, 12), border_radius=6)
+    fill = int(bar_w * min(1.0, st.coins_got / st.coin_goal))
     if fill > 0:
-        pygame.draw.rect(surf, YELLOW, (bx, by, fill, 12), border_radius=6)
-    pygame.draw.rect(surf, WHITE, (bx, by, bar_w, 12), 1, border_radius=6)
-    ct = font_xs.render(f"{st['coins_got']}/{st['coin_goal']}", True, WHITE)
-    surf.blit(ct, (bx + bar_w + 6, by))
+        pygame.draw.rect(hud_bottom, YELLOW, (bx, by, fill, 12), border_radius=6)
+    pygame.draw.rect(hud_bottom, WHITE, (bx, by, bar_w, 12), 1, border_radius=6)
+    hud_bottom.blit(render_text(font_xs, f"{st.coins_got}/{st.coin_goal}", WHITE), (bx + bar_w + 6, by))
 
-    # Active power-up indicators bottom-left
-    tags = []
-    if pl.speed > PLAYER_SPEED:        tags.append(("SPEED",    GREEN))
-    if pl.inv_t > 0:                   tags.append(("INVINCIBLE", YELLOW))
-    if pl.magnet:                      tags.append(("MAGNET",   CYAN))
-    if pl.double_avail and not pl.on_ground: tags.append(("2×JUMP", WHITE))
     for i, (tag, col) in enumerate(tags):
-        t = font_xs.render(f"◆ {tag}", True, col)
-        surf.blit(t, (12, SH - 22 - i * 18))
+        hud_bottom.blit(render_text(font_xs, f"◆ {tag}", col), (12, HUD_BOTTOM - 22 - i * 18))
+
+def draw_hud(surf, st, hs):
+    global hud_key
+    pl   = st.player
+    hi   = hs[0] if hs else 0
+    tags = _hud_tags(pl)
+    key  = (st.score, hi, st.level, pl.lives, st.coins_got, st.coin_goal, tags)
+    if key != hud_key:
+        _build_hud(st, hi, tags)
+        hud_key = key
+    surf.blit(hud_bar, (0, 0))
+    surf.blit(hud_top, (0, 0))
+    surf.blit(hud_bottom, (0, SH - HUD_BOTTOM))
 
 # ─── OVERLAY SCREENS ─────────────────────────────────────────────────────────
+overlay_dim = pygame.Surface((SW, SH), pygame.SRCALPHA)
+overlay_dim.fill((0, 0, 0, 160))
+
+@lru_cache(maxsize=16)
+def _overlay_text(lines):
+    """All lines of one screen on a transparent strip; returns (strip, y)."""
+    imgs   = [(render_text(fnt, text, col), yo) for text, fnt, col, yo in lines]
+    top    = min(yo for _, yo in imgs)
+    bottom = max(yo + img.get_height() for img, yo in imgs)
+    strip  = pygame.Surface((SW, bottom - top), pygame.SRCALPHA)
+    for img, yo in imgs:
+        strip.blit(img, (SW // 2 - img.get_width() // 2, yo - top))
+    return strip, SH // 2 + top
+
 def draw_overlay(surf, lines):
-    """Generic semi-transparent overlay with centred lines: (text, font, colour, y_offset)."""
-    ov = pygame.Surface((SW, SH), pygame.SRCALPHA)
-    ov.fill((0, 0, 0, 160))
-    surf.blit(ov, (0, 0))
-    for text, fnt, col, yo in lines:
-        img = fnt.render(text, True, col)
-        surf.blit(img, (SW // 2 - img.get_width() // 2, SH // 2 + yo))
-
-def draw_menu(surf):
+    """Generic semi-transparent overlay with centred lines: (text, font, colour, y_offset).
+    Each distinct screen's text is composed once and then reused."""
+    strip, y = _overlay_text(tuple(lines))
+    surf.blit(overlay_dim, (0, 0))
+    surf.blit(strip, (0, y))
+
+def draw_menu(surf, hs):
     draw_bg(surf)
-    hs = load_hs()
     hi = hs[0] if hs else 0
     draw_overlay(surf, [
         ("COSMIC  JUMPER",           font_xl, CYAN,   -200),
@@ -670,8 +439,8 @@ def draw_menu(surf):
 def draw_gameover(surf, st):
     draw_overlay(surf, [
         ("GAME  OVER",               font_xl, RED,    -180),
-        (f"Score  {st['score']:06d}", font_lg, WHITE,  -90),
-        (f"Level  {st['level']}",    font_md, CYAN,   -30),
+        (f"Score  {st.score:06d}",   font_lg, WHITE,  -90),
+        (f"Level  {st.level}",       font_md, CYAN,   -30),
         ("R  ·  Restart",            font_md, GREEN,   40),
         ("ESC  ·  Menu",             font_sm, GREY,    90),
     ])
@@ -679,7 +448,7 @@ def draw_gameover(surf, st):
 def draw_win(surf, st):
     draw_overlay(surf, [
         ("LEVEL  CLEAR!",             font_xl, GREEN,  -180),
-        (f"Score  {st['score']:06d}", font_lg, WHITE,   -90),
+        (f"Score  {st.score:06d}",    font_lg, WHITE,   -90),
         ("ENTER  ·  Next Level",      font_md, CYAN,    -20),
         ("ESC    ·  Menu",            font_sm, GREY,     30),
     ])
@@ -692,16 +461,18 @@ def draw_pause(surf):
     ])
 
 # ─── MAIN LOOP ───────────────────────────────────────────────────────────────
+JUMP_KEYS = (pygame.K_SPACE, pygame.K_w, pygame.K_UP)
+
 hs      = load_hs()
 mode    = MENU
 st      = None
-fade    = 0.0
 
 running = True
 while running:
-    dt = clock.tick(FPS) / 1000.0
+    clock.tick(FPS)
 
     # ── EVENTS ───────────────────────────────────────────────────────────────
+    jump = False
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
             running = False
@@ -709,14 +480,14 @@ while running:
         if event.type == pygame.KEYDOWN:
             if mode == MENU:
                 if event.key == pygame.K_RETURN:
-                    st   = new_game()
+                    st   = World()
                     mode = PLAYING
                 elif event.key == pygame.K_ESCAPE:
                     running = False
 
             elif mode == PLAYING:
-                if event.key in (pygame.K_SPACE, pygame.K_w, pygame.K_UP):
-                    st["player"].jump()
+                if event.key in JUMP_KEYS:
+                    jump = True
                 elif event.key == pygame.K_p:
                     mode = PAUSED
                 elif event.key == pygame.K_ESCAPE:
@@ -730,31 +501,28 @@ while running:
 
             elif mode == GAME_OVER:
                 if event.key == pygame.K_r:
-                    st   = new_game()
+                    st   = World()
                     mode = PLAYING
                 elif event.key == pygame.K_ESCAPE:
                     mode = MENU
 
             elif mode == WIN:
                 if event.key == pygame.K_RETURN:
-                    st["level"] += 1
-                    st["player"].rect.center = (SW // 2, SH - 100)
-                    st["player"].vy = 0
-                    _load_level(st)
+                    st.next_level()
                     mode = PLAYING
                 elif event.key == pygame.K_ESCAPE:
                     mode = MENU
 
     # ── MENU / OVERLAY ───────────────────────────────────────────────────────
     if mode == MENU:
-        draw_menu(screen)
+        draw_menu(screen, hs)
         pygame.display.flip()
         continue
 
     if mode in (PAUSED, GAME_OVER, WIN):
         # Render frozen game world beneath overlay
         draw_bg(screen)
-        st["all"].draw(screen)
+        draw_world(screen, st)
         if   mode == PAUSED:    draw_pause(screen)
         elif mode == GAME_OVER: draw_gameover(screen, st)
         elif mode == WIN:       draw_win(screen, st)
@@ -764,91 +532,31 @@ while running:
     # ══════════════════════════════════════════════════════════════════════════
     #  PLAYING
     # ══════════════════════════════════════════════════════════════════════════
-    pl = st["player"]
-
-    # ── Update all sprites ───────────────────────────────────────────────────
-    # Player update needs both platform group (for landing) and coin group (for magnet)
-    pl.update(st["plat_g"], st["coin_g"])
-
-    # Trigger crumble on platforms the player is standing on
-    if pl.cur_platform and hasattr(pl.cur_platform, "trigger_crumble"):
-        pl.cur_platform.trigger_crumble()
-
-    st["plat_g"].update()
-    st["coin_g"].update()
-    st["enemy_g"].update()
-    st["pu_g"].update()
-
-    # ── Spawn enemies over time ──────────────────────────────────────────────
-    now = pygame.time.get_ticks()
-    spawn_interval = max(2000, 5000 - st["level"] * 300)   # faster spawns at higher levels
-    if now - st["enemy_timer"] > spawn_interval and len(st["enemy_g"]) < 6 + st["level"]:
-        en = Enemy(random.choice([-60, SW + 60]), SH - 50)
-        st["all"].add(en); st["enemy_g"].add(en)
-        st["enemy_timer"] = now
-
-    # ── Spawn power-ups ──────────────────────────────────────────────────────
-    if now - st["pu_timer"] > 12000 and len(st["pu_g"]) < 2:
-        kind = random.choice(list(PU_DEFS.keys()))
-        pu   = PowerUp(random.randint(60, SW - 60), random.randint(80, SH - 100), kind)
-        st["all"].add(pu); st["pu_g"].add(pu)
-        st["pu_timer"] = now
-
-    # ── Coin collection ──────────────────────────────────────────────────────
-    for coin in pygame.sprite.spritecollide(pl, st["coin_g"], True):
-        st["score"]    += coin.value
-        st["coins_got"] += 1
-        snd_coin.play()
-        spawn_particles(coin.rect.centerx, coin.rect.centery, YELLOW, 10, (1, 4))
-        spawn_popup(coin.rect.centerx, coin.rect.centery, f"+{coin.value}")
-        # Respawn a new coin at a random position to keep supply constant
-        nc = Coin(random.randint(40, SW - 40), random.randint(60, SH - 100))
-        st["all"].add(nc); st["coin_g"].add(nc)
-
-    # ── Power-up collection ──────────────────────────────────────────────────
-    for pu in pygame.sprite.spritecollide(pl, st["pu_g"], True):
-        snd_pu.play()
-        spawn_particles(pu.rect.centerx, pu.rect.centery, WHITE, 18, (2, 5))
-        spawn_popup(pu.rect.centerx, pu.rect.centery, pu.kind.upper(), PU_DEFS[pu.kind][0])
-        if pu.kind == "invincibility":
-            pl.inv_t = 360               # 6 seconds at 60 FPS
-        elif pu.kind == "speed":
-            pl.speed       = PLAYER_SPEED + 4
-            pl.speed_timer = 300         # 5 seconds
-        elif pu.kind == "health":
-            pl.lives = min(5, pl.lives + 1)
-        elif pu.kind == "magnet":
-            pl.magnet       = True
-            pl.magnet_timer = 420        # 7 seconds
-
-    # ── Enemy collision ──────────────────────────────────────────────────────
-    if pl.inv_t == 0:    # skip check while invincible
-        for en in pygame.sprite.spritecollide(pl, st["enemy_g"], False):
-            hit = pl.hurt()
-            if hit:
-                if pl.lives <= 0:
-                    snd_death.play()
-                    hs.append(st["score"])
-                    save_hs(hs)
-                    st["hs"] = load_hs()
-                    mode = GAME_OVER
-                break
-
-    # ── Level complete check ──────────────────────────────────────────────────
-    if st["coins_got"] >= st["coin_goal"]:
-        mode = WIN
+    keys = pygame.key.get_pressed()
+    inp  = Input(left=keys[pygame.K_LEFT] or keys[pygame.K_a],
+                 right=keys[pygame.K_RIGHT] or keys[pygame.K_d],
+                 jump=jump)
+
+    events = st.step(inp)
+    play_events(events)
+
+    if st.mode == GAME_OVER:
+        hs.append(st.score)
+        save_hs(hs)
+        hs = load_hs()
+    mode = st.mode
 
     # ── DRAW ─────────────────────────────────────────────────────────────────
     draw_bg(screen)
-    pl.draw_trail(screen)
-    st["all"].draw(screen)
+    draw_trail(screen, st.player)
+    draw_world(screen, st)
     update_draw_particles(screen)
     update_draw_popups(screen)
-    draw_hud(screen, st)
+    draw_hud(screen, st, hs)
     pygame.display.flip()
 
 # ─── SHUTDOWN ────────────────────────────────────────────────────────────────
 if st:
-    hs.append(st["score"])
+    hs.append(st.score)
     save_hs(hs)
 pygame.quit()
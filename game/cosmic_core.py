@@ -0,0 +1,708 @@
+"""
+Cosmic Jumper simulation core.
+
+Everything that decides what happens in a game of Cosmic Jumper lives
+here: player physics, platforms, enemies, coins, power-ups and level
+progression. Nothing in this module touches pygame, the display or the
+mixer, so a game can be stepped headless, thousands of frames a second,
+and replayed exactly from a seed and a list of inputs.
+
+    world = World(seed=7)
+    for inp in inputs:
+        for event in world.step(inp):
+            ...                     # sounds, particles, popups
+
+The pygame front end (1st.py) only turns the world and its events into
+pictures and sound.
+"""
+import math
+import random
+from collections import deque, namedtuple
+from itertools import count
+
+# ─── CONSTANTS ───────────────────────────────────────────────────────────────
+SW, SH = 900, 650
+FPS    = 60
+
+GRAVITY      = 0.7
+JUMP_POWER   = -15
+PLAYER_SPEED = 5
+
+PU_KINDS = ("invincibility", "speed", "health", "magnet")
+
+# Collision box sizes, matching the drawn sprites
+PLAYER_SIZE  = (38, 44)
+COIN_SIZE    = (22, 22)
+PLATFORM_H   = 18
+ENEMY_SIZE   = (46, 28)
+DIVE_SIZE    = (34, 34)
+POWERUP_SIZE = (28, 28)
+
+PLAYING   = "playing"
+GAME_OVER = "gameover"
+WIN       = "win"
+
+COINS_PER_LEVEL = 30   # coins needed to advance to next level
+
+def ticks(frame):
+    """Milliseconds of game time after `frame` frames (the old get_ticks clock)."""
+    return frame * 1000 / FPS
+
+# ─── INPUT ───────────────────────────────────────────────────────────────────
+# One input vector per frame. `jump` is the key press, not the key held.
+Input = namedtuple("Input", "left right jump", defaults=(False, False, False))
+
+IDLE = Input()
+
+# ─── RECT ────────────────────────────────────────────────────────────────────
+def _px(v):
+    # pygame.Rect stores integers and rounds floats half away from zero
+    if type(v) is int:
+        return v
+    return int(v + 0.5) if v >= 0 else -int(0.5 - v)
+
+class Rect:
+    """Integer rectangle with the subset of the pygame.Rect interface the game uses."""
+    __slots__ = ("_x", "_y", "w", "h")
+
+    def __init__(self, x, y, w, h):
+        self._x = _px(x)
+        self._y = _px(y)
+        self.w  = w
+        self.h  = h
+
+    @classmethod
+    def around(cls, size, center):
+        w, h = size
+        return cls(center[0] - w // 2, center[1] - h // 2, w, h)
+
+    @property
+    def x(self):
+        return self._x
+
+    @x.setter
+    def x(self, v):
+        self._x = _px(v)
+
+    @property
+    def y(self):
+        return self._y
+
+    @y.setter
+    def y(self, v):
+        self._y = _px(v)
+
+    left = x
+    top  = y
+
+    @property
+    def right(self):
+        return self._x + self.w
+
+    @right.setter
+    def right(self, v):
+        self._x = _px(v) - self.w
+
+    @property
+    def bottom(self):
+        return self._y + self.h
+
+    @bottom.setter
+    def bottom(self, v):
+        self._y = _px(v) - self.h
+
+    @property
+    def centerx(self):
+        return self._x + self.w // 2
+
+    @centerx.setter
+    def centerx(self, v):
+        self._x = _px(v) - self.w // 2
+
+    @property
+    def centery(self):
+        return self._y + self.h // 2
+
+    @centery.setter
+    def centery(self, v):
+        self._y = _px(v) - self.h // 2
+
+    @property
+    def center(self):
+        return (self._x + self.w // 2, self._y + self.h // 2)
+
+    @center.setter
+    def center(self, v):
+        self.centerx, self.centery = v
+
+    @property
+    def topleft(self):
+        return (self._x, self._y)
+
+    def colliderect(self, other):
+        return (self._x < other._x + other.w and other._x < self._x + self.w
+                and self._y < other._y + other.h and other._y < self._y + self.h)
+
+# ─── SPATIAL HASH ────────────────────────────────────────────────────────────
+CELL  = 64   # grid cell size in pixels; a little bigger than most sprites
+SLACK = 16   # padding around a filed rect, more than any bob or step per frame
+
+class SpatialHash:
+    """
+    Uniform-grid broadphase for one kind of entity.
+
+    Every entity is filed under each cell touched by its rect padded by
+    SLACK. move() does nothing while the rect stays inside that padded
+    box, so coins and power-ups bobbing in place are never refiled and
+    enemies only every few frames. query() returns the entities filed in
+    the cells a box touches, in the order they were added: the same
+    order the old entity lists had, so the game plays out the same.
+
+    The hash is also the entity container: iterating it yields every
+    entity in insertion order and len() counts them.
+    """
+    def __init__(self, cell=CELL, slack=SLACK):
+        self.cell    = cell
+        self.slack   = slack
+        self.cells   = {}      # (cx, cy) -> {uid: entity}
+        self.boxes   = {}      # uid -> padded box (x0, y0, x1, y1) it is filed under
+        self.members = {}      # uid -> entity, in insertion order
+        self._uids   = count()
+
+    def __iter__(self):
+        return iter(self.members.values())
+
+    def __len__(self):
+        return len(self.members)
+
+    def _cells(self, box):
+        c = self.cell
+        x0, y0, x1, y1 = box
+        return [(cx, cy) for cx in range(x0 // c, (x1 - 1) // c + 1)
+                         for cy in range(y0 // c, (y1 - 1) // c + 1)]
+
+    def _file(self, uid, ent):
+        r, s = ent.rect, self.slack
+        box  = self.boxes[uid] = (r._x - s, r._y - s, r._x + r.w + s, r._y + r.h + s)
+        cells = self.cells
+        for key in self._cells(box):
+            bucket = cells.get(key)
+            if bucket is None:
+                cells[key] = {uid: ent}
+            else:
+                bucket[uid] = ent
+
+    def _unfile(self, uid):
+        cells = self.cells
+        for key in self._cells(self.boxes.pop(uid)):
+            bucket = cells[key]
+            del bucket[uid]
+            if not bucket:
+                del cells[key]
+
+    def add(self, ent):
+        uid = ent.uid = next(self._uids)
+        self.members[uid] = ent
+        self._file(uid, ent)
+        return ent
+
+    def remove(self, ent):
+        self._unfile(ent.uid)
+        del self.members[ent.uid]
+
+    def move(self, ent):
+        """Call after ent.rect changed."""
+        r = ent.rect
+        x0, y0, x1, y1 = self.boxes[ent.uid]
+        if x0 <= r._x and y0 <= r._y and r._x + r.w <= x1 and r._y + r.h <= y1:
+            return
+        self._unfile(ent.uid)
+        self._file(ent.uid, ent)
+
+    def query(self, x0, y0, x1, y1):
+        """Entities filed in the cells touching the box [x0, x1) x [y0, y1)."""
+        cells = self.cells
+        found = {}
+        for key in self._cells((x0, y0, x1, y1)):
+            bucket = cells.get(key)
+            if bucket:
+                found.update(bucket)
+        return [found[uid] for uid in sorted(found)]
+
+    def colliding(self, rect):
+        """Entities whose rect overlaps rect, in insertion order."""
+        return [ent for ent in self.query(rect._x, rect._y, rect._x + rect.w, rect._y + rect.h)
+                if rect.colliderect(ent.rect)]
+
+# ─── PLAYER ──────────────────────────────────────────────────────────────────
+class Player:
+    TRAIL_LEN  = 12
+    INV_FRAMES = 110     # invincibility frames after getting hit
+
+    def __init__(self):
+        self.rect = Rect.around(PLAYER_SIZE, (SW // 2, SH - 100))
+
+        self.vx = self.vy = 0.0
+        self.on_ground     = False
+        self.double_avail  = True   # can we still double-jump?
+        self.lives         = 3
+        self.inv_t         = 0      # invincibility countdown
+        self.speed         = PLAYER_SPEED
+        self.speed_timer   = 0
+        self.cur_platform  = None   # platform we're standing on (for moving-platform drag)
+        self.magnet        = False  # magnet power-up active?
+        self.magnet_timer  = 0
+        self.trail         = deque(maxlen=self.TRAIL_LEN)   # (x, y) for afterimage trail
+        self.dir           = 1      # 1 = facing right, -1 = facing left
+
+    def update(self, inp, platforms, coins):
+        # ── Speed boost countdown ────────────────────────────────────────────
+        if self.speed_timer > 0:
+            self.speed_timer -= 1
+            if self.speed_timer == 0:
+                self.speed = PLAYER_SPEED
+
+        # ── Magnet countdown ─────────────────────────────────────────────────
+        if self.magnet_timer > 0:
+            self.magnet_timer -= 1
+            self.magnet = self.magnet_timer > 0
+            # Pull nearby coins toward player
+            if self.magnet:
+                px, py = self.rect.center
+                for coin in coins.query(px - 180 - COIN_SIZE[0], py - 180 - COIN_SIZE[1],
+                                        px + 180 + COIN_SIZE[0], py + 180 + COIN_SIZE[1]):
+                    dx = px - coin.rect.centerx
+                    dy = py - coin.rect.centery
+                    dist = math.hypot(dx, dy)
+                    if dist < 180 and dist > 1:
+                        coin.rect.x += int(dx / dist * 4)
+                        coin.rect.y += int(dy / dist * 4)
+                        coins.move(coin)
+
+        # ── Moving-platform drag ─────────────────────────────────────────────
+        if self.cur_platform:
+            self.rect.x += self.cur_platform.velocity
+
+        # ── Horizontal movement ──────────────────────────────────────────────
+        self.vx = 0
+        if inp.left:
+            self.vx  = -self.speed
+            self.dir = -1
+        if inp.right:
+            self.vx  =  self.speed
+            self.dir =  1
+
+        self.rect.x += int(self.vx)
+
+        # Horizontal screen wrapping
+        if self.rect.right < 0:        self.rect.left  = SW
+        elif self.rect.left > SW:      self.rect.right = 0
+
+        # ── Gravity & vertical movement ──────────────────────────────────────
+        self.vy      += GRAVITY
+        self.rect.y  += int(self.vy)
+
+        # Ground floor
+        if self.rect.bottom >= SH - 10:
+            self.rect.bottom = SH - 10
+            self._land()
+
+        # ── Platform collisions ──────────────────────────────────────────────
+        self.on_ground    = False
+        self.cur_platform = None
+        # Only land on top surface when falling downward, so only
+        # platforms whose top lies in the stretch just fallen through
+        # can be hit
+        r = self.rect
+        nearby = platforms.query(r.left, r.bottom - int(self.vy) - 5, r.right, r.bottom) if self.vy >= 0 else ()
+        for plat in nearby:
+            if (self.rect.bottom > plat.rect.top
+                    and self.rect.bottom - self.vy <= plat.rect.top + 4
+                    and self.rect.right  > plat.rect.left + 4
+                    and self.rect.left   < plat.rect.right - 4):
+                self.rect.bottom  = plat.rect.top
+                self.cur_platform = plat
+                self._land()
+                break
+
+        # ── Trail (for speed-boost afterimage) ──────────────────────────────
+        self.trail.append((self.rect.centerx, self.rect.centery))
+
+        # ── Invincibility countdown ──────────────────────────────────────────
+        if self.inv_t > 0:
+            self.inv_t -= 1
+
+    def _land(self):
+        self.vy           = 0
+        self.on_ground    = True
+        self.double_avail = True
+
+    def jump(self):
+        """Returns "jump", "double_jump" or None when no jump is left."""
+        if self.on_ground:
+            self.vy        = JUMP_POWER
+            self.on_ground = False
+            return "jump"
+        if self.double_avail:
+            # Double-jump: slightly weaker
+            self.vy           = JUMP_POWER * 0.85
+            self.double_avail = False
+            return "double_jump"
+        return None
+
+    def hurt(self):
+        """Called when the player takes a hit; starts invincibility frames."""
+        if self.inv_t > 0:
+            return False      # still invincible — ignore hit
+        self.lives -= 1
+        self.inv_t  = self.INV_FRAMES
+        return True
+
+# ─── COIN ────────────────────────────────────────────────────────────────────
+class Coin:
+    def __init__(self, x, y, rng, value=10):
+        self.value   = value
+        self.offset  = rng.uniform(0, 2 * math.pi)
+        self.rect    = Rect.around(COIN_SIZE, (x, y))
+        self._base_y = y   # stored so floating bob is relative to spawn
+
+    def update(self, now):
+        # Gentle sine-wave float
+        self.rect.centery = int(self._base_y + math.sin(now / 400 + self.offset) * 5)
+
+# ─── PLATFORM ────────────────────────────────────────────────────────────────
+class Platform:
+    def __init__(self, x, y, w, velocity=0, crumble=False):
+        self.velocity  = velocity
+        self.crumble   = crumble       # crumbling platforms disappear after being stood on
+        self.crumble_t = 0             # countdown once player lands
+        self.alive     = True
+        self.rect      = Rect(x, y, w, PLATFORM_H)
+
+    def update(self):
+        # Bounce moving platforms off screen edges
+        if self.velocity:
+            self.rect.x += self.velocity
+            if self.rect.left < 0 or self.rect.right > SW:
+                self.velocity *= -1
+
+        # Crumble: dissolve, then vanish
+        if self.crumble_t > 0:
+            self.crumble_t -= 1
+            if self.crumble_t == 0:
+                self.alive = False
+
+    def trigger_crumble(self):
+        if self.crumble and self.crumble_t == 0:
+            self.crumble_t = 60
+
+# ─── ENEMIES ─────────────────────────────────────────────────────────────────
+class Enemy:
+    """Horizontal patrol enemy that floats sinusoidally."""
+    def __init__(self, x, y, rng, spd=None):
+        self.speed  = (spd or rng.uniform(2, 5)) * rng.choice([-1, 1])
+        self.offset = rng.uniform(0, 2 * math.pi)
+        self.base_y = float(y)
+        self.rect   = Rect.around(ENEMY_SIZE, (x, y))
+
+    def update(self, now):
+        self.rect.x += int(self.speed)
+        # Wrap around screen edges instead of despawning
+        if self.rect.right < 0:   self.rect.left  = SW
+        elif self.rect.left > SW: self.rect.right = 0
+        # Bob up and down
+        self.rect.centery = int(self.base_y + math.sin(now / 350 + self.offset) * 8)
+
+
+class DiveEnemy:
+    """Swoops down at the player periodically."""
+    DIVE_SPEED = 8
+
+    def __init__(self, x, rng):
+        self.rng    = rng
+        self.rect   = Rect.around(DIVE_SIZE, (x, 30))
+        self.base_x = float(x)
+        self.base_y = 30.0
+        self.diving = False
+        self.timer  = rng.randint(90, 200)   # frames until next dive
+
+    def update(self, now):
+        if not self.diving:
+            # Hover slowly across the top
+            self.base_x += 1.2
+            if self.base_x > SW: self.base_x = 0
+            self.rect.centerx = int(self.base_x)
+            self.timer -= 1
+            if self.timer <= 0:
+                self.diving  = True
+                self.timer   = 0
+        else:
+            # Dive straight down
+            self.rect.y += self.DIVE_SPEED
+            if self.rect.top > SH:
+                # Reset back to top after completing dive
+                self.rect.center = (int(self.base_x), 30)
+                self.diving = False
+                self.timer  = self.rng.randint(90, 200)
+
+# ─── POWER-UP ────────────────────────────────────────────────────────────────
+class PowerUp:
+    def __init__(self, x, y, kind, rng):
+        self.kind   = kind
+        self.offset = rng.uniform(0, 2 * math.pi)
+        self.base_y = float(y)
+        self.rot    = 0
+        self.rect   = Rect.around(POWERUP_SIZE, (x, y))
+
+    def update(self, now):
+        # The spin is only drawn; the pickup box stays upright
+        self.rot = (self.rot + 1.5) % 360
+        self.rect.centery = int(self.base_y + math.sin(now / 300 + self.offset) * 6)
+
+# ─── LEVEL GENERATOR ─────────────────────────────────────────────────────────
+def generate_level(level_num, rng):
+    """
+    Procedurally place platforms, coins, and enemies scaled to level number.
+    Higher levels: more gaps, faster enemies, crumbling platforms.
+    """
+    plats = []
+    # Guaranteed safe ground-level platform at start
+    plats.append({"x": SW // 2 - 80, "y": SH - 70, "w": 160, "v": 0, "c": False})
+
+    rows = 5
+    for row in range(rows):
+        y   = SH - 130 - row * 100
+        n   = rng.randint(2, 4)
+        xs  = sorted(rng.sample(range(0, SW - 120, 60), min(n, (SW - 120) // 60)))
+        for x in xs:
+            w       = rng.randint(80, 160)
+            moving  = rng.random() < 0.2 + level_num * 0.06
+            crumble = rng.random() < level_num * 0.07
+            vel     = rng.uniform(1.5, 2.5 + level_num * 0.3) * rng.choice([-1, 1]) if moving else 0
+            plats.append({"x": x, "y": y, "w": w, "v": vel, "c": crumble})
+
+    # Coins: more per level
+    coin_count = 12 + level_num * 3
+    coins = [{"x": rng.randint(40, SW - 40), "y": rng.randint(60, SH - 80)}
+             for _ in range(coin_count)]
+
+    # Enemies: more and faster
+    enemy_count = 2 + level_num
+    enemies = [{"x": rng.randint(0, SW), "y": SH - 50, "spd": 2 + level_num * 0.4}
+               for _ in range(enemy_count)]
+
+    return plats, coins, enemies
+
+# ─── WORLD ───────────────────────────────────────────────────────────────────
+class World:
+    """
+    One game in progress. step() advances it by one frame and returns the
+    events of that frame as tuples for the front end:
+
+        ("jump", x, y)  ("double_jump", x, y)  ("hurt", x, y)  ("death", x, y)
+        ("coin", x, y, value)  ("powerup", x, y, kind)
+    """
+    def __init__(self, seed=None, level=1):
+        self.seed   = seed
+        self.rng    = random.Random(seed)
+        self.frame  = 0
+        self.mode   = PLAYING
+        self.score  = 0
+        self.level  = level
+        self.player = Player()
+        self.events = []
+        self.load_level()
+
+    def load_level(self):
+        """Build the entities for the current level number."""
+        rng = self.rng
+        plats, coins, enms = generate_level(self.level, rng)
+
+        # Entity containers, each its own broadphase grid
+        self.platforms = SpatialHash()
+        self.coins     = SpatialHash()
+        self.enemies   = SpatialHash()
+        self.powerups  = SpatialHash()
+
+        for p in plats:
+            self.platforms.add(Platform(p["x"], p["y"], p["w"], p["v"], p["c"]))
+        for c in coins:
+            self.coins.add(Coin(c["x"], c["y"], rng))
+        for e in enms:
+            self.enemies.add(Enemy(e["x"], e["y"], rng, e["spd"]))
+
+        # One dive enemy from level 2 onward
+        if self.level >= 2:
+            self.enemies.add(DiveEnemy(rng.randint(100, SW - 100), rng))
+
+        # Reset per-level counters
+        now = ticks(self.frame)
+        self.coins_got   = 0
+        self.coin_goal   = COINS_PER_LEVEL + (self.level - 1) * 5
+        self.pu_timer    = now
+        self.enemy_timer = now
+        self.mode        = PLAYING
+
+    def next_level(self):
+        self.level += 1
+        self.player.rect.center = (SW // 2, SH - 100)
+        self.player.vy = 0
+        self.load_level()
+
+    def step(self, inp=IDLE):
+        events = self.events = []
+        if self.mode != PLAYING:
+            return events
+
+        rng = self.rng
+        pl  = self.player
+        self.frame += 1
+        now = ticks(self.frame)
+
+        if inp.jump:
+            kind = pl.jump()
+            if kind:
+                events.append((kind, pl.rect.centerx, pl.rect.bottom))
+
+        # ── Update all entities ──────────────────────────────────────────────
+        pl.update(inp, self.platforms, self.coins)
+
+        # Trigger crumble on the platform the player is standing on
+        if pl.cur_platform:
+            pl.cur_platform.trigger_crumble()
+
+        # Moving platforms are refiled as they slide; crumbled ones leave the grid
+        gone = []
+        move = self.platforms.move
+        for plat in self.platforms:
+            plat.update()
+            if not plat.alive:
+                gone.append(plat)
+            elif plat.velocity:
+                move(plat)
+        for plat in gone:
+            self.platforms.remove(plat)
+
+        # Coins and power-ups only bob in place, well within SLACK, so
+        # they are refiled only when the magnet drags a coin away
+        for coin in self.coins:
+            coin.update(now)
+        for pu in self.powerups:
+            pu.update(now)
+
+        move = self.enemies.move
+        for en in self.enemies:
+            en.update(now)
+            move(en)
+
+        # ── Spawn enemies over time ──────────────────────────────────────────
+        spawn_interval = max(2000, 5000 - self.level * 300)   # faster spawns at higher levels
+        if now - self.enemy_timer > spawn_interval and len(self.enemies) < 6 + self.level:
+            self.enemies.add(Enemy(rng.choice([-60, SW + 60]), SH - 50, rng))
+            self.enemy_timer = now
+
+        # ── Spawn power-ups ──────────────────────────────────────────────────
+        if now - self.pu_timer > 12000 and len(self.powerups) < 2:
+            kind = rng.choice(PU_KINDS)
+            self.powerups.add(PowerUp(rng.randint(60, SW - 60), rng.randint(80, SH - 100), kind, rng))
+            self.pu_timer = now
+
+        # ── Coin collection ──────────────────────────────────────────────────
+        got = self.coins.colliding(pl.rect)
+        if got:
+            for coin in got:
+                self.coins.remove(coin)
+            for coin in got:
+                self.score     += coin.value
+                self.coins_got += 1
+                events.append(("coin", coin.rect.centerx, coin.rect.centery, coin.value))
+                # Respawn a new coin at a random position to keep supply constant
+                self.coins.add(Coin(rng.randint(40, SW - 40), rng.randint(60, SH - 100), rng))
+
+        # ── Power-up collection ──────────────────────────────────────────────
+        got = self.powerups.colliding(pl.rect)
+        if got:
+            for pu in got:
+                self.powerups.remove(pu)
+            for pu in got:
+                events.append(("powerup", pu.rect.centerx, pu.rect.centery, pu.kind))
+                if pu.kind == "invincibility":
+                    pl.inv_t = 360               # 6 seconds at 60 FPS
+                elif pu.kind == "speed":
+                    pl.speed       = PLAYER_SPEED + 4
+                    pl.speed_timer = 300         # 5 seconds
+                elif pu.kind == "health":
+                    pl.lives = min(5, pl.lives + 1)
+                elif pu.kind == "magnet":
+                    pl.magnet       = True
+                    pl.magnet_timer = 420        # 7 seconds
+
+        # ── Enemy collision ──────────────────────────────────────────────────
+        if pl.inv_t == 0:    # skip check while invincible
+            for en in self.enemies.colliding(pl.rect)[:1]:
+                if pl.hurt():
+                    events.append(("hurt", pl.rect.centerx, pl.rect.centery))
+                    if pl.lives <= 0:
+                        events.append(("death", pl.rect.centerx, pl.rect.centery))
+                        self.mode = GAME_OVER
+
+        # ── Level complete check ─────────────────────────────────────────────
+        if self.coins_got >= self.coin_goal:
+            self.mode = WIN
+
+        return events
+
+    def snapshot(self):
+        """Hashable summary of the world, for checking that replays agree."""
+        pl = self.player
+        return (self.frame, self.mode, self.level, self.score, self.coins_got,
+                pl.rect.topleft, pl.vy, pl.lives, pl.inv_t,
+                tuple(p.rect.topleft for p in self.platforms),
+                tuple(c.rect.topleft for c in self.coins),
+                tuple(e.rect.topleft for e in self.enemies),
+                tuple((p.kind, p.rect.topleft) for p in self.powerups))
+
+# ─── HEADLESS RUNNER ─────────────────────────────────────────────────────────
+def random_inputs(seed=None):
+    """Endless stream of plausible inputs: hold a direction for a while, jump now and then."""
+    rng  = random.Random(seed)
+    held = IDLE
+    while True:
+        if rng.random() < 1 / 30:
+            held = rng.choice((Input(left=True), Input(right=True), IDLE))
+        yield held._replace(jump=rng.random() < 1 / 20)
+
+def simulate(frames, seed=None, inputs=None):
+    """
+    Run `frames` frames headless, clearing levels and restarting after a
+    game over. Returns the final world and the number of games played.
+    """
+    inputs = inputs if inputs is not None else random_inputs(seed)
+    world  = World(seed)
+    games  = 1
+    for _, inp in zip(range(frames), inputs):
+        if world.mode == WIN:
+            world.next_level()
+        elif world.mode == GAME_OVER:
+            world = World(world.rng.getrandbits(32))
+            games += 1
+        world.step(inp)
+    return world, games
+
+if __name__ == "__main__":
+    import argparse
+    import time
+    import zlib
+
+    parser = argparse.ArgumentParser(description="Run Cosmic Jumper headless with random inputs.")
+    parser.add_argument("--frames", type=int, default=60_000, help="frames to simulate")
+    parser.add_argument("--seed",   type=int, default=0,      help="seed for the world and the inputs")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    world, games = simulate(args.frames, args.seed)
+    elapsed = time.perf_counter() - start
+
+    print(f"{args.frames} frames in {elapsed:.2f} s  ({args.frames / elapsed:,.0f} frames/s)")
+    print(f"games {games}  level {world.level}  score {world.score}  lives {world.player.lives}")
+    print(f"state hash {zlib.crc32(repr(world.snapshot()).encode()):08x}")
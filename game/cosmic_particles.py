@@ -0,0 +1,134 @@
+"""
+Particle engine for Cosmic Jumper.
+
+Particles are stored as a structure of arrays in a fixed-size ring:
+position, velocity, life, radius and colour each have their own
+preallocated buffer, and a new particle always takes the slot of the
+oldest one. A frame is one vectorized update of every slot plus a single
+Surface.blits call.
+
+Sparks fade towards black as they die. Instead of working out a faded
+colour and drawing a circle per particle per frame, every (colour,
+radius, life) combination is drawn once into a small sprite the first
+time a colour is used, and drawing a particle is picking its sprite.
+
+NumPy does the update when it is installed; without it the same arrays
+are plain array.array buffers updated in a Python loop.
+"""
+import math
+import random
+from array import array
+
+import pygame
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+CAPACITY = 4096   # particles alive at once; beyond that the oldest are recycled
+GRAVITY  = 0.15   # weak gravity pulls sparks downward
+MAX_LIFE = 45     # frames; also the number of fade steps
+RADII    = range(2, 6)
+
+class ParticleSystem:
+    def __init__(self, capacity=CAPACITY):
+        self.capacity = capacity
+        self.head     = 0          # next slot to write, i.e. the oldest particle
+
+        if np is not None:
+            self.x     = np.zeros(capacity)
+            self.y     = np.zeros(capacity)
+            self.vx    = np.zeros(capacity)
+            self.vy    = np.zeros(capacity)
+            self.life  = np.zeros(capacity, dtype=np.int32)
+            self.key   = np.zeros(capacity, dtype=np.int32)   # sprite row: colour and radius
+        else:
+            self.x     = array("d", bytes(8 * capacity))
+            self.y     = array("d", bytes(8 * capacity))
+            self.vx    = array("d", bytes(8 * capacity))
+            self.vy    = array("d", bytes(8 * capacity))
+            self.life  = array("i", bytes(4 * capacity))
+            self.key   = array("i", bytes(4 * capacity))
+        self.radius = array("b", bytes(capacity))   # kept for blit offsets
+
+        self.colors  = {}          # colour -> index into the sprite rows
+        self.sprites = []          # [key * (MAX_LIFE + 1) + life] -> Surface
+
+    # ── SPRITE CACHE ─────────────────────────────────────────────────────────
+    def _add_color(self, color):
+        """Draw every radius and fade step of a new colour; returns its index."""
+        index = self.colors[color] = len(self.colors)
+        convert = pygame.display.get_surface() is not None
+        for r in RADII:
+            self.sprites.append(None)            # life 0 is never drawn
+            for life in range(1, MAX_LIFE + 1):
+                a = life / MAX_LIFE
+                c = tuple(max(0, int(v * a)) for v in color)
+                s = pygame.Surface((2 * r, 2 * r), pygame.SRCALPHA)
+                pygame.draw.circle(s, c, (r, r), r)
+                self.sprites.append(s.convert_alpha() if convert else s)
+        return index
+
+    def _key(self, color, r):
+        index = self.colors.get(color)
+        if index is None:
+            index = self._add_color(color)
+        return index * len(RADII) + r - RADII.start
+
+    # ── SPAWN / UPDATE / DRAW ────────────────────────────────────────────────
+    def spawn(self, x, y, color, n=12, spd=(1, 5)):
+        cap = self.capacity
+        for _ in range(n):
+            i = self.head
+            self.head = (i + 1) % cap
+            a = random.uniform(0, 2 * math.pi)
+            v = random.uniform(*spd)
+            self.x[i], self.y[i] = x, y
+            self.vx[i] = math.cos(a) * v
+            self.vy[i] = math.sin(a) * v
+            self.life[i]   = random.randint(20, MAX_LIFE)
+            r = self.radius[i] = random.randint(RADII.start, RADII.stop - 1)
+            self.key[i]    = self._key(color, r)
+
+    def update(self):
+        if np is not None:
+            # Dead slots keep moving too; it is cheaper than masking them out
+            self.x += self.vx
+            self.y += self.vy
+            self.vy += GRAVITY
+            np.subtract(self.life, 1, out=self.life, where=self.life > 0)
+            return
+
+        x, y, vx, vy, life = self.x, self.y, self.vx, self.vy, self.life
+        for i in range(self.capacity):
+            if life[i] > 0:
+                x[i]  += vx[i]
+                y[i]  += vy[i]
+                vy[i] += GRAVITY
+                life[i] -= 1
+
+    def draw(self, surf):
+        sprites = self.sprites
+        steps   = MAX_LIFE + 1
+        if np is not None:
+            live = np.flatnonzero(self.life)
+            if not len(live):
+                return
+            r     = np.frombuffer(self.radius, dtype=np.int8)[live]
+            index = (self.key[live] * steps + self.life[live]).tolist()
+            xs    = (self.x[live].astype(np.int32) - r).tolist()
+            ys    = (self.y[live].astype(np.int32) - r).tolist()
+            surf.blits([(sprites[k], (px, py)) for k, px, py in zip(index, xs, ys)], False)
+            return
+
+        surf.blits([
+            (sprites[self.key[i] * steps + life], (int(self.x[i]) - self.radius[i], int(self.y[i]) - self.radius[i]))
+            for i, life in enumerate(self.life) if life > 0
+        ], False)
+
+    def __len__(self):
+        """Number of live particles."""
+        if np is not None:
+            return int(np.count_nonzero(self.life))
+        return sum(1 for life in self.life if life > 0)